@@ -26,6 +26,7 @@ import time
 import smbus
 
 import Adafruit_GPIO.Platform as Platform
+from luma.core.interface.registry import open_bus
 
 
 def reverseByteOrder(data):
@@ -98,12 +99,16 @@ def require_repeated_start():
 class Device(object):
     """Class for communicating with an I2C device using the smbus library.
     Allows reading and writing 8-bit, 16-bit, and byte array values to registers
-    on the device."""
-    def __init__(self, address, busnum):
+    on the device.  The bus is shared with any other devices (including luma
+    displays) on the same bus number in this process, see
+    luma.core.interface.registry."""
+    def __init__(self, address, busnum, priority=10):
         """Create an instance of the I2C device at the specified address on the
-        specified I2C bus number."""
+        specified I2C bus number.  Its reads and writes go ahead of those with
+        a lower priority, such as a display's (0), when both are waiting for
+        the bus."""
         self._address = address
-        self._bus = smbus.SMBus(busnum)
+        self._bus = open_bus(busnum, priority, smbus.SMBus)
         self._logger = logging.getLogger('Adafruit_I2C.Device.Bus.{0}.Address.{1:#0X}' \
                                 .format(busnum, address))
 
@@ -118,6 +123,10 @@ class Device(object):
             self._logger.exception("error in writeRaw8: %s", err)
             time.sleep(0.001)
 
+    def close(self):
+        """Release the bus, closing it if no other device is using it."""
+        self._bus.close()
+
     def write8(self, register, value):
         """Write an 8-bit value to the specified register."""
         value = value & 0xFF
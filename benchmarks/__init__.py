@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Micro-benchmarks for the luma libraries. Each module can be run directly,
+e.g. ``python -m benchmarks.dither``.
+"""
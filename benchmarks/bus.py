@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Estimates the frame rate each :py:mod:`luma.oled.device` driver can achieve
+for the workloads of :py:mod:`benchmarks.drivers` over I²C at 100kHz and
+400kHz and SPI at 8MHz, using :py:class:`luma.core.interface.serial.simulated`
+to work out the time spent on the wire. Frames are assumed to be sent one
+after another as fast as possible, so the time per frame is the CPU time
+spent preparing it plus its wire time; the bus utilisation is the fraction
+of that spent on the wire.
+"""
+
+from luma.core.interface.serial import simulated
+import luma.oled.device
+from benchmarks.drivers import DRIVERS, WORKLOADS, cpu_time, frames
+
+
+BUSES = [
+    ("i2c 100k", {"bus": "i2c", "bus_speed_hz": 100000}),
+    ("i2c 400k", {"bus": "i2c", "bus_speed_hz": 400000}),
+    ("i2c 400k+", {"bus": "i2c", "bus_speed_hz": 400000, "combined": True}),
+    ("spi 8M", {"bus": "spi", "bus_speed_hz": 8000000})
+]
+I2C_DRIVERS = ["ssd1306", "sh1106"]
+
+
+def run(number=20):
+    """
+    Returns a list of ``(driver, bus, workload, CPU seconds per frame, wire
+    seconds per frame, frames per second, bus utilisation)`` tuples.
+    """
+    results = []
+    for label, driver, kwargs in DRIVERS:
+        for bus, options in BUSES:
+            if options["bus"] == "i2c" and driver not in I2C_DRIVERS:
+                continue
+            for workload in WORKLOADS:
+                serial = simulated(**options)
+                device = getattr(luma.oled.device, driver)(serial, **kwargs)
+                images = frames(workload, device, number + 1)
+                device.display(images[0])
+                serial.reset()
+
+                start = cpu_time()
+                for image in images[1:]:
+                    device.display(image)
+                cpu = (cpu_time() - start) / number
+                wire = serial.elapsed / number
+                total = cpu + wire
+
+                results.append((label, bus, workload, cpu, wire,
+                                1 / total if total else float("inf"),
+                                wire / total if total else 0.0))
+    return results
+
+
+def main():
+    print("{0:<12} {1:<10} {2:<7} {3:>8} {4:>8} {5:>8} {6:>6}".format(
+        "driver", "bus", "load", "cpu ms", "wire ms", "fps", "util"))
+    for driver, bus, workload, cpu, wire, fps, util in run():
+        print("{0:<12} {1:<10} {2:<7} {3:>8.3f} {4:>8.3f} {5:>8.1f} {6:>5.0f}%".format(
+            driver, bus, workload, cpu * 1000, wire * 1000, fps, util * 100))
+
+
+if __name__ == "__main__":
+    main()
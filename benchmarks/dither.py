@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Compares the cost of drawing a frame and dithering it onto a monochrome
+device with each of the methods supported by :py:class:`luma.core.render.canvas`.
+"""
+
+import timeit
+
+from PIL import Image, ImageDraw
+
+from luma.core.render import dither_surface, dither_image
+
+
+SIZES = [(128, 64), (256, 64)]
+METHODS = ["floyd-steinberg", "bayer4", "bayer8"]
+BYTES_PER_PIXEL = {"L": 1, "RGB": 3}
+
+
+def frame(mode, size):
+    """
+    Draws a greyscale ramp with some shapes and text, roughly what a dithered
+    status screen would contain.
+    """
+    image = Image.new(mode, size)
+    draw = ImageDraw.Draw(image)
+    w, h = size
+    for x in range(0, w, 16):
+        grey = x * 255 // w
+        draw.rectangle((x, 0, x + 15, h // 2), fill=(grey, grey, grey) if mode == "RGB" else grey)
+    draw.ellipse((4, h // 2, h // 2 + 4, h - 1), outline="white", fill="grey")
+    draw.text((h // 2 + 10, h // 2 + 8), "12:34 dither", fill="white")
+    return image
+
+
+def best(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def run(number=200):
+    """
+    Returns a list of ``(size, method, surface mode, seconds per drawn and
+    dithered frame, seconds per dithering step, surface bytes)`` tuples.
+    """
+    results = []
+    for size in SIZES:
+        for method in METHODS:
+            mode = dither_surface("1", method)
+            image = frame(mode, size)
+            dither_image(image, "1", method)    # warm up the threshold tiles
+            results.append((
+                size, method, mode,
+                best(lambda: dither_image(frame(mode, size), "1", method), number),
+                best(lambda: dither_image(image, "1", method), number),
+                size[0] * size[1] * BYTES_PER_PIXEL[mode]))
+    return results
+
+
+def main():
+    print("{0:>8}  {1:<16} {2:<4} {3:>10} {4:>10} {5:>8}".format(
+        "size", "method", "mode", "frame ms", "dither ms", "bytes"))
+    for size, method, mode, frame_s, dither_s, nbytes in run():
+        print("{0:>8}  {1:<16} {2:<4} {3:>10.3f} {4:>10.3f} {5:>8}".format(
+            "{0}x{1}".format(*size), method, mode, frame_s * 1000,
+            dither_s * 1000, nbytes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Drives each :py:mod:`luma.oled.device` driver through a set of workloads
+over a serial interface which records everything sent, and reports the CPU
+time, peak memory, bytes and transactions per frame. Results can be written
+as JSON and compared against a stored baseline, e.g.::
+
+    python -m benchmarks.drivers --output baseline.json
+    python -m benchmarks.drivers --baseline baseline.json --threshold 0.1
+
+which exits with a non-zero status if any figure got worse by more than the
+threshold. CPU times vary from one run to the next, by half or more on a
+busy or virtual machine, so they have their own ``--cpu-threshold`` (by
+default, twice as slow counts), must also have got worse by ``--min-delta``
+milliseconds, and are timed again before being reported. Memory is
+measured with :py:mod:`tracemalloc` where available (Python 3).
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from PIL import Image, ImageDraw
+
+import luma.oled.device
+from benchmarks.framebuffer import peak_bytes
+
+try:
+    cpu_time = time.process_time
+except AttributeError:
+    cpu_time = time.clock
+
+
+DRIVERS = [
+    ("ssd1306", "ssd1306", {}),
+    ("sh1106", "sh1106", {}),
+    ("ssd1331", "ssd1331", {}),
+    ("ssd1322/1", "ssd1322", {"mode": "1"}),
+    ("ssd1322/RGB", "ssd1322", {"mode": "RGB"}),
+    ("ssd1325", "ssd1325", {})
+]
+WORKLOADS = ["random", "clock", "scroll", "blank"]
+METRICS = ["cpu_ms", "peak_bytes", "bytes", "transactions"]
+
+# Each timing repeats the frames until at least this much CPU time was spent,
+# and the best of SAMPLES timings, taken in turn across all of the drivers
+# and workloads so that a passing slowdown does not affect all of one's, is
+# reported
+MIN_SAMPLE_SECONDS = 0.05
+SAMPLES = 5
+# Times a figure which got slower is timed again before being reported
+RETRIES = 2
+
+
+class recording_serial(object):
+    """
+    A serial interface which records every command and data byte sent to
+    it, as a list of transactions, each a list of ``(is_data, bytes)``
+    segments. Like the I²C and SPI interfaces, it takes whole device
+    transactions with ``transfer``, each counting as one.
+    """
+    def __init__(self):
+        self.log = []
+
+    def command(self, *cmd):
+        self.log.append([(False, bytes(bytearray(cmd)))])
+
+    def data(self, data):
+        self.log.append([(True, bytes(bytearray(data)))])
+
+    def transfer(self, segments):
+        self.log.append([(is_data, bytes(buf)) for is_data, buf in segments])
+
+    def cleanup(self):
+        pass
+
+    @property
+    def transactions(self):
+        return len(self.log)
+
+    @property
+    def bytes(self):
+        return sum(len(sent) for segments in self.log for _, sent in segments)
+
+    def reset(self):
+        del self.log[:]
+
+
+def frames(workload, device, number):
+    """
+    Returns ``number`` frames for the named workload:
+
+    * ``random``: every pixel changes on every frame
+    * ``clock``: a static border, and the time ticking over
+    * ``scroll``: lines of text moving up a pixel at a time
+    * ``blank``: nothing at all
+    """
+    w, h = device.size
+    mode = device.mode
+    result = []
+
+    if workload == "random":
+        rand = random.Random(number)
+        for _ in range(number):
+            noise = bytearray(rand.getrandbits(8) for _ in range(w * h))
+            result.append(Image.frombytes("L", (w, h), bytes(noise)).convert(mode))
+
+    elif workload == "clock":
+        for i in range(number):
+            image = Image.new(mode, (w, h))
+            draw = ImageDraw.Draw(image)
+            draw.rectangle((0, 0, w - 1, h - 1), outline="white")
+            draw.text((4, 4), "12:{0:02d}:{1:02d}".format(i // 60, i % 60), fill="white")
+            result.append(image)
+
+    elif workload == "scroll":
+        page = Image.new(mode, (w, h + number))
+        draw = ImageDraw.Draw(page)
+        for i, y in enumerate(range(0, h + number, 12)):
+            draw.text((4, y), "Line {0} of the scrolling text".format(i), fill="white")
+        for i in range(number):
+            result.append(page.crop((0, i, w, i + h)))
+
+    else:
+        result = [Image.new(mode, (w, h))] * number
+
+    return result
+
+
+def _timed(device, images, min_seconds):
+    """
+    Returns the mean CPU seconds per frame to display ``images[1:]``,
+    starting each pass from ``images[0]`` and repeating the passes until at
+    least ``min_seconds`` have been spent.
+    """
+    elapsed, passes = 0.0, 0
+    while passes == 0 or elapsed < min_seconds:
+        device.display(images[0])
+        start = cpu_time()
+        for image in images[1:]:
+            device.display(image)
+        elapsed += cpu_time() - start
+        passes += 1
+    return elapsed / (passes * (len(images) - 1))
+
+
+def run(number=20, only=None):
+    """
+    Returns a list of dicts, one for each driver and workload (or for those
+    ``(driver, workload)`` pairs in ``only``, if given), holding the
+    mean CPU milliseconds (the best of :py:data:`SAMPLES` timings), bytes
+    and transactions per frame, and the peak bytes allocated by any one
+    frame (``None`` without tracemalloc). Each workload starts from its
+    first frame already displayed, so that the figures are for the steady
+    state.
+    """
+    results = []
+    cases = []
+    for label, driver, kwargs in DRIVERS:
+        for workload in WORKLOADS:
+            if only is not None and (label, workload) not in only:
+                continue
+            serial = recording_serial()
+            device = getattr(luma.oled.device, driver)(serial, **kwargs)
+            images = frames(workload, device, number + 1)
+            device.display(images[0])
+            serial.reset()
+            for image in images[1:]:
+                device.display(image)
+
+            # A fresh device, so that tracing does not skew the timings
+            traced = getattr(luma.oled.device, driver)(recording_serial(), **kwargs)
+            traced.display(images[0])
+            remaining = iter(images[1:])
+
+            results.append({
+                "driver": label,
+                "workload": workload,
+                "peak_bytes": peak_bytes(lambda: traced.display(next(remaining)), number),
+                "bytes": serial.bytes / float(number),
+                "transactions": serial.transactions / float(number)
+            })
+            cases.append((driver, kwargs, images))
+
+    timings = [[] for _ in cases]
+    for _ in range(SAMPLES):
+        for (driver, kwargs, images), samples in zip(cases, timings):
+            device = getattr(luma.oled.device, driver)(recording_serial(), **kwargs)
+            samples.append(_timed(device, images, MIN_SAMPLE_SECONDS))
+
+    for result, samples in zip(results, timings):
+        result["cpu_ms"] = min(samples) * 1000
+    return results
+
+
+def compare(results, baseline, threshold, cpu_threshold=1.0, min_delta=0.05):
+    """
+    Returns a list of ``(driver, workload, metric, baseline, result)``
+    tuples, for every figure in ``results`` exceeding that in ``baseline``
+    by more than the fraction ``threshold``, or for ``cpu_ms``, by more
+    than the fraction ``cpu_threshold`` and ``min_delta`` milliseconds.
+    Figures missing from either are skipped.
+    """
+    previous = dict(((r["driver"], r["workload"]), r) for r in baseline)
+    regressions = []
+    for result in results:
+        before = previous.get((result["driver"], result["workload"]))
+        if before is None:
+            continue
+        for metric in METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if metric == "cpu_ms":
+                worse = new > old * (1 + cpu_threshold) and new - old > min_delta
+            else:
+                worse = new > old * (1 + threshold)
+            if worse:
+                regressions.append((result["driver"], result["workload"], metric, old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--frames", type=int, default=20, help="Frames per workload")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare the results against this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Fraction by which a figure may exceed the baseline")
+    parser.add_argument("--cpu-threshold", type=float, default=1.0,
+                        help="Fraction by which CPU time may exceed the baseline")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="Milliseconds by which CPU time must also exceed the baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.frames)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold,
+                              args.cpu_threshold, args.min_delta)
+
+        # Timings vary from one run to the next, so time whatever got slower
+        # again, keeping the best, before reporting it
+        for _ in range(RETRIES):
+            slower = set((driver, workload) for driver, workload, metric, _, _ in regressions
+                         if metric == "cpu_ms")
+            if not slower:
+                break
+            retimed = dict(((r["driver"], r["workload"]), r["cpu_ms"])
+                           for r in run(args.frames, slower))
+            for r in results:
+                key = (r["driver"], r["workload"])
+                if key in retimed:
+                    r["cpu_ms"] = min(r["cpu_ms"], retimed[key])
+            regressions = compare(results, baseline, args.threshold,
+                                  args.cpu_threshold, args.min_delta)
+
+    print("{0:<12} {1:<7} {2:>8} {3:>10} {4:>9} {5:>6}".format(
+        "driver", "load", "cpu ms", "peak B", "bytes", "trans"))
+    for r in results:
+        print("{0:<12} {1:<7} {2:>8.3f} {3:>10} {4:>9.1f} {5:>6.1f}".format(
+            r["driver"], r["workload"], r["cpu_ms"],
+            "-" if r["peak_bytes"] is None else r["peak_bytes"],
+            r["bytes"], r["transactions"]))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"frames": args.frames, "results": results}, f, indent=2, sort_keys=True)
+
+    for driver, workload, metric, old, new in regressions:
+        print("REGRESSION {0} {1} {2}: {3:.3f} -> {4:.3f}".format(
+            driver, workload, metric, old, new))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
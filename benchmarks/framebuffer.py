@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Measures the time and memory each framebuffer strategy spends deciding what
+to redraw, for a frame with a small change and for an unchanged frame.
+Memory is measured with :py:mod:`tracemalloc` where available (Python 3).
+
+With ``--check``, also asserts that for a small change
+:py:class:`luma.core.framebuffer.diff_to_previous` allocates no more than
+:py:data:`ALLOWANCE` bytes per call, whatever the size of the frame, besides
+taking the frame with ``tobytes()``, and that it keeps frames in the same
+two images rather than making new ones, which :py:mod:`tracemalloc` would
+not see.
+"""
+
+import argparse
+import timeit
+
+from PIL import Image, ImageDraw
+
+import luma.core.framebuffer
+from luma.core.device import dummy
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+SIZES = [(128, 64), (256, 64)]
+MODES = ["1", "L", "RGB"]
+
+# Peak bytes diff_to_previous may allocate per call besides tobytes()
+ALLOWANCE = 16384
+
+
+def frames(mode, size):
+    """
+    Returns a pair of frames, differing in a small area, to alternate between.
+    """
+    a = Image.new(mode, size)
+    ImageDraw.Draw(a).text((4, 4), "12:34", fill="white")
+    b = a.copy()
+    ImageDraw.Draw(b).text((4, 4), "12:35", fill="white")
+    return a, b
+
+
+def peak_bytes(fn, number):
+    """
+    The largest amount of memory allocated by any single call of ``fn``,
+    or ``None`` without :py:mod:`tracemalloc`. Only the Python heap is traced:
+    Pillow allocates image memory itself, so images created by ``fn`` are not
+    counted, but the ``bytes`` returned by ``tobytes()`` are.
+    """
+    if tracemalloc is None:
+        return None
+
+    peak = 0
+    for _ in range(number):
+        tracemalloc.start()
+        fn()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak
+
+
+def run(number=200):
+    """
+    Returns a list of ``(size, mode, strategy, seconds per changed frame,
+    seconds per unchanged frame, peak bytes per call)`` tuples.
+    """
+    results = []
+    for size in SIZES:
+        for mode in MODES:
+            device = dummy(width=size[0], height=size[1], mode=mode)
+            a, b = frames(mode, size)
+            for name in luma.core.framebuffer.__all__:
+                fb = getattr(luma.core.framebuffer, name)(device)
+                toggle = [a, b]
+
+                def changed():
+                    toggle.reverse()
+                    fb.redraw_required(toggle[0])
+
+                def unchanged():
+                    fb.redraw_required(toggle[0])
+
+                changed_s = min(timeit.repeat(changed, number=number, repeat=3)) / number
+                unchanged_s = min(timeit.repeat(unchanged, number=number, repeat=3)) / number
+                results.append((size, mode, name, changed_s, unchanged_s,
+                                peak_bytes(changed, 20)))
+    return results
+
+
+def _extracted(image, rawmode):
+    """
+    Returns the image with ``tobytes()`` done beforehand, so that the memory
+    it takes is left out of what is measured.
+    """
+    data = image.tobytes("raw", rawmode)
+    image.tobytes = lambda *args: data
+    return image
+
+
+def check(number=20):
+    """
+    Asserts that :py:class:`luma.core.framebuffer.diff_to_previous` keeps
+    frames in no more than two images, and the bound on the peak memory it
+    allocates per call, for a small change, for each size and mode. The
+    latter is not checked without :py:mod:`tracemalloc`.
+    """
+    for size in SIZES + [(1024, 512)]:
+        for mode in MODES:
+            device = dummy(width=size[0], height=size[1], mode=mode)
+            rawmode = luma.core.framebuffer._raw_modes[mode][0]
+            toggle = [_extracted(image, rawmode) for image in frames(mode, size)]
+            fb = luma.core.framebuffer.diff_to_previous(device)
+
+            def changed():
+                toggle.reverse()
+                fb.redraw_required(toggle[0])
+
+            # Holding on to each image, so that a new one cannot reuse the
+            # id of one freed
+            images = []
+            for _ in range(number):
+                changed()
+                images.append(fb.image)
+            count = len(set(id(image) for image in images))
+            assert count <= 2, "{0}x{1} {2}: {3} images made for {4} frames".format(
+                size[0], size[1], mode, count, number)
+
+            if tracemalloc is None:
+                continue
+            peak = peak_bytes(changed, number)
+            assert peak <= ALLOWANCE, "{0}x{1} {2}: {3} bytes allocated per call".format(
+                size[0], size[1], mode, peak)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--check", action="store_true",
+                        help="Check the memory diff_to_previous allocates per call")
+    args = parser.parse_args(argv)
+
+    print("{0:>8}  {1:<4} {2:<18} {3:>10} {4:>10} {5:>10}".format(
+        "size", "mode", "framebuffer", "diff ms", "same ms", "peak B"))
+    for size, mode, name, changed_s, unchanged_s, peak in run():
+        print("{0:>8}  {1:<4} {2:<18} {3:>10.3f} {4:>10.3f} {5:>10}".format(
+            "{0}x{1}".format(*size), mode, name, changed_s * 1000,
+            unchanged_s * 1000, "-" if peak is None else peak))
+
+    if args.check:
+        check()
+        print("diff_to_previous keeps frames in two images, and allocates at most {0} bytes per call "
+              "besides tobytes()".format(ALLOWANCE))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Counts the bus transactions each :py:mod:`luma.oled.device` driver makes to
+initialize itself and to display a frame, over I²C (with and without
+combined writes) and SPI. The buses are stand-ins which only count, so no
+hardware is needed; combined I²C writes still require smbus2 to be installed,
+and are skipped without it.
+"""
+
+from PIL import Image, ImageDraw
+
+from luma.core.interface.serial import i2c, spi
+import luma.oled.device
+
+try:
+    import smbus2
+except ImportError:
+    smbus2 = None
+
+
+DRIVERS = {
+    "i2c": ["ssd1306", "sh1106"],
+    "spi": ["ssd1306", "sh1106", "ssd1322", "ssd1325", "ssd1331"]
+}
+
+
+class counting_smbus(object):
+    """
+    Counts block writes, like an SMBus which cannot combine transactions.
+    """
+    def __init__(self):
+        self.transactions = 0
+        self.bytes = 0
+
+    def write_i2c_block_data(self, addr, mode, data):
+        self.transactions += 1
+        self.bytes += len(data) + 1
+
+
+class counting_i2c_rdwr(counting_smbus):
+    """
+    Counts writes, like smbus2's SMBus with ``i2c_rdwr``.
+    """
+    def i2c_rdwr(self, *msgs):
+        for msg in msgs:
+            self.transactions += 1
+            self.bytes += msg.len
+
+
+class counting_spi(object):
+    """
+    Counts SPI transfers, and stands in for the GPIO driving the D/C line.
+    """
+    OUT = LOW = 0
+    HIGH = 1
+
+    def __init__(self):
+        self.transactions = 0
+        self.bytes = 0
+
+    def open(self, port, device):
+        pass
+
+    def writebytes(self, data):
+        self.transactions += 1
+        self.bytes += len(data)
+
+    def setup(self, pin, mode):
+        pass
+
+    def output(self, pin, value):
+        pass
+
+    def close(self):
+        pass
+
+    def cleanup(self):
+        pass
+
+
+def serial(bus):
+    """
+    Returns a ``(counter, serial interface)`` pair for the named bus.
+    """
+    if bus == "spi":
+        counter = counting_spi()
+        return counter, spi(spi=counter, gpio=counter)
+
+    counter = counting_i2c_rdwr() if bus == "i2c_rdwr" else counting_smbus()
+    return counter, i2c(bus=counter)
+
+
+def frames(device, number):
+    """
+    Returns ``number`` frames, each differing a little from the previous one.
+    """
+    result = []
+    for i in range(number):
+        image = Image.new(device.mode, device.size)
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((0, 0, device.width - 1, 10), outline="white")
+        draw.text((4, 16), "12:{0:02d}".format(i), fill="white")
+        result.append(image)
+    return result
+
+
+def run(number=10):
+    """
+    Returns a list of ``(driver, bus, initialization transactions, mean
+    transactions per frame, mean bytes per frame)`` tuples.
+    """
+    results = []
+    for bus in ["i2c", "i2c_rdwr", "spi"]:
+        if bus == "i2c_rdwr" and smbus2 is None:
+            continue
+        for driver in DRIVERS[bus[:3]]:
+            counter, interface = serial(bus)
+            device = getattr(luma.oled.device, driver)(interface)
+            init = counter.transactions
+            sent = counter.bytes
+            for image in frames(device, number):
+                device.display(image)
+            results.append((driver, bus, init,
+                            (counter.transactions - init) / float(number),
+                            (counter.bytes - sent) / float(number)))
+    return results
+
+
+def main():
+    print("{0:<8} {1:<9} {2:>6} {3:>10} {4:>10}".format(
+        "driver", "bus", "init", "per frame", "bytes"))
+    for driver, bus, init, per_frame, nbytes in run():
+        print("{0:<8} {1:<9} {2:>6} {3:>10.1f} {4:>10.1f}".format(
+            driver, bus, init, per_frame, nbytes))
+    if smbus2 is None:
+        print("i2c_rdwr skipped: combined writes need smbus2, which is not installed")
+
+
+if __name__ == "__main__":
+    main()
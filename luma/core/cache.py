@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Caching of device-native frame data.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+
+class packed_frame_cache(object):
+    """
+    A least-recently-used cache which maps the content of an image onto the
+    packed buffer a device driver produced for it, so that a frame which has
+    been displayed before can be sent again without preprocessing or packing.
+
+    Entries are evicted, least recently used first, once the total size of
+    the cached buffers exceeds the memory budget.
+
+    :param budget: The maximum number of bytes of packed data to retain.
+    :type budget: int
+    """
+    def __init__(self, budget):
+        assert(budget > 0)
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.skipped = 0
+        self.last_key = None
+        self._entries = OrderedDict()
+
+    def key(self, image):
+        """
+        Calculates the cache key for an image.
+
+        :param image: The image to calculate the key for.
+        :type image: PIL.Image.Image
+        :rtype: bytes
+        """
+        return hashlib.md5(image.tobytes()).digest()
+
+    def get(self, key):
+        """
+        Returns the packed buffer for the key, or ``None`` if it is not
+        present. A hit moves the entry to the most recently used position.
+        """
+        buf = self._entries.pop(key, None)
+        if buf is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries[key] = buf
+        return buf
+
+    def put(self, key, buf):
+        """
+        Stores a packed buffer, evicting least recently used entries as
+        necessary to stay within the budget. Buffers larger than the whole
+        budget are not stored.
+        """
+        if len(buf) > self.budget:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+
+        while self._entries and self.size + len(buf) > self.budget:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+        self._entries[key] = buf
+        self.size += len(buf)
+
+    def clear(self):
+        """
+        Drops all entries and forgets the last displayed frame. The counters
+        are left untouched.
+        """
+        self._entries.clear()
+        self.size = 0
+        self.last_key = None
+
+    def __len__(self):
+        """
+        The number of cached frames.
+        """
+        return len(self._entries)
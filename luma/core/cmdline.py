@@ -151,6 +151,9 @@ def create_device(args, display_types=None):
         Device = getattr(luma.emulator.device, args.display)
         device = Device(**vars(args))
 
+    if device is not None and getattr(args, 'persist', False):
+        device.persist = True
+
     return device
 
 
@@ -167,7 +170,7 @@ def create_parser(description):
     framebuffer_choices = get_choices('luma.core.framebuffer')
     rotation_choices = [0, 1, 2, 3]
     block_orientation_choices = [0, 90, -90, 180]
-    color_choices = ['1', 'RGB', 'RGBA']
+    color_choices = ['1', 'L', 'RGB', 'RGBA']
 
     general_group = parser.add_argument_group('General')
     general_group.add_argument('--config', '-f', type=str, help='Load configuration settings from a file')
@@ -196,6 +199,9 @@ def create_parser(description):
     misc_group.add_argument('--block-orientation', type=int, default=0, help='Fix 90° phase error (MAX7219 LED matrix only). Allowed values are: {0}'.format(', '.join([str(x) for x in block_orientation_choices])), choices=block_orientation_choices, metavar='')
     misc_group.add_argument('--mode', type=str, default='RGB', help='Colour mode (SSD1322, SSD1325 and emulator only). Allowed values are: {0}'.format(', '.join(color_choices)), choices=color_choices, metavar='')
     misc_group.add_argument('--framebuffer', type=str, default=framebuffer_choices[0], help='Framebuffer implementation (SSD1331, SSD1322, ST7735 displays only). Allowed values are: {0}'.format(', '.join(framebuffer_choices)), choices=framebuffer_choices, metavar='')
+    misc_group.add_argument('--frame-cache', type=int, default=0, help='Memory budget in bytes for caching packed frames, 0 disables the cache (OLED displays only)')
+    misc_group.add_argument('--warm-start', dest="warm_start", action="store_true", help='Take over a display left on by a previous run, without initializing or clearing it (OLED displays only)')
+    misc_group.add_argument('--persist', dest="persist", action="store_true", help='Leave the display on, showing the last frame, on exit')
     misc_group.add_argument('--bgr', dest="bgr", action="store_true", help='Set if LCD pixels laid out in BGR (ST7735 displays only).')
     misc_group.set_defaults(bgr=False)
     misc_group.add_argument('--h-offset', type=int, default=0, help='Horizontal offset (in pixels) of screen to display memory (ST7735 displays only)')
@@ -3,10 +3,13 @@
 # See LICENSE.rst for details.
 
 import atexit
+from contextlib import contextmanager
 
 from luma.core import mixin
+from luma.core.cache import packed_frame_cache
 import luma.core.const
-from luma.core.interface.serial import i2c, noop
+from luma.core.interface.serial import i2c, noop, transfer
+from luma.core.sprite_system import monotonic
 
 
 class device(mixin.capabilities):
@@ -18,10 +21,33 @@ class device(mixin.capabilities):
         discouraged: Screen updates should be effected through the
         :func:`display` method, or preferably with the
         :class:`luma.core.render.canvas` context manager.
+
+    Drivers which accept ``warm_start=True`` take over a panel which a
+    previous process configured and left lit: only the few commands this
+    library relies upon (such as the scan directions) are sent, and the
+    panel is neither cleared nor switched off, so that the first frame
+    displayed simply overwrites what was there. Set :py:attr:`persist` on
+    the previous device to leave it lit on exit. The first frame is always
+    sent in full, as nothing is known of what the panel shows.
+
+    The time taken to send each :py:func:`transaction` is measured, and
+    :py:attr:`bytes_per_second` holds the resulting throughput of the serial
+    interface, weighted towards recent transactions, or ``None`` until one
+    has been sent. An interface which sends later, in the background or on
+    another machine, marks itself ``deferred``; the throughput is then the
+    interface's own ``bytes_per_second``, which
+    :py:class:`luma.core.interface.asynchronous.asynchronous` measures as it
+    sends, or else ``None``.
     """
-    def __init__(self, const=None, serial_interface=None):
+    def __init__(self, const=None, serial_interface=None, frame_cache=0):
         self._const = const or luma.core.const.common
         self._serial_interface = serial_interface or i2c()
+        self.frame_cache = packed_frame_cache(frame_cache) if frame_cache else None
+        self._transaction = None
+        self.persist = False
+        self._bytes_per_second = None
+        self._sent_bytes = 0.0
+        self._sent_seconds = 0.0
 
         def shutdown_hook():  # pragma: no cover
             try:
@@ -34,16 +60,154 @@ class device(mixin.capabilities):
     def command(self, *cmd):
         """
         Sends a command or sequence of commands through to the delegated
-        serial interface.
+        serial interface, or queues them within a :py:func:`transaction`.
         """
-        self._serial_interface.command(*cmd)
+        if self._transaction is None:
+            self._serial_interface.command(*cmd)
+        else:
+            self._queue(False, cmd)
 
     def data(self, data):
         """
         Sends a data byte or sequence of data bytes through to the delegated
-        serial interface.
+        serial interface, or queues them within a :py:func:`transaction`.
+        """
+        if self._transaction is None:
+            self._serial_interface.data(data)
+        else:
+            self._queue(True, data)
+
+    def _queue(self, is_data, buf):
+        if len(buf) == 0:
+            return
+        segments = self._transaction
+        if segments and segments[-1][0] == is_data:
+            segments[-1][1].extend(buf)
+        else:
+            segments.append((is_data, bytearray(buf)))
+
+    @contextmanager
+    def transaction(self):
+        """
+        Queues the commands and data sent within the with-block and, on
+        leaving it, sends them in as few bus operations as the serial
+        interface allows: consecutive commands are joined, as is consecutive
+        data, and an interface with a ``transfer`` method is handed the
+        whole sequence of ``(is_data, bytearray)`` segments at once (see
+        :py:func:`luma.core.interface.serial.transfer`). Transactions may be nested; only the outermost one sends anything.
+        """
+        if self._transaction is not None:
+            yield
+            return
+
+        self._transaction = []
+        try:
+            yield
+        finally:
+            segments, self._transaction = self._transaction, None
+            if segments:
+                start = monotonic()
+                transfer(self._serial_interface, segments)
+                # Handing segments to a deferred interface takes no time at
+                # all, so only it can tell how fast they go out
+                if not getattr(self._serial_interface, "deferred", False):
+                    self._measure(sum(len(buf) for _, buf in segments), monotonic() - start)
+
+    def _measure(self, nbytes, seconds):
+        # Older transactions count for less, so that the rate follows changes
+        # such as another device starting to use a shared bus
+        self._sent_bytes = self._sent_bytes * 0.9 + nbytes
+        self._sent_seconds = self._sent_seconds * 0.9 + seconds
+        if self._sent_seconds > 0:
+            self._bytes_per_second = self._sent_bytes / self._sent_seconds
+
+    @property
+    def bytes_per_second(self):
+        """
+        The measured throughput of the serial interface, or ``None`` until
+        something has been sent, or if it cannot be measured.
+        """
+        if getattr(self._serial_interface, "deferred", False):
+            return getattr(self._serial_interface, "bytes_per_second", None)
+        return self._bytes_per_second
+
+    def _pack_cached(self, image, pack):
+        """
+        Produces the device-native buffer for an image by calling ``pack``,
+        unless the optional frame cache already holds a buffer for identical
+        image content. If the image is identical to the one most recently
+        packed, ``None`` is returned to signal that nothing needs sending.
+
+        :param image: The image to pack, before any preprocessing.
+        :type image: PIL.Image.Image
+        :param pack: A function taking the image and returning a buffer.
+        :returns: The packed buffer or ``None``.
+        """
+        cache = self.frame_cache
+        if cache is None:
+            return pack(image)
+
+        key = cache.key(image)
+        if key == cache.last_key:
+            cache.skipped += 1
+            return None
+
+        buf = cache.get(key)
+        if buf is None:
+            buf = pack(image)
+            cache.put(key, buf)
+
+        cache.last_key = key
+        return buf
+
+    def pack(self, image, region=None):
+        """
+        Packs an image into the display controller's native layout, ready to
+        be sent by :py:func:`display_packed`. Packing the frames of an
+        animation once, up front, means that playing them back involves no
+        image processing at all.
+
+        :param image: The image to pack, as would be passed to ``display``.
+        :type image: PIL.Image.Image
+        :param region: The ``(left, top, right, bottom)`` region to pack, in
+            the coordinates of the image returned by :py:func:`preprocess`
+            (those of the display, once rotated), or ``None`` for all of it.
+            Drivers may require the edges to be aligned, e.g. to whole pages.
+        :type region: tuple
+        :rtype: bytes
+        """
+        assert(image.mode == self.mode)
+        assert(image.size == self.size)
+
+        if region is None:
+            return bytes(self._pack(image))
+        return bytes(self._pack_region(self.preprocess(image), region))
+
+    def display_packed(self, buf, region=None):
+        """
+        Should be overridden in sub-classed implementations. Sends a buffer
+        in the display controller's native layout, such as one produced by
+        :py:func:`pack`, straight to the display. Afterwards nothing is
+        assumed about the display contents, so the next call to ``display``
+        sends a whole frame.
+
+        :param buf: The packed data.
+        :type buf: bytes
+        :param region: The region of the display the data covers, as for
+            :py:func:`pack`, or ``None`` for all of it.
+        :type region: tuple
+        :raises NotImplementedError:
         """
-        self._serial_interface.data(data)
+        raise NotImplementedError()
+
+    def _forget_last_frame(self):
+        """
+        Must be called whenever the display contents are changed other than
+        through :py:func:`_pack_cached`, so that the next frame is not
+        mistaken for being unchanged.
+        """
+        if self.frame_cache is not None:
+            self.frame_cache.last_key = None
 
     def show(self):
         """
@@ -81,9 +245,14 @@ class device(mixin.capabilities):
         This is a managed function, which is called when the python processs
         is being shutdown, so shouldn't usually need be called directly in
         application code.
+
+        If :py:attr:`persist` is set, the display is left on, showing its
+        last frame, e.g. for a following process to take over with
+        ``warm_start=True``.
         """
-        self.hide()
-        self.clear()
+        if not self.persist:
+            self.hide()
+            self.clear()
         self._serial_interface.cleanup()
 
 
@@ -44,3 +44,10 @@ class UnsupportedPlatform(Error):
 
     .. versionadded:: 0.5.2
     """
+
+
+class RemoteError(Error):
+    """
+    Exception raised when a remote display server fails to send on
+    commands or data.
+    """
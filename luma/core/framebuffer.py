@@ -6,8 +6,161 @@
 Different implementation strategies for framebuffering
 """
 
+import logging
+from collections import deque
+
 from PIL import Image, ImageChops
 
+from luma.core.sprite_system import monotonic
+
+
+__all__ = ["diff_to_previous", "full_frame", "tiled_diff", "adaptive"]
+
+
+# Raw modes to compare frames in, and the resulting bytes per pixel; 1-bit
+# images are stored a byte per pixel, which is faster to extract than packed
+_raw_modes = {"1": ("L", 1), "L": ("L", 1), "P": ("P", 1),
+              "RGB": ("RGB", 3), "RGBA": ("RGBA", 4)}
+
+# Typical bits sent per pixel by the drivers for each image mode
+_bits_per_pixel = {"1": 1, "L": 4, "P": 4, "RGB": 16, "RGBA": 16}
+
+# Assumed throughput of a serial interface, until one has been measured
+_DEFAULT_BYTES_PER_SECOND = 500000
+
+# Changed rows up to this many bytes are compared as integers, longer ones
+# with ImageChops, which is faster for large areas
+_FOLD_BYTES = 4096
+
+try:
+    _view = buffer  # noqa: F821
+except NameError:
+    _view = memoryview
+
+try:
+    int.from_bytes
+
+    def _int(data):
+        return int.from_bytes(data, "little")
+except AttributeError:
+    from binascii import hexlify
+
+    def _int(data):
+        return int(hexlify(bytes(data)[::-1]), 16)
+
+
+class statistics(object):
+    """
+    Running statistics of the redraws decided on by a framebuffer strategy:
+    how many frames were seen and skipped, how much of each frame was dirty,
+    the bytes sent compared to sending every frame in full, and the time spent
+    deciding. Every strategy keeps one as its ``statistics`` attribute.
+
+    Byte counts are estimates, based on the bits per pixel the drivers
+    typically send for the image mode.
+
+    :param mode: The image mode of the device.
+    :type mode: str
+    :param log_interval: If given, the number of seconds between summaries
+        logged at INFO level on the ``luma.core.framebuffer`` logger.
+    :type log_interval: float
+    :param name: The name to prefix logged summaries with.
+    :type name: str
+    :param history: The number of most recent frames to calculate the
+        dirty area percentiles from.
+    :type history: int
+    """
+    def __init__(self, mode, log_interval=None, name="framebuffer", history=1000):
+        self.bits_per_pixel = _bits_per_pixel.get(mode, 8)
+        self.log_interval = log_interval
+        self.name = name
+        self._history = history
+        self.reset()
+
+    def reset(self):
+        """
+        Sets all counters back to zero.
+        """
+        self.frames = 0
+        self.skipped = 0
+        self.dirty_pixels = 0
+        self.total_pixels = 0
+        self.diff_seconds = 0.0
+        self._dirty = deque(maxlen=self._history)
+        self._last_log = monotonic()
+
+    def record(self, size, regions, elapsed):
+        """
+        Records the outcome of one call to ``redraw_required``.
+
+        :param size: The size of the frame.
+        :type size: tuple
+        :param regions: The regions to be redrawn, empty if none.
+        :type regions: list
+        :param elapsed: The number of seconds taken to decide.
+        :type elapsed: float
+        """
+        area = size[0] * size[1]
+        if len(regions) == 1:
+            left, top, right, bottom = regions[0]
+            dirty = (right - left) * (bottom - top)
+        else:
+            dirty = min(area, sum((right - left) * (bottom - top)
+                                  for left, top, right, bottom in regions))
+        self.frames += 1
+        if dirty == 0:
+            self.skipped += 1
+        self.dirty_pixels += dirty
+        self.total_pixels += area
+        self.diff_seconds += elapsed
+        self._dirty.append(float(dirty) / area)
+
+        if self.log_interval is not None and monotonic() - self._last_log >= self.log_interval:
+            self._last_log = monotonic()
+            logging.getLogger(__name__).info(str(self))
+
+    def percentile(self, p):
+        """
+        The dirty fraction of the frame, between 0 and 1, which ``p`` percent
+        of recent frames did not exceed.
+
+        :param p: The percentile, between 0 and 100.
+        :type p: float
+        """
+        if not self._dirty:
+            return 0.0
+        ranked = sorted(self._dirty)
+        return ranked[min(len(ranked) - 1, int(len(ranked) * p / 100.0))]
+
+    def summary(self):
+        """
+        Returns the statistics as a dictionary.
+
+        :rtype: dict
+        """
+        bytes_full = self.total_pixels * self.bits_per_pixel // 8
+        bytes_sent = self.dirty_pixels * self.bits_per_pixel // 8
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "dirty_mean": float(self.dirty_pixels) / self.total_pixels if self.total_pixels else 0.0,
+            "dirty_p50": self.percentile(50),
+            "dirty_p90": self.percentile(90),
+            "dirty_p99": self.percentile(99),
+            "bytes_sent": bytes_sent,
+            "bytes_full": bytes_full,
+            "diff_seconds": self.diff_seconds
+        }
+
+    def __str__(self):
+        s = self.summary()
+        return ("{0}: {1} frames, {2} skipped, dirty mean {3:.1%} p50 {4:.1%} "
+                "p90 {5:.1%} p99 {6:.1%}, sent {7} of {8} bytes, "
+                "{9:.3f} ms per frame deciding").format(
+            self.name, s["frames"], s["skipped"], s["dirty_mean"],
+            s["dirty_p50"], s["dirty_p90"], s["dirty_p99"], s["bytes_sent"],
+            s["bytes_full"], 1000 * s["diff_seconds"] / max(1, s["frames"]))
+
 
 class diff_to_previous(object):
     """
@@ -22,13 +175,29 @@ class diff_to_previous(object):
     applied. The :py:class`luma.core.sprite_system.framerate_regulator` may be
     used to counteract this behavior however.
 
+    Frames are compared as raw bytes: an unchanged frame is a single
+    comparison, the first and last changed rows are found by binary search
+    on the common prefix and suffix, and the changed columns from the
+    exclusive or of those rows as one integer, folded onto a single row (or,
+    for a large area, with :py:mod:`PIL.ImageChops`).
+    Each frame is taken with ``tobytes()``, which then replaces the previous
+    one, and no difference image of the whole frame is made. The ``image``
+    attribute holds the last changed frame: it is one of two kept images,
+    the frame being pasted into the other and the two then swapped, so that
+    no new image is made per frame.
+
     :param device: the target device, used to determine the initial 'previous'
         image.
     :type device: luma.core.device.device
+    :param log_interval: Seconds between logged :py:class:`statistics`
+        summaries, or ``None`` (default) to not log them.
+    :type log_interval: float
     """
-    def __init__(self, device):
-        self.image = Image.new(device.mode, device.size, "white")
-        self.bounding_box = None
+    def __init__(self, device, log_interval=None):
+        self.statistics = statistics(device.mode, log_interval, type(self).__name__)
+        self.image = None
+        self._spare = None
+        self.retain(Image.new(device.mode, device.size, "white"))
 
     def redraw_required(self, image):
         """
@@ -41,12 +210,106 @@ class diff_to_previous(object):
         :type image: PIL.Image.Image
         :returns: ``True`` or ``False``
         """
-        self.bounding_box = ImageChops.difference(self.image, image).getbbox()
+        start = monotonic()
+        mode, size = image.mode, image.size
+        data = image.tobytes("raw", _raw_modes[mode][0])
+        if (mode, size) != self._format:
+            self.bounding_box = (0, 0) + size
+        elif data == self._data:
+            self.bounding_box = None
+        else:
+            self.bounding_box = self._changed_box(data, size[1], mode)
+
+        self._data = data
         if self.bounding_box is not None:
-            self.image = image.copy()
-            return True
+            self._keep(image)
+        self.statistics.record(size, self.regions, monotonic() - start)
+        return self.bounding_box is not None
+
+    def _keep(self, image):
+        """
+        Pastes the image into the spare kept image, and swaps the two.
+        """
+        spare = self._spare
+        if spare is None or (spare.mode, spare.size) != (image.mode, image.size):
+            spare = Image.new(image.mode, image.size)
+        spare.paste(image)
+        if image.palette is not None:
+            spare.putpalette(image.palette)
+        self._spare, self.image = self.image, spare
+        self._format = (image.mode, image.size)
+
+    def _changed_box(self, data, rows, mode):
+        """
+        Locates the box bounding the bytes which differ from the previous
+        frame, given that some do.
+        """
+        prev = self._data
+        n = len(data)
+        stride = n // rows
+        view = _view(data)
+        hint_top, hint_bottom = self._changed_rows
+
+        # Unchanged rows at the top and bottom, by binary search on the
+        # length of the common prefix and suffix, first trying the rows which
+        # changed last time, as a change tends to recur in the same place
+        # (e.g. a ticking clock)
+        lo, hi = 0, rows
+        if 0 < hint_top < hi:
+            if prev.startswith(view[:hint_top * stride]):
+                lo = hint_top
+                if not prev.startswith(view[:(lo + 1) * stride]):
+                    hi = lo + 1
+            else:
+                hi = hint_top
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if prev.startswith(view[:mid * stride]):
+                lo = mid
+            else:
+                hi = mid
+        top = lo
+
+        lo, hi = 0, rows - top
+        hint = rows - hint_bottom
+        if 0 < hint < hi:
+            if prev.endswith(view[n - hint * stride:]):
+                lo = hint
+                if not prev.endswith(view[n - (lo + 1) * stride:]):
+                    hi = lo + 1
+            else:
+                hi = hint
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if prev.endswith(view[n - mid * stride:]):
+                lo = mid
+            else:
+                hi = mid
+        bottom = rows - lo
+        self._changed_rows = (top, bottom)
+
+        start, end = top * stride, bottom * stride
+        if end - start > _FOLD_BYTES:
+            # The rows' bytes as 8-bit images, one pixel per byte
+            size = (stride, bottom - top)
+            left, _, right, _ = ImageChops.difference(
+                Image.frombytes("L", size, _view(prev)[start:end]),
+                Image.frombytes("L", size, view[start:end])).getbbox()
         else:
-            return False
+            # The bits which differ in any of the rows, folded in halves onto
+            # one row; its first byte is the least significant
+            row = _int(_view(prev)[start:end]) ^ _int(view[start:end])
+            bits = stride * 8
+            count = bottom - top
+            while count > 1:
+                shift = (count - count // 2) * bits
+                row = row >> shift | row & ((1 << shift) - 1)
+                count -= count // 2
+            left = ((row & -row).bit_length() - 1) // 8
+            right = (row.bit_length() + 7) // 8
+
+        bpp = _raw_modes[mode][1]
+        return (left // bpp, top, (right + bpp - 1) // bpp, bottom)
 
     def inflate_bbox(self):
         """
@@ -76,6 +339,27 @@ class diff_to_previous(object):
         if self.bounding_box:
             return self.image.crop(self.bounding_box).getdata()
 
+    @property
+    def regions(self):
+        """
+        The list of ``(left, top, right, bottom)`` regions to redraw: just the
+        bounding box, if any.
+        """
+        return [self.bounding_box] if self.bounding_box else []
+
+    def retain(self, image):
+        """
+        Records the image as the previous frame without calculating any
+        differences, for when the device was updated by other means.
+
+        :param image: The image now shown on the device
+        :type image: PIL.Image.Image
+        """
+        self._data = image.tobytes("raw", _raw_modes[image.mode][0])
+        self._keep(image)
+        self.bounding_box = None
+        self._changed_rows = (0, 0)
+
 
 class full_frame(object):
     """
@@ -87,8 +371,12 @@ class full_frame(object):
 
     :param device: The target device, used to determine the bounding box.
     :type device: luma.core.device.device
+    :param log_interval: Seconds between logged :py:class:`statistics`
+        summaries, or ``None`` (default) to not log them.
+    :type log_interval: float
     """
-    def __init__(self, device):
+    def __init__(self, device, log_interval=None):
+        self.statistics = statistics(device.mode, log_interval, type(self).__name__)
         self.bounding_box = (0, 0, device.width, device.height)
 
     def redraw_required(self, image):
@@ -101,6 +389,8 @@ class full_frame(object):
         :returns: ``True`` always.
         """
         self.image = image
+        self.bounding_box = (0, 0) + image.size
+        self.statistics.record(image.size, self.regions, 0)
         return True
 
     def inflate_bbox(self):
@@ -118,3 +408,327 @@ class full_frame(object):
         :rtype: iterable
         """
         return self.image.getdata()
+
+    @property
+    def regions(self):
+        """
+        The list of regions to redraw: always the whole image.
+        """
+        return [self.bounding_box]
+
+    def retain(self, image):
+        """
+        Nothing needs to be remembered, as every frame is rendered in full.
+        """
+        pass
+
+
+_nonzero = [0] + [255] * 255
+
+
+class tiled_diff(object):
+    """
+    Compares the current frame to the previous frame a tile at a time, and
+    describes the differences as a list of rectangles rather than a single
+    bounding box, so that changes in opposite corners of the screen do not
+    cause the whole screen to be redrawn.
+
+    The changed tiles are combined into rectangles as long as that is cheaper
+    than redrawing them separately, where every rectangle costs ``overhead``
+    plus its area, both measured in pixels. The overhead should reflect the
+    cost of addressing a new window on the device, relative to sending a
+    single pixel.
+
+    Tile edges are multiples of the tile size, so choosing a tile width that
+    is a multiple of the controller's column granularity (e.g. 4 pixels for
+    the SSD1322) keeps every rectangle aligned.
+
+    :param device: the target device, used to determine the initial 'previous'
+        image.
+    :type device: luma.core.device.device
+    :param tile_size: the ``(width, height)`` of the tiles, in pixels.
+    :type tile_size: tuple
+    :param overhead: the cost of an extra rectangle, in pixels.
+    :type overhead: int
+    :param log_interval: Seconds between logged :py:class:`statistics`
+        summaries, or ``None`` (default) to not log them.
+    :type log_interval: float
+    """
+    def __init__(self, device, tile_size=(8, 8), overhead=64, log_interval=None):
+        self.statistics = statistics(device.mode, log_interval, type(self).__name__)
+        self.image = Image.new(device.mode, device.size, "white")
+        self.tile_size = tile_size
+        self.overhead = overhead
+        self.bounding_box = None
+        self.regions = []
+
+    def redraw_required(self, image):
+        """
+        Calculates the rectangles which differ from the previous image,
+        returning a boolean indicating whether a redraw is required. As a side
+        effect the ``regions``, ``bounding_box`` and ``image`` attributes are
+        updated accordingly.
+
+        :param image: An image to render
+        :type image: PIL.Image.Image
+        :returns: ``True`` or ``False``
+        """
+        start = monotonic()
+        if self.image.size != image.size:
+            self.image = Image.new(image.mode, image.size, "white")
+
+        diff = ImageChops.difference(self.image, image)
+        if diff.getbbox() is None:
+            self.bounding_box = None
+            self.regions = []
+        else:
+            self.regions = self._merge(self._changed_runs(diff), image.size)
+            self.bounding_box = (
+                min(r[0] for r in self.regions),
+                min(r[1] for r in self.regions),
+                max(r[2] for r in self.regions),
+                max(r[3] for r in self.regions))
+            self.image = image.copy()
+
+        self.statistics.record(image.size, self.regions, monotonic() - start)
+        return self.bounding_box is not None
+
+    def _changed_runs(self, diff):
+        """
+        Reduces the difference image to one byte per tile and returns the
+        horizontal runs of changed tiles as ``[left, top, right, bottom]``
+        lists in tile units. Gaps narrower than the overhead are bridged.
+        """
+        tw, th = self.tile_size
+        cols = (diff.width + tw - 1) // tw
+        rows = (diff.height + th - 1) // th
+
+        # Any changed pixel, in any band, becomes a non-zero mask pixel, and
+        # stays non-zero when averaged down to a column profile per tile row
+        # and again to one value per tile
+        if diff.mode != "1":
+            diff = diff.point(_nonzero * len(diff.getbands()))
+        mask = diff.convert("L").crop((0, 0, cols * tw, rows * th))
+        profile = mask.resize((cols * tw, rows), Image.BOX).point(_nonzero)
+        tiles = bytearray(profile.resize((cols, rows), Image.BOX).tobytes())
+
+        max_gap = self.overhead // (tw * th)
+        runs = []
+        for y in range(rows):
+            run = None
+            gap = 0
+            for x in range(cols):
+                if tiles[y * cols + x]:
+                    if run is not None and gap <= max_gap:
+                        run[2] = x + 1
+                    else:
+                        run = [x, y, x + 1, y + 1]
+                        runs.append(run)
+                    gap = 0
+                else:
+                    gap += 1
+
+        return runs
+
+    def _merge(self, runs, size):
+        """
+        Combines the tile runs into rectangles while the combined rectangle
+        costs no more than the two separately, and converts them to clipped
+        pixel coordinates.
+        """
+        tw, th = self.tile_size
+        overhead = self.overhead / float(tw * th)
+
+        def area(r):
+            return (r[2] - r[0]) * (r[3] - r[1])
+
+        rects = [tuple(r) for r in runs]
+        bbox = (min(r[0] for r in rects), min(r[1] for r in rects),
+                max(r[2] for r in rects), max(r[3] for r in rects))
+        if overhead + area(bbox) <= sum(overhead + area(r) for r in rects):
+            rects = [bbox]
+
+        merged = True
+        while merged:
+            merged = False
+            i = 0
+            while i < len(rects):
+                j = i + 1
+                while j < len(rects):
+                    a, b = rects[i], rects[j]
+                    union = (min(a[0], b[0]), min(a[1], b[1]),
+                             max(a[2], b[2]), max(a[3], b[3]))
+                    if area(union) <= overhead + area(a) + area(b):
+                        rects[i] = union
+                        del rects[j]
+                        merged = True
+                        j = i + 1
+                    else:
+                        j += 1
+                i += 1
+
+        w, h = size
+        return sorted((left * tw, top * th, min(right * tw, w), min(bottom * th, h))
+                      for left, top, right, bottom in rects)
+
+    def inflate_bbox(self):
+        """
+        Realign the left and right edges of the bounding box such that they are
+        inflated to align modulo 4, as for :py:class:`diff_to_previous`.
+        """
+        left, top, right, bottom = self.bounding_box
+        self.bounding_box = (left & ~3, top, right + -right % 4, bottom)
+        return self.bounding_box
+
+    def getdata(self):
+        """
+        A sequence of pixel data within the bounding box of the changes that
+        occurred since :py:func:`redraw_required` was last called.
+
+        :returns: A sequence of pixels or ``None``
+        :rtype: iterable
+        """
+        if self.bounding_box:
+            return self.image.crop(self.bounding_box).getdata()
+
+    def retain(self, image):
+        """
+        Records the image as the previous frame without calculating any
+        differences, for when the device was updated by other means.
+
+        :param image: The image now shown on the device
+        :type image: PIL.Image.Image
+        """
+        self.image = image.copy()
+        self.bounding_box = None
+        self.regions = []
+
+
+class adaptive(diff_to_previous):
+    """
+    Switches between differencing and full frame updates, depending on which
+    is cheaper for the frames actually being displayed.
+
+    Every differenced frame is scored with the bus time it saved, the bytes
+    outside of the changed area divided by the throughput of the device's
+    serial interface, less the time spent calculating the difference. The
+    throughput is as measured by the device (see
+    :py:attr:`luma.core.device.device.bytes_per_second`), unless given; it
+    must be given for a device whose interface cannot measure it, such as a
+    :py:class:`luma.core.interface.remote.client`.
+
+    While the average score over the last ``window`` frames is negative
+    (e.g. during full-screen animation), frames are sent in full without
+    calculating differences, other than checking whether the frame changed
+    at all. Every ``probe_interval`` full frames one is differenced again,
+    and a positive score switches back.
+
+    The decisions are counted in the ``frames``, ``diffed``, ``full``,
+    ``skipped``, ``probes`` and ``switches`` attributes, and ``mode`` is
+    either ``"diff"`` or ``"full"``.
+
+    :param device: the target device, used to determine the initial 'previous'
+        image.
+    :type device: luma.core.device.device
+    :param bytes_per_second: The throughput of the device's serial interface,
+        to use instead of the measured one, e.g. for a device which does not
+        measure it. Until something has been measured, 500000 is assumed.
+    :type bytes_per_second: int
+    :param bits_per_pixel: The number of bits the device sends per pixel,
+        by default estimated from the device's mode.
+    :type bits_per_pixel: int
+    :param window: The number of frames to average the score over.
+    :type window: int
+    :param probe_interval: The number of full frames between differenced ones.
+    :type probe_interval: int
+    :param log_interval: Seconds between logged :py:class:`statistics`
+        summaries, or ``None`` (default) to not log them.
+    :type log_interval: float
+    """
+    def __init__(self, device, bytes_per_second=None, bits_per_pixel=None,
+                 window=8, probe_interval=30, log_interval=None):
+        super(adaptive, self).__init__(device, log_interval)
+        self._device = device
+        self._bytes_per_second = bytes_per_second
+        self.bits_per_pixel = bits_per_pixel or _bits_per_pixel.get(device.mode, 8)
+        self.statistics.bits_per_pixel = self.bits_per_pixel
+        self.probe_interval = probe_interval
+        self.scores = deque(maxlen=window)
+        self.mode = "diff"
+        self.frames = 0
+        self.diffed = 0
+        self.full = 0
+        self.skipped = 0
+        self.probes = 0
+        self.switches = 0
+        self._since_probe = 0
+
+    def redraw_required(self, image):
+        """
+        Decides whether, and how much of, the image needs to be redrawn. As for
+        :py:class:`diff_to_previous`, the ``bounding_box`` and ``image``
+        attributes are updated; in full mode the bounding box covers the whole
+        image whenever it changed.
+
+        :param image: An image to render
+        :type image: PIL.Image.Image
+        :returns: ``True`` or ``False``
+        """
+        self.frames += 1
+        if self.mode == "full" and self._since_probe < self.probe_interval:
+            self._since_probe += 1
+            start = monotonic()
+            data = image.tobytes("raw", _raw_modes[image.mode][0])
+            changed = data != self._data or (image.mode, image.size) != self._format
+            self._data = data
+            self.bounding_box = (0, 0) + image.size if changed else None
+            if changed:
+                self._keep(image)
+                self.full += 1
+            else:
+                self.skipped += 1
+            self.statistics.record(image.size, self.regions, monotonic() - start)
+            return changed
+
+        start = monotonic()
+        changed = super(adaptive, self).redraw_required(image)
+        elapsed = monotonic() - start
+
+        width, height = image.size
+        dirty = 0
+        if changed:
+            left, top, right, bottom = self.bounding_box
+            dirty = (right - left) * (bottom - top)
+        saved = (width * height - dirty) * self.bits_per_pixel / 8.0
+        score = saved / self.bytes_per_second - elapsed
+
+        if self.mode == "full":
+            self.probes += 1
+            self._since_probe = 0
+            if score > 0:
+                self._switch("diff")
+        else:
+            self.scores.append(score)
+            if len(self.scores) == self.scores.maxlen and sum(self.scores) < 0:
+                self._switch("full")
+
+        self.diffed += 1
+        if not changed:
+            self.skipped += 1
+        return changed
+
+    @property
+    def bytes_per_second(self):
+        """
+        The throughput used to score frames: as given, or else as measured by
+        the device.
+        """
+        return float(self._bytes_per_second or
+                     getattr(self._device, "bytes_per_second", None) or
+                     _DEFAULT_BYTES_PER_SECOND)
+
+    def _switch(self, mode):
+        self.mode = mode
+        self.switches += 1
+        self.scores.clear()
+        self._since_probe = 0
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Sends commands and data over a serial interface from a background thread,
+so that the caller can get on with rendering the next frame while the
+previous one is on the wire.
+"""
+
+from collections import deque
+from threading import Condition, Thread
+
+from luma.core.interface.serial import transfer
+from luma.core.sprite_system import monotonic
+
+
+__all__ = ["asynchronous"]
+
+
+# Data segments shorter than this are compared exactly when deciding whether
+# one frame supersedes another, as some controllers (the SSD1322) take their
+# addressing arguments as data
+_ARGUMENTS_SIZE = 8
+
+
+def _layout(segments):
+    """
+    Returns what determines where a frame's data ends up on the display: its
+    commands, short data and the lengths of the rest of its data.
+    """
+    return [bytes(buf) if not is_data or len(buf) < _ARGUMENTS_SIZE else len(buf)
+            for is_data, buf in segments]
+
+
+class asynchronous(object):
+    """
+    Wraps a serial interface, queueing everything sent to it and returning
+    straight away, while a writer thread sends the queue on in order. Other
+    attributes are those of the wrapped interface.
+
+    Each transfer, which is how a device sends a frame within a
+    :py:func:`luma.core.device.device.transaction`, counts as a frame. When
+    ``queue_size`` items are already waiting, a new frame which writes to
+    the same places as the last one queued (e.g. another whole frame)
+    replaces it, so that only the latest is sent; anything else waits for
+    room in the queue. Commands and data sent on their own are never
+    dropped, and everything is sent in the order it was queued.
+
+    As sending is deferred, call :py:func:`flush` where a command must
+    have reached the display before carrying on, e.g. after ``hide()``
+    before powering the display down, or between the SSD1331 drawing
+    commands, which rely on the caller waiting for each to complete. An
+    error raised by the wrapped interface is raised again by the next call
+    made, and :py:func:`cleanup` sends anything still queued first.
+
+    The writer thread times what it sends, and ``bytes_per_second`` holds the
+    throughput of the wrapped interface, weighted towards recent sends, or
+    ``None`` until something has been sent. As the wrapper is ``deferred``, a
+    device reports this as its own ``bytes_per_second``.
+
+    :param serial_interface: the interface to wrap.
+    :param queue_size: the number of items which may be waiting to be sent.
+    :type queue_size: int
+    """
+    deferred = True
+
+    def __init__(self, serial_interface, queue_size=2):
+        assert(queue_size >= 1)
+        self._serial_interface = serial_interface
+        self._queue_size = queue_size
+        self._queue = deque()
+        self._condition = Condition()
+        self._busy = False
+        self._closed = False
+        self._error = None
+        self.superseded = 0
+        self.bytes_per_second = None
+        self._sent_bytes = 0.0
+        self._sent_seconds = 0.0
+
+        self._thread = Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __getattr__(self, attr):
+        return getattr(self._serial_interface, attr)
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _put(self, is_frame, send, args, nbytes):
+        with self._condition:
+            self._raise_error()
+            if self._closed:
+                # Cleaned up already, so there is nothing left to wait for
+                send(*args)
+                return
+            layout = _layout(args[0]) if is_frame else None
+            while len(self._queue) >= self._queue_size:
+                last = self._queue[-1]
+                if is_frame and last[0] == layout:
+                    self._queue[-1] = (layout, send, args, nbytes)
+                    self.superseded += 1
+                    return
+                self._condition.wait()
+                self._raise_error()
+            self._queue.append((layout, send, args, nbytes))
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                _, send, args, nbytes = self._queue.popleft()
+                self._busy = True
+                self._condition.notify_all()
+
+            try:
+                start = monotonic()
+                send(*args)
+                self._measure(nbytes, monotonic() - start)
+            except Exception as e:
+                with self._condition:
+                    self._error = self._error or e
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _measure(self, nbytes, seconds):
+        # As for luma.core.device.device, older sends count for less
+        self._sent_bytes = self._sent_bytes * 0.9 + nbytes
+        self._sent_seconds = self._sent_seconds * 0.9 + seconds
+        if self._sent_seconds > 0:
+            self.bytes_per_second = self._sent_bytes / self._sent_seconds
+
+    def command(self, *cmd):
+        """
+        Queues a command or sequence of commands.
+
+        :param cmd: a spread of commands
+        :type cmd: int
+        """
+        self._put(False, self._serial_interface.command, cmd, len(cmd))
+
+    def data(self, data):
+        """
+        Queues a data byte or sequence of data bytes.
+
+        :param data: a data sequence
+        :type data: list, bytearray
+        """
+        data = list(data)
+        self._put(False, self._serial_interface.data, (data,), len(data))
+
+    def transfer(self, segments):
+        """
+        Queues a sequence of ``(is_data, bytes)`` segments, to be sent as a
+        single transfer if the wrapped interface supports it. The segments
+        must not be changed afterwards.
+
+        :param segments: the segments to send, in order
+        :type segments: list
+        """
+        self._put(True, self._transfer, (segments,), sum(len(buf) for _, buf in segments))
+
+    def _transfer(self, segments):
+        transfer(self._serial_interface, segments)
+
+    def flush(self):
+        """
+        Waits until everything queued has been sent. Once cleaned up,
+        everything is sent straight away.
+        """
+        with self._condition:
+            while self._queue or self._busy:
+                self._condition.wait()
+            self._raise_error()
+
+    def cleanup(self):
+        """
+        Sends anything still queued, stops the writer thread and cleans up
+        the wrapped interface.
+        """
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            self._thread.join()
+            self._serial_interface.cleanup()
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Records everything sent over a serial interface, with timestamps, to a
+compact binary log, and replays such recordings to any serial interface,
+real or simulated.
+
+A recording starts with a header, followed by one record per call to
+``command``, ``data`` or ``transfer``: a kind byte, the microseconds since
+the previous record and the length of the payload (as little-endian 32-bit
+integers), then the payload itself. The payload of a transfer is its
+segments, each a byte which is 1 for data or 0 for commands, a length and
+the bytes.
+"""
+
+import struct
+import time
+
+from luma.core.interface.serial import transfer
+
+
+__all__ = ["recorder", "records", "replay", "frames"]
+
+
+HEADER = b"LUMAREC\x01"
+COMMAND, DATA, TRANSFER = 0, 1, 2
+
+_record = struct.Struct("<BII")
+_segment = struct.Struct("<BI")
+
+
+class recorder(object):
+    """
+    Wraps a serial interface, passing everything on to it and at the same
+    time recording it. Other attributes are those of the wrapped interface.
+
+    :param serial_interface: the interface to wrap.
+    :param fp: the file to record to, either a path or a file object opened
+        for writing in binary mode.
+    """
+    def __init__(self, serial_interface, fp):
+        self._serial_interface = serial_interface
+        self._managed = not hasattr(fp, "write")
+        self._fp = open(fp, "wb") if self._managed else fp
+        self._fp.write(HEADER)
+        self._last = time.time()
+
+    def __getattr__(self, attr):
+        return getattr(self._serial_interface, attr)
+
+    def _write(self, kind, payload):
+        now = time.time()
+        delta = min(max(int((now - self._last) * 1000000), 0), 0xFFFFFFFF)
+        # Keep the remainder, so that rounding errors do not add up
+        self._last += delta / 1000000.0
+        self._fp.write(_record.pack(kind, delta, len(payload)))
+        self._fp.write(payload)
+
+    def command(self, *cmd):
+        """
+        Records a command or sequence of commands, and sends them on.
+
+        :param cmd: a spread of commands
+        :type cmd: int
+        """
+        self._write(COMMAND, bytes(bytearray(cmd)))
+        self._serial_interface.command(*cmd)
+
+    def data(self, data):
+        """
+        Records a data byte or sequence of data bytes, and sends them on.
+
+        :param data: a data sequence
+        :type data: list, bytearray
+        """
+        self._write(DATA, bytes(bytearray(data)))
+        self._serial_interface.data(data)
+
+    def transfer(self, segments):
+        """
+        Records a sequence of ``(is_data, bytes)`` segments, and sends them on
+        as a single transfer if the wrapped interface supports it.
+
+        :param segments: the segments to send, in order
+        :type segments: list
+        """
+        payload = bytearray()
+        for is_data, buf in segments:
+            payload.extend(_segment.pack(int(is_data), len(buf)))
+            payload.extend(buf)
+        self._write(TRANSFER, bytes(payload))
+        transfer(self._serial_interface, segments)
+
+    def cleanup(self):
+        """
+        Cleans up the wrapped interface, and closes the recording if it was
+        opened from a path.
+        """
+        try:
+            self._serial_interface.cleanup()
+        finally:
+            if self._managed:
+                self._fp.close()
+            else:
+                self._fp.flush()
+
+
+def records(fp):
+    """
+    Reads a recording, yielding a ``(seconds, kind, payload)`` tuple for each
+    record, where ``seconds`` is the time since the start of the recording.
+    The payload of a ``COMMAND`` or ``DATA`` record is a bytearray, and that
+    of a ``TRANSFER`` is a list of ``(is_data, bytearray)`` segments.
+
+    :param fp: the recording, either a path or a file object opened for
+        reading in binary mode.
+    :raises ValueError: if it is not a recording.
+    """
+    managed = not hasattr(fp, "read")
+    if managed:
+        fp = open(fp, "rb")
+
+    try:
+        if fp.read(len(HEADER)) != HEADER:
+            raise ValueError("Not a recording")
+
+        elapsed = 0
+        while True:
+            header = fp.read(_record.size)
+            if len(header) < _record.size:
+                return
+            kind, delta, length = _record.unpack(header)
+            payload = bytearray(fp.read(length))
+            if len(payload) < length:
+                return
+            elapsed += delta
+
+            if kind == TRANSFER:
+                segments = []
+                i = 0
+                while i < length:
+                    is_data, n = _segment.unpack_from(bytes(payload[i:i + _segment.size]))
+                    i += _segment.size
+                    segments.append((bool(is_data), payload[i:i + n]))
+                    i += n
+                payload = segments
+
+            yield elapsed / 1000000.0, kind, payload
+    finally:
+        if managed:
+            fp.close()
+
+
+def _send(serial_interface, kind, payload):
+    if kind == COMMAND:
+        serial_interface.command(*payload)
+    elif kind == DATA:
+        serial_interface.data(list(payload))
+    else:
+        transfer(serial_interface, payload)
+
+
+def replay(fp, serial_interface, realtime=True, speed=1.0):
+    """
+    Sends a recording to a serial interface, returning the number of records
+    sent. A recording cut short, e.g. by a crash, is replayed up to where it
+    ends.
+
+    :param fp: the recording, as for :py:func:`records`.
+    :param serial_interface: the interface to send it to.
+    :param realtime: whether to keep to the pace at which it was recorded,
+        rather than send it as fast as possible.
+    :type realtime: bool
+    :param speed: how many times faster than recorded to replay, when
+        keeping to the original pace.
+    :type speed: float
+    :rtype: int
+    """
+    start = time.time()
+    count = 0
+    for seconds, kind, payload in records(fp):
+        if realtime:
+            delay = start + seconds / speed - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        _send(serial_interface, kind, payload)
+        count += 1
+    return count
+
+
+def frames(fp, model):
+    """
+    Replays a recording, as fast as possible, into a ``model`` of the display
+    controller's RAM (such as those in :py:mod:`luma.oled.ram`), yielding a
+    ``(seconds, image)`` pair each time data was sent.
+
+    :param fp: the recording, as for :py:func:`records`.
+    :param model: a serial interface with an ``image()`` method returning
+        what it was sent, as a :py:mod:`PIL.Image`.
+    """
+    for seconds, kind, payload in records(fp):
+        _send(model, kind, payload)
+        if kind == DATA or kind == TRANSFER and any(is_data for is_data, _ in payload):
+            yield seconds, model.image()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Shares each I²C bus between everything in the process which talks over it,
+e.g. a display, a keypad's port expander and some sensors on the same bus.
+:py:func:`open_bus` hands out handles to a single SMBus per bus number,
+which is closed once the last handle is, and every operation through a
+handle holds the bus's lock, so that operations from different threads do
+not interleave.
+
+When several threads are waiting for the bus, the one whose handle has the
+highest priority goes next, so that a latency-sensitive input read need not
+wait for a display to send the rest of a frame: display frames go out a
+block write at a time, and a read can get in between any two.
+"""
+
+import heapq
+import itertools
+from contextlib import contextmanager
+from threading import Condition, Lock, current_thread
+
+
+__all__ = ["open_bus", "bus_handle"]
+
+
+class _priority_lock(object):
+    """
+    A re-entrant lock which is handed over to the highest priority waiter,
+    or among equals, to the one which has waited longest.
+    """
+    def __init__(self):
+        self._condition = Condition()
+        self._waiting = []
+        self._tickets = itertools.count()
+        self._owner = None
+        self._depth = 0
+
+    def acquire(self, priority=0):
+        me = current_thread()
+        with self._condition:
+            if self._owner is me:
+                self._depth += 1
+                return
+
+            ticket = (-priority, next(self._tickets))
+            heapq.heappush(self._waiting, ticket)
+            while self._owner is not None or self._waiting[0] != ticket:
+                self._condition.wait()
+            heapq.heappop(self._waiting)
+            self._owner = me
+            self._depth = 1
+
+    def release(self):
+        with self._condition:
+            assert(self._owner is current_thread())
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                self._condition.notify_all()
+
+
+class _shared_bus(object):
+    """
+    An open SMBus, its lock and the number of handles to it.
+    """
+    def __init__(self, port, bus):
+        self.port = port
+        self.bus = bus
+        self.lock = _priority_lock()
+        self.references = 0
+
+
+_buses = {}
+_buses_lock = Lock()
+
+
+def open_bus(port, priority=0, factory=None):
+    """
+    Returns a handle to the SMBus for I²C bus ``port``, opening it if it is
+    not already open.
+
+    :param port: The I²C bus number.
+    :type port: int
+    :param priority: The priority of operations made through the handle,
+        higher going first; e.g. 0 for a display and 10 for reading input.
+    :type priority: int
+    :param factory: What opens the bus given its number, only used if it is
+        not already open: `smbus2 <https://pypi.python.org/pypi/smbus2>`_'s
+        ``SMBus`` by default.
+    :rtype: bus_handle
+    """
+    with _buses_lock:
+        shared = _buses.get(port)
+        if shared is None:
+            if factory is None:
+                from smbus2 import SMBus as factory
+            shared = _buses[port] = _shared_bus(port, factory(port))
+        shared.references += 1
+    return bus_handle(shared, priority)
+
+
+class bus_handle(object):
+    """
+    A handle to a shared SMBus, as returned by :py:func:`open_bus`, which
+    offers the same methods as the SMBus itself, each made holding the bus
+    lock at the handle's priority.
+    """
+    def __init__(self, shared, priority):
+        self._shared = shared
+        self.priority = priority
+
+    def __getattr__(self, attr):
+        if self._shared is None:
+            raise AttributeError(attr)
+
+        method = getattr(self._shared.bus, attr)
+        if not callable(method):
+            return method
+
+        lock = self._shared.lock
+
+        def locked(*args, **kwargs):
+            lock.acquire(self.priority)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                lock.release()
+
+        return locked
+
+    @contextmanager
+    def lock(self, priority=None):
+        """
+        Holds the bus for the duration of a with-block, e.g. so that a
+        register write and the read which follows it are not separated.
+
+        :param priority: The priority to wait for the bus with, by default
+            that of the handle.
+        :type priority: int
+        """
+        lock = self._shared.lock
+        lock.acquire(self.priority if priority is None else priority)
+        try:
+            yield self
+        finally:
+            lock.release()
+
+    def close(self):
+        """
+        Gives up the handle, closing the bus if it is the last one.
+        """
+        shared, self._shared = self._shared, None
+        if shared is None:
+            return
+
+        with _buses_lock:
+            shared.references -= 1
+            if shared.references == 0:
+                del _buses[shared.port]
+                shared.bus.close()
@@ -0,0 +1,463 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Drives a display attached to another machine, over TCP or a Unix socket. A
+:py:class:`server` runs next to the display and owns its real serial
+interface, e.g.::
+
+    $ python -m luma.core.interface.remote --listen 0.0.0.0:5151 --interface i2c --i2c-port 2
+
+and any device can then be created elsewhere with a :py:class:`client` as
+its serial interface::
+
+    device = ssd1306(client(("pocketchip.local", 5151), compress=True))
+
+Each call of ``command``, ``data`` or ``transfer`` goes over as one message,
+so a frame sent within a device transaction is a single message. Messages
+are pipelined: the client carries on without waiting until ``window`` of
+them are unacknowledged. The server acknowledges each once sent on, and any
+error it met is raised by the client on a later call.
+
+There is no authentication, so the server listens on ``127.0.0.1:5151``
+unless told otherwise, and should only be given an address on a network
+whose machines are all trusted, or a Unix socket. A message which cannot be
+decoded, or which is over :py:data:`MAX_LENGTH` bytes either as sent or once
+decompressed, is rejected and that client disconnected, while the server
+carries on serving the next.
+
+A message is a header of its sequence number, kind (0 for command, 1 for
+data, 2 for transfer) and payload length, then the payload: its segments,
+each a header of whether it is data, its encoding and its length, then the
+bytes. Data may be encoded with zlib, or as the zlib compressed exclusive
+or with the previous data segment of the same length, which for a changing
+picture is mostly zeros. An acknowledgement is the sequence number, a status
+(non-zero for an error) and the length of an error message, then the
+message.
+"""
+
+import argparse
+import errno
+import os
+import socket
+import stat
+import struct
+import zlib
+from collections import OrderedDict
+
+import luma.core.error
+from luma.core.interface.serial import transfer
+
+
+__all__ = ["client", "server"]
+
+
+COMMAND, DATA, TRANSFER = 0, 1, 2
+RAW, ZLIB, DELTA = 0, 1, 2
+
+# The longest message the server accepts, and the longest a segment may
+# decompress to, well over a frame for any display driven this way
+MAX_LENGTH = 1 << 20
+
+_message = struct.Struct("<IBI")
+_segment = struct.Struct("<BBI")
+_ack = struct.Struct("<IBH")
+
+# Data shorter than this is never worth compressing
+_COMPRESS_SIZE = 64
+# The number of earlier data segments, of different lengths, kept to encode
+# deltas against
+_REFERENCES = 16
+
+
+try:
+    int.from_bytes
+
+    def _xor(a, b):
+        return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(len(a), "little")
+except AttributeError:
+    def _xor(a, b):
+        return bytes(bytearray(x ^ y for x, y in zip(bytearray(a), bytearray(b))))
+
+
+def _socket(address):
+    """
+    Returns a socket for a ``(host, port)`` pair, or a Unix socket path.
+    """
+    if isinstance(address, tuple):
+        return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+
+def _recv(sock, n):
+    """
+    Reads exactly ``n`` bytes, or returns ``None`` if the connection was
+    closed first.
+    """
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+class _references(object):
+    """
+    The data segments most recently sent, by length, which the client and
+    server both keep so as to agree on what each delta is against.
+    """
+    def __init__(self):
+        self._segments = OrderedDict()
+
+    def swap(self, data):
+        """
+        Returns the previous segment of the same length, if any, and keeps
+        ``data`` in its place.
+        """
+        previous = self._segments.pop(len(data), None)
+        self._segments[len(data)] = data
+        if len(self._segments) > _REFERENCES:
+            self._segments.popitem(last=False)
+        return previous
+
+    def get(self, length):
+        """
+        Returns the previous segment of the given length, or ``None`` if
+        there is none.
+        """
+        return self._segments.get(length)
+
+
+def _inflate(buf):
+    """
+    Decompresses a segment, so long as it is no longer than
+    :py:data:`MAX_LENGTH`.
+    """
+    inflater = zlib.decompressobj()
+    buf = inflater.decompress(buf, MAX_LENGTH)
+    if inflater.unconsumed_tail:
+        raise ValueError("Segment decompresses to over {0} bytes".format(MAX_LENGTH))
+    if not getattr(inflater, "eof", True):
+        raise ValueError("Segment is cut short")
+    return buf
+
+
+def _decode(payload, references):
+    """
+    Returns the ``(is_data, bytearray)`` segments of a message's payload,
+    keeping ``references`` in step with the client's.
+
+    :raises ValueError: if the payload cannot be decoded.
+    """
+    segments = []
+    i = 0
+    try:
+        while i < len(payload):
+            is_data, encoding, n = _segment.unpack_from(payload, i)
+            i += _segment.size
+            if encoding not in (RAW, ZLIB, DELTA):
+                raise ValueError("Unknown encoding: {0}".format(encoding))
+            if i + n > len(payload):
+                raise ValueError("Segment runs past the end of the message")
+            buf = payload[i:i + n]
+            i += n
+            if encoding != RAW:
+                buf = _inflate(buf)
+            if encoding == DELTA:
+                previous = references.get(len(buf))
+                if previous is None:
+                    raise ValueError("No earlier segment of {0} bytes to apply a delta to".format(len(buf)))
+                buf = _xor(buf, previous)
+            if is_data and len(buf) >= _COMPRESS_SIZE:
+                references.swap(buf)
+            segments.append((bool(is_data), bytearray(buf)))
+    except (struct.error, zlib.error) as e:
+        raise ValueError(str(e))
+    return segments
+
+
+class client(object):
+    """
+    A serial interface which sends everything on to a :py:class:`server`.
+
+    :param address: a ``(host, port)`` pair to connect to over TCP, or the
+        path of a Unix socket.
+    :param compress: Whether to compress data.
+    :type compress: bool
+    :param window: The number of messages which may be awaiting
+        acknowledgement before the client waits.
+    :type window: int
+    :raises luma.core.error.DeviceNotFoundError: The server could not be
+        reached.
+    :raises luma.core.error.RemoteError: The server failed to send something
+        on, raised by a later call.
+
+    As it is ``deferred``, devices cannot measure the throughput of the
+    server's interface through it: give
+    :py:class:`luma.core.framebuffer.adaptive` a ``bytes_per_second``.
+    """
+    deferred = True
+
+    def __init__(self, address, compress=False, window=8):
+        assert(window >= 1)
+        self._compress = compress
+        self._window = window
+        self._references = _references()
+        self._sequence = 0
+        self._unacknowledged = 0
+        self._error = None
+        self.bytes_sent = 0
+        self.payload_bytes = 0
+
+        self._sock = _socket(address)
+        try:
+            self._sock.connect(address)
+        except (IOError, OSError) as e:
+            self._sock.close()
+            if e.errno in [errno.ECONNREFUSED, errno.ENOENT]:
+                raise luma.core.error.DeviceNotFoundError(
+                    'Display server not found: {0}'.format(address))
+            else:  # pragma: no cover
+                raise
+        if isinstance(address, tuple):
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _encode(self, is_data, buf):
+        raw = bytes(bytearray(buf))
+        self.payload_bytes += len(raw)
+        encoding, encoded = RAW, raw
+
+        if is_data and self._compress and len(raw) >= _COMPRESS_SIZE:
+            previous = self._references.swap(raw)
+            compressed = zlib.compress(raw, 1)
+            if len(compressed) < len(encoded):
+                encoding, encoded = ZLIB, compressed
+            if previous is not None:
+                delta = zlib.compress(_xor(raw, previous), 1)
+                if len(delta) < len(encoded):
+                    encoding, encoded = DELTA, delta
+
+        return _segment.pack(int(is_data), encoding, len(encoded)) + encoded
+
+    def _send(self, kind, segments):
+        self._check()
+        payload = b"".join(self._encode(is_data, buf) for is_data, buf in segments)
+        message = _message.pack(self._sequence, kind, len(payload)) + payload
+        self._sock.sendall(message)
+        self.bytes_sent += len(message)
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+        self._unacknowledged += 1
+        while self._unacknowledged >= self._window:
+            self._receive_ack()
+
+    def _receive_ack(self):
+        header = _recv(self._sock, _ack.size)
+        if header is None:
+            raise luma.core.error.RemoteError('Display server closed the connection')
+        _, status, length = _ack.unpack(header)
+        message = _recv(self._sock, length) if length else b""
+        self._unacknowledged -= 1
+        if status and self._error is None:
+            self._error = luma.core.error.RemoteError(message.decode("utf-8", "replace"))
+
+    def _check(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def command(self, *cmd):
+        """
+        Sends a command or sequence of commands.
+
+        :param cmd: a spread of commands
+        :type cmd: int
+        """
+        self._send(COMMAND, [(False, cmd)])
+
+    def data(self, data):
+        """
+        Sends a data byte or sequence of data bytes.
+
+        :param data: a data sequence
+        :type data: list, bytearray
+        """
+        self._send(DATA, [(True, data)])
+
+    def transfer(self, segments):
+        """
+        Sends a sequence of ``(is_data, bytes)`` segments as one message, for
+        the server to send as a single transfer if its interface supports it.
+
+        :param segments: the segments to send, in order
+        :type segments: list
+        """
+        self._send(TRANSFER, segments)
+
+    def flush(self):
+        """
+        Waits until the server has acknowledged everything sent.
+
+        :raises luma.core.error.RemoteError: The server failed to send
+            something on.
+        """
+        while self._unacknowledged:
+            self._receive_ack()
+        self._check()
+
+    def cleanup(self):
+        """
+        Waits for everything sent to be acknowledged, then disconnects. The
+        server keeps the display as it is, ready for the next client.
+        """
+        try:
+            self.flush()
+        finally:
+            self._sock.close()
+
+
+class server(object):
+    """
+    Accepts connections from :py:class:`client` interfaces, one at a time,
+    and sends what they send on to a serial interface. A client which sends
+    something that cannot be decoded is disconnected, and the server goes
+    on to the next.
+
+    :param serial_interface: the interface of the display.
+    :param address: a ``(host, port)`` pair to listen on over TCP, or the
+        path of a Unix socket.
+    """
+    def __init__(self, serial_interface, address):
+        self._serial_interface = serial_interface
+        self._address = address
+        self._sock = _socket(address)
+        if isinstance(address, tuple):
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        elif os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+            # Left behind by a server which did not shut down cleanly
+            os.unlink(address)
+        self._sock.bind(address)
+        self._sock.listen(1)
+
+    @property
+    def address(self):
+        """
+        The address listened on, e.g. to find the port chosen when binding
+        to port 0.
+        """
+        return self._sock.getsockname()
+
+    def serve_forever(self):
+        """
+        Serves clients, one after another, until interrupted.
+        """
+        try:
+            while True:
+                self.serve_one()
+        finally:
+            self.close()
+
+    def serve_one(self):
+        """
+        Accepts one client, and serves it until it disconnects.
+        """
+        conn, _ = self._sock.accept()
+        try:
+            if isinstance(self._address, tuple):
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._serve(conn)
+        except socket.error:
+            # The client went away without disconnecting cleanly
+            pass
+        finally:
+            conn.close()
+
+    def _acknowledge(self, conn, sequence, error=None):
+        if error is None:
+            conn.sendall(_ack.pack(sequence, 0, 0))
+        else:
+            message = str(error).encode("utf-8")[:0xFFFF]
+            conn.sendall(_ack.pack(sequence, 1, len(message)) + message)
+
+    def _serve(self, conn):
+        references = _references()
+        while True:
+            header = _recv(conn, _message.size)
+            if header is None:
+                return
+            sequence, kind, length = _message.unpack(header)
+            if length > MAX_LENGTH:
+                self._acknowledge(conn, sequence, "Message of {0} bytes is over the limit of {1}".format(
+                    length, MAX_LENGTH))
+                return
+            payload = _recv(conn, length)
+            if payload is None:
+                return
+
+            # Decode everything before sending any of it, so that the
+            # references stay in step with the client's whatever happens.
+            # Once a message cannot be decoded they may not be, so nothing
+            # more from this client can be trusted.
+            try:
+                segments = _decode(payload, references)
+            except ValueError as e:
+                self._acknowledge(conn, sequence, "Bad message: {0}".format(e))
+                return
+
+            try:
+                if kind == COMMAND:
+                    self._serial_interface.command(*segments[0][1])
+                elif kind == DATA:
+                    self._serial_interface.data(list(segments[0][1]))
+                else:
+                    transfer(self._serial_interface, segments)
+            except Exception as e:
+                self._acknowledge(conn, sequence, e)
+            else:
+                self._acknowledge(conn, sequence)
+
+    def close(self):
+        """
+        Stops listening, and cleans up the serial interface.
+        """
+        self._sock.close()
+        try:
+            self._serial_interface.cleanup()
+        finally:
+            if not isinstance(self._address, tuple):
+                try:
+                    os.unlink(self._address)
+                except OSError:
+                    pass
+
+
+def main(argv=None):
+    from luma.core.cmdline import make_serial
+
+    parser = argparse.ArgumentParser(description="Serves a display to luma.core.interface.remote clients")
+    parser.add_argument("--listen", default="127.0.0.1:5151",
+                        help="host:port to listen on, or the path of a Unix socket. Clients are not "
+                        "authenticated, so only listen on a trusted network")
+    parser.add_argument("--interface", choices=["i2c", "spi"], default="i2c",
+                        help="Serial interface type")
+    parser.add_argument("--i2c-port", type=int, default=1, help="I2C bus number")
+    parser.add_argument("--i2c-address", type=str, default="0x3C", help="I2C display address")
+    parser.add_argument("--spi-port", type=int, default=0, help="SPI port number")
+    parser.add_argument("--spi-device", type=int, default=0, help="SPI device")
+    parser.add_argument("--spi-bus-speed", type=int, default=8000000, help="SPI max bus speed (Hz)")
+    parser.add_argument("--gpio", type=str, default=None, help="Alternative RPi.GPIO compatible implementation")
+    parser.add_argument("--gpio-data-command", type=int, default=24, help="GPIO pin for D/C (SPI devices only)")
+    parser.add_argument("--gpio-reset", type=int, default=25, help="GPIO pin for RESET (SPI devices only)")
+    args = parser.parse_args(argv)
+
+    host, sep, port = args.listen.rpartition(":")
+    address = (host, int(port)) if sep and port.isdigit() else args.listen
+
+    serial_interface = getattr(make_serial(args), args.interface)()
+    server(serial_interface, address).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,10 @@ Encapsulates sending commands and data over a serial interface, whether that
 is I²C, SPI or bit-banging GPIO.
 """
 
+import bisect
 import errno
+import logging
+import time
 try:
     # missing on OSX
     errno.EREMOTEIO
@@ -17,10 +20,229 @@ except:  # pragma: no cover
 import luma.core.error
 
 from luma.core import lib
+from luma.core.interface.registry import open_bus
+from luma.core.sprite_system import monotonic
 from luma.core.util import deprecation
 
 
-__all__ = ["i2c", "spi", "bitbang"]
+__all__ = ["i2c", "spi", "bitbang", "transfer"]
+
+
+# Upper bounds, in seconds, of the latency histogram buckets; the last
+# bucket counts anything slower
+_latency_buckets = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01,
+                    0.02, 0.05, 0.1)
+
+
+def transfer(serial_interface, segments):
+    """
+    Sends a sequence of ``(is_data, bytes)`` segments as one transfer where
+    the interface has a ``transfer`` method, or otherwise as calls of
+    ``command`` and ``data``, splitting commands into calls of up to the 32
+    bytes which may be sent in one go.
+
+    :param serial_interface: the interface to send the segments over.
+    :param segments: the segments to send, in order
+    :type segments: list
+    """
+    method = getattr(serial_interface, "transfer", None)
+    if method is not None:
+        method(segments)
+        return
+
+    for is_data, buf in segments:
+        if is_data:
+            serial_interface.data(list(buf))
+        else:
+            for i in range(0, len(buf), 32):
+                serial_interface.command(*buf[i:i + 32])
+
+
+class bus_statistics(object):
+    """
+    Running statistics of the I/O made through a serial interface: the bytes
+    of commands and data sent, the number of bus transactions they took, and
+    for each of the interface's ``command``, ``data`` and ``transfer``
+    methods, the number of calls, errors raised and a histogram of the time
+    each call took. Interfaces created with ``instrument=True`` keep one as
+    their ``statistics`` attribute.
+
+    :param name: The name to prefix logged summaries with.
+    :type name: str
+    :param log_interval: If given, the number of seconds between summaries
+        logged at INFO level on the ``luma.core.interface.serial`` logger.
+    :type log_interval: float
+    """
+    def __init__(self, name="serial", log_interval=None):
+        self.name = name
+        self.log_interval = log_interval
+        self.reset()
+
+    def reset(self):
+        """
+        Sets all counters back to zero.
+        """
+        self.bytes = {"command": 0, "data": 0}
+        self.transactions = 0
+        self.calls = {}
+        self.errors = {}
+        self.seconds = {}
+        self.histograms = {}
+        self._last_log = monotonic()
+
+    def record(self, method, command_bytes, data_bytes, elapsed, error=False):
+        """
+        Records one call of a serial interface method.
+
+        :param method: ``"command"``, ``"data"`` or ``"transfer"``.
+        :type method: str
+        :param command_bytes: The number of command bytes sent.
+        :type command_bytes: int
+        :param data_bytes: The number of data bytes sent.
+        :type data_bytes: int
+        :param elapsed: The number of seconds the call took.
+        :type elapsed: float
+        :param error: Whether the call raised an error.
+        :type error: bool
+        """
+        if method not in self.calls:
+            self.calls[method] = self.errors[method] = 0
+            self.seconds[method] = 0.0
+            self.histograms[method] = [0] * (len(_latency_buckets) + 1)
+
+        self.calls[method] += 1
+        self.seconds[method] += elapsed
+        self.histograms[method][bisect.bisect_left(_latency_buckets, elapsed)] += 1
+        if error:
+            self.errors[method] += 1
+        else:
+            self.bytes["command"] += command_bytes
+            self.bytes["data"] += data_bytes
+
+        if self.log_interval is not None and monotonic() - self._last_log >= self.log_interval:
+            self._last_log = monotonic()
+            logging.getLogger(__name__).info(str(self))
+
+    def percentile(self, method, p):
+        """
+        The time in seconds which ``p`` percent of the calls of ``method``
+        did not exceed, to the resolution of the histogram: the upper bound
+        of the bucket it falls in, or ``None`` if that is the last one.
+
+        :param method: ``"command"``, ``"data"`` or ``"transfer"``.
+        :type method: str
+        :param p: The percentile, between 0 and 100.
+        :type p: float
+        """
+        histogram = self.histograms.get(method)
+        if not histogram:
+            return 0.0
+        rank = self.calls[method] * p / 100.0
+        seen = 0
+        for bound, count in zip(_latency_buckets, histogram):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def summary(self):
+        """
+        Returns the statistics as a dictionary.
+
+        :rtype: dict
+        """
+        return {
+            "command_bytes": self.bytes["command"],
+            "data_bytes": self.bytes["data"],
+            "transactions": self.transactions,
+            "methods": dict((method, {
+                "calls": self.calls[method],
+                "errors": self.errors[method],
+                "seconds": self.seconds[method],
+                "p50": self.percentile(method, 50),
+                "p99": self.percentile(method, 99),
+                "histogram": list(zip(_latency_buckets + (None,), self.histograms[method]))
+            }) for method in self.calls)
+        }
+
+    def __str__(self):
+        s = self.summary()
+        methods = ", ".join(
+            "{0} {1} calls {2} errors {3:.3f} ms mean".format(
+                method, m["calls"], m["errors"], 1000 * m["seconds"] / max(1, m["calls"]))
+            for method, m in sorted(s["methods"].items()))
+        return "{0}: {1} command and {2} data bytes in {3} transactions; {4}".format(
+            self.name, s["command_bytes"], s["data_bytes"], s["transactions"], methods)
+
+    def timed(self, method, fn):
+        """
+        Returns a wrapper around the serial interface method ``fn`` which
+        records each call.
+        """
+        if method == "command":
+            def sizes(cmd):
+                return len(cmd), 0
+        elif method == "data":
+            def sizes(args):
+                return 0, len(args[0])
+        else:
+            def sizes(args):
+                command_bytes = data_bytes = 0
+                for is_data, buf in args[0]:
+                    if is_data:
+                        data_bytes += len(buf)
+                    else:
+                        command_bytes += len(buf)
+                return command_bytes, data_bytes
+
+        def wrapper(*args):
+            start = monotonic()
+            try:
+                result = fn(*args)
+            except Exception:
+                self.record(method, 0, 0, monotonic() - start, error=True)
+                raise
+            self.record(method, *sizes(args), elapsed=monotonic() - start)
+            return result
+
+        return wrapper
+
+    def counted(self, fn):
+        """
+        Returns a wrapper around ``fn`` which counts each call as a bus
+        transaction.
+        """
+        def wrapper(*args):
+            self.transactions += 1
+            return fn(*args)
+
+        return wrapper
+
+
+def _instrument(interface, name, log_interval):
+    """
+    Replaces the serial interface's methods with ones which record their
+    calls, so that nothing is spent on it unless asked for.
+    """
+    interface.statistics = bus_statistics(name, log_interval)
+    for method in ("command", "data", "transfer"):
+        setattr(interface, method,
+                interface.statistics.timed(method, getattr(interface, method)))
+
+
+class _counting_bus(object):
+    """
+    Wraps an SMBus, counting each write as a transaction.
+    """
+    def __init__(self, bus, statistics):
+        self._bus = bus
+        self._statistics = statistics
+
+    def __getattr__(self, attr):
+        value = getattr(self._bus, attr)
+        if attr in ("write_i2c_block_data", "i2c_rdwr"):
+            return self._statistics.counted(value)
+        return value
 
 
 class i2c(object):
@@ -29,7 +251,9 @@ class i2c(object):
     Circuit) interface to provide :py:func:`data` and :py:func:`command` methods.
 
     :param bus: a *smbus* implementation, if `None` is supplied (default),
-        `smbus2 <https://pypi.python.org/pypi/smbus2>`_ is used.
+        `smbus2 <https://pypi.python.org/pypi/smbus2>`_ is used, shared with
+        anything else in the process using the same port through
+        :py:func:`luma.core.interface.registry.open_bus`.
         Typically this is overridden in tests, or if there is a specific
         reason why `pysmbus <https://pypi.python.org/pypi/pysmbus>`_ must be used
         over smbus2
@@ -38,6 +262,16 @@ class i2c(object):
     :type port: int
     :param address: I²C address, default: 0x3C.
     :type address: int
+    :param priority: The priority of the display's operations on the bus
+        relative to those of other devices sharing it, when ``bus`` is not
+        supplied; see :py:mod:`luma.core.interface.registry`.
+    :type priority: int
+    :param instrument: Whether to keep :py:class:`bus_statistics` in the
+        ``statistics`` attribute.
+    :type instrument: bool
+    :param log_interval: With ``instrument``, the number of seconds between
+        logged summaries, if any.
+    :type log_interval: float
     :raises luma.core.error.DeviceAddressError: I2C device address is invalid.
     :raises luma.core.error.DeviceNotFoundError: I2C device could not be found.
     :raises luma.core.error.DevicePermissionError: Permission to access I2C device
@@ -49,10 +283,12 @@ class i2c(object):
        2. If ``bus`` is provided, there is an implicit expectation
           that it has already been opened.
     """
-    def __init__(self, bus=None, port=1, address=0x3C):
-        import smbus2
+    def __init__(self, bus=None, port=1, address=0x3C, priority=0,
+                 instrument=False, log_interval=None):
         self._cmd_mode = 0x00
         self._data_mode = 0x40
+        self._continue_mode = 0x80
+        self._max_write = 4096
 
         try:
             self._addr = int(str(address), 0)
@@ -62,7 +298,7 @@ class i2c(object):
 
         try:
             self._managed = bus is None
-            self._bus = bus or smbus2.SMBus(port)
+            self._bus = bus or open_bus(port, priority)
         except (IOError, OSError) as e:
             if e.errno == errno.ENOENT:
                 # FileNotFoundError
@@ -75,6 +311,11 @@ class i2c(object):
             else:  # pragma: no cover
                 raise
 
+        self.statistics = None
+        if instrument:
+            _instrument(self, "i2c", log_interval)
+            self._bus = _counting_bus(self._bus, self.statistics)
+
     def command(self, *cmd):
         """
         Sends a command or sequence of commands through to the I²C address
@@ -113,6 +354,58 @@ class i2c(object):
             write(self._addr, self._data_mode, list(data[i:i + 32]))
             i += 32
 
+    def transfer(self, segments):
+        """
+        Sends a sequence of ``(is_data, bytes)`` segments, such as those
+        queued by :py:func:`luma.core.device.device.transaction`. Where the
+        bus supports combined transactions (as smbus2's ``i2c_rdwr`` does),
+        each segment of data and any commands preceding it go out as a
+        single write: every command byte is framed by a control byte with
+        the continuation bit set, then one control byte introduces the
+        data. Otherwise the segments are sent as by :py:func:`command` and
+        :py:func:`data`, in blocks of up to 32 bytes.
+
+        :param segments: the segments to send, in order
+        :type segments: list
+        :raises luma.core.error.DeviceNotFoundError: I2C device could not be found.
+        """
+        try:
+            if hasattr(self._bus, "i2c_rdwr"):
+                self._transfer_combined(segments)
+            else:
+                write = self._bus.write_i2c_block_data
+                for is_data, buf in segments:
+                    mode = self._data_mode if is_data else self._cmd_mode
+                    for i in range(0, len(buf), 32):
+                        write(self._addr, mode, list(buf[i:i + 32]))
+        except (IOError, OSError) as e:
+            if e.errno in [errno.EREMOTEIO, errno.EIO]:
+                # I/O error
+                raise luma.core.error.DeviceNotFoundError(
+                    'I2C device not found on address: 0x{0:02X}'.format(self._addr))
+            else:  # pragma: no cover
+                raise
+
+    def _transfer_combined(self, segments):
+        from smbus2 import i2c_msg
+
+        framed = bytearray()
+        last = len(segments) - 1
+        for n, (is_data, buf) in enumerate(segments):
+            if not is_data and n < last:
+                for byte in buf:
+                    framed.append(self._continue_mode | self._cmd_mode)
+                    framed.append(byte)
+                continue
+
+            # Writes are limited in length, so long data is split up
+            mode = self._data_mode if is_data else self._cmd_mode
+            for i in range(0, max(len(buf), 1), self._max_write):
+                framed.append(mode)
+                framed.extend(buf[i:i + self._max_write])
+                self._bus.i2c_rdwr(i2c_msg.write(self._addr, framed))
+                framed = bytearray()
+
     def cleanup(self):
         """
         Clean up I²C resources
@@ -147,8 +440,15 @@ class bitbang(object):
     :type DC: int
     :param RST: The GPIO pin to connect reset (RES / RST) to.
     :type RST: int
+    :param instrument: Whether to keep :py:class:`bus_statistics` in the
+        ``statistics`` attribute.
+    :type instrument: bool
+    :param log_interval: With ``instrument``, the number of seconds between
+        logged summaries, if any.
+    :type log_interval: float
     """
-    def __init__(self, gpio=None, transfer_size=4096, **kwargs):
+    def __init__(self, gpio=None, transfer_size=4096, instrument=False,
+                 log_interval=None, **kwargs):
 
         self._transfer_size = transfer_size
         self._managed = gpio is None
@@ -166,6 +466,11 @@ class bitbang(object):
             self._gpio.output(self._RST, self._gpio.LOW)  # Reset device
             self._gpio.output(self._RST, self._gpio.HIGH)  # Keep RESET pulled high
 
+        self.statistics = None
+        if instrument:
+            _instrument(self, type(self).__name__, log_interval)
+            self._write_bytes = self.statistics.counted(self._write_bytes)
+
     def _configure(self, pin):
         if pin is not None:
             self._gpio.setup(pin, self._gpio.OUT)
@@ -216,6 +521,25 @@ class bitbang(object):
         if self._CE:
             gpio.output(self._CE, gpio.HIGH)
 
+    def transfer(self, segments):
+        """
+        Sends a sequence of ``(is_data, bytes)`` segments, such as those
+        queued by :py:func:`luma.core.device.device.transaction`, setting
+        the D/C line only when it changes between segments.
+
+        :param segments: the segments to send, in order
+        :type segments: list
+        """
+        mode = None
+        tx_sz = self._transfer_size
+        for is_data, buf in segments:
+            if self._DC and mode != is_data:
+                self._gpio.output(self._DC, self._data_mode if is_data else self._cmd_mode)
+                mode = is_data
+
+            for i in range(0, len(buf), tx_sz):
+                self._write_bytes(list(buf[i:i + tx_sz]))
+
     def cleanup(self):
         """
         Clean up GPIO resources if managed
@@ -253,12 +577,19 @@ class spi(bitbang):
     :type bcm_DC: int
     :param bcm_RST:  Deprecated. Use ``gpio_RST`` instead.
     :type bcm_RST: int
+    :param instrument: Whether to keep :py:class:`bus_statistics` in the
+        ``statistics`` attribute.
+    :type instrument: bool
+    :param log_interval: With ``instrument``, the number of seconds between
+        logged summaries, if any.
+    :type log_interval: float
     :raises luma.core.error.DeviceNotFoundError: SPI device could not be found.
     :raises luma.core.error.UnsupportedPlatform: GPIO access not available.
     """
     def __init__(self, spi=None, gpio=None, port=0, device=0,
                  bus_speed_hz=8000000, transfer_size=4096,
-                 gpio_DC=24, gpio_RST=25, bcm_DC=None, bcm_RST=None):
+                 gpio_DC=24, gpio_RST=25, bcm_DC=None, bcm_RST=None,
+                 instrument=False, log_interval=None):
         assert(bus_speed_hz in [mhz * 1000000 for mhz in [0.5, 1, 2, 4, 8, 16, 32]])
 
         if bcm_DC is not None:
@@ -269,7 +600,8 @@ class spi(bitbang):
             deprecation('bcm_RST argument is deprecated in favor of gpio_RST and will be removed in 1.0.0')
             gpio_RST = bcm_RST
 
-        bitbang.__init__(self, gpio, transfer_size, DC=gpio_DC, RST=gpio_RST)
+        bitbang.__init__(self, gpio, transfer_size, instrument, log_interval,
+                         DC=gpio_DC, RST=gpio_RST)
 
         try:
             self._spi = spi or self.__spidev__()
@@ -293,6 +625,147 @@ class spi(bitbang):
         super(spi, self).cleanup()
 
 
+class simulated(object):
+    """
+    Stands in for an :py:class:`i2c` or :py:class:`spi` interface, without
+    any hardware, accounting for the time each transfer would spend on the
+    wire so that the frame rate a driver can achieve over a given bus can be
+    estimated. Data is split up and framed as those interfaces would:
+
+    * I²C: every write costs a start condition, the address byte, a control
+      byte and a stop condition, with an acknowledge bit after every byte.
+      Writes are limited to 32 bytes, or with ``combined`` set, commands
+      are folded into the following data write, as :py:func:`i2c.transfer`
+      does over smbus2's ``i2c_rdwr``.
+    * SPI: 8 clocks per byte, and a GPIO write whenever the D/C line is set.
+
+    The wire time is accumulated in :py:attr:`elapsed`, alongside the number
+    of :py:attr:`transactions` and :py:attr:`bytes` sent (including any
+    framing).
+
+    :param bus: ``"i2c"`` (default) or ``"spi"``.
+    :type bus: str
+    :param bus_speed_hz: The bus clock rate, defaults to 400kHz for I²C and
+        8MHz for SPI.
+    :type bus_speed_hz: int
+    :param combined: Whether I²C transfers use combined writes.
+    :type combined: bool
+    :param transaction_delay: Seconds of overhead per transaction, e.g. for
+        the system call which makes it.
+    :type transaction_delay: float
+    :param gpio_delay: Seconds taken to set the D/C line.
+    :type gpio_delay: float
+    :param realtime: Whether to also sleep for the wire time, so that the
+        caller is held up as it would be by a real bus.
+    :type realtime: bool
+    """
+    def __init__(self, bus="i2c", bus_speed_hz=None, combined=False,
+                 transaction_delay=0, gpio_delay=0.000005, realtime=False):
+        assert(bus in ["i2c", "spi"])
+        self._spi = bus == "spi"
+        self._hz = bus_speed_hz or (8000000 if self._spi else 400000)
+        self._combined = combined
+        self._transfer_size = 4096 if self._spi or combined else 32
+        self._transaction_delay = transaction_delay
+        self._gpio_delay = gpio_delay
+        self._realtime = realtime
+        self._deadline = 0
+        self.reset()
+
+    def reset(self):
+        """
+        Zeroes the accumulated wire time, transactions and bytes.
+        """
+        self.elapsed = 0.0
+        self.transactions = 0
+        self.bytes = 0
+
+    def _wire(self, seconds):
+        self.elapsed += seconds
+        if self._realtime:
+            # Transfers queue behind one another, as on a busy bus
+            now = time.time()
+            self._deadline = max(self._deadline, now) + seconds
+            time.sleep(self._deadline - now)
+
+    def _write(self, nbytes):
+        self.transactions += 1
+        if self._spi:
+            self.bytes += nbytes
+            bits = 8 * nbytes
+        else:
+            # Start, the address and each byte with an ack, then stop
+            self.bytes += nbytes + 1
+            bits = 1 + 9 * (nbytes + 1) + 1
+        self._wire(float(bits) / self._hz + self._transaction_delay)
+
+    def _write_chunked(self, buf):
+        framing = 0 if self._spi else 1
+        for i in range(0, len(buf), self._transfer_size):
+            self._write(framing + len(buf[i:i + self._transfer_size]))
+
+    def _set_dc(self):
+        if self._spi:
+            self._wire(self._gpio_delay)
+
+    def command(self, *cmd):
+        """
+        Accounts for sending a command or sequence of commands.
+
+        :param cmd: a spread of commands
+        :type cmd: int
+        """
+        self._set_dc()
+        self._write(len(cmd) + (0 if self._spi else 1))
+
+    def data(self, data):
+        """
+        Accounts for sending a data byte or sequence of data bytes.
+
+        :param data: a data sequence
+        :type data: list, bytearray
+        """
+        self._set_dc()
+        self._write_chunked(data)
+
+    def transfer(self, segments):
+        """
+        Accounts for sending a sequence of ``(is_data, bytes)`` segments, as
+        :py:func:`i2c.transfer` or :py:func:`spi.transfer` would.
+
+        :param segments: the segments to send, in order
+        :type segments: list
+        """
+        if self._spi:
+            mode = None
+            for is_data, buf in segments:
+                if mode != is_data:
+                    self._set_dc()
+                    mode = is_data
+                self._write_chunked(buf)
+
+        elif self._combined:
+            pending = 0
+            last = len(segments) - 1
+            for n, (is_data, buf) in enumerate(segments):
+                if not is_data and n < last:
+                    pending += 2 * len(buf)
+                    continue
+                for i in range(0, max(len(buf), 1), self._transfer_size):
+                    self._write(pending + 1 + len(buf[i:i + self._transfer_size]))
+                    pending = 0
+
+        else:
+            for _, buf in segments:
+                self._write_chunked(buf)
+
+    def cleanup(self):
+        """
+        Nothing to clean up
+        """
+        pass
+
+
 class noop(object):
     """
     Does nothing, used for pseudo-devices / emulators / anything really
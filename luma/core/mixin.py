@@ -4,6 +4,16 @@
 
 from PIL import Image
 
+from luma.core.util import merge_regions
+
+
+# Single-step transpositions equivalent to rotating clockwise by 90° * rotate
+_transpositions = {
+    1: Image.ROTATE_270,
+    2: Image.ROTATE_180,
+    3: Image.ROTATE_90
+}
+
 
 class capabilities(object):
     """
@@ -23,10 +33,11 @@ class capabilities(object):
             no rotation, 1 is rotate 90° clockwise, 2 is 180° rotation and 3
             represents 270° rotation.
         :type rotate: int
-        :param mode: the supported color model, one of "1", "RGB" or "RGBA" only.
+        :param mode: the supported color model, one of "1", "L", "RGB" or
+            "RGBA" only.
         :type mode: str
         """
-        assert mode in ("1", "RGB", "RGBA")
+        assert mode in ("1", "L", "RGB", "RGBA")
         assert rotate in (0, 1, 2, 3)
         self._w = width
         self._h = height
@@ -57,12 +68,45 @@ class capabilities(object):
         if self.rotate == 0:
             return image
 
-        angle = self.rotate * -90
-        return image.rotate(angle, expand=True).crop((0, 0, self._w, self._h))
+        return image.transpose(_transpositions[self.rotate])
+
+    def preprocess_damage(self, damage, rotate=None):
+        """
+        Maps damaged regions of an image onto the coordinates of the image
+        returned by :py:func:`preprocess`, clipping them to the device and
+        merging any that overlap.
+
+        :param damage: A sequence of ``(left, top, right, bottom)`` regions,
+            where ``right`` and ``bottom`` are exclusive.
+        :param rotate: The rotation applied by :py:func:`preprocess`, if it
+            differs from the device's (e.g. because the display controller
+            performs some of it).
+        :type rotate: int
+        :returns: A list of regions in device coordinates.
+        :rtype: list
+        """
+        w, h = self.width, self.height
+        rotate = self.rotate if rotate is None else rotate
+        regions = []
+        for left, top, right, bottom in damage:
+            left, top = max(left, 0), max(top, 0)
+            right, bottom = min(right, w), min(bottom, h)
+            if rotate == 1:
+                left, top, right, bottom = h - bottom, left, h - top, right
+            elif rotate == 2:
+                left, top, right, bottom = w - right, h - bottom, w - left, h - top
+            elif rotate == 3:
+                left, top, right, bottom = top, w - right, bottom, w - left
+            regions.append((left, top, right, bottom))
+
+        return merge_regions(regions)
 
     def display(self, image):
         """
-        Should be overridden in sub-classed implementations.
+        Should be overridden in sub-classed implementations. Implementations
+        may accept an optional ``damage`` argument: a list of ``(left, top,
+        right, bottom)`` regions outside of which the image is known to be
+        unchanged since the previous call, or ``None`` if unknown.
 
         :param image: An image to display
         :type image: PIL.Image.Image
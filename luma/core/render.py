@@ -2,7 +2,228 @@
 # Copyright (c) 2017 Richard Hull and contributors
 # See LICENSE.rst for details.
 
-from PIL import Image, ImageDraw
+import math
+
+from PIL import Image, ImageChops, ImageDraw
+
+from luma.core.util import merge_regions
+
+
+def _bayer(n):
+    """
+    Builds an ``n`` x ``n`` Bayer index matrix, ``n`` being a power of two.
+    """
+    matrix = [[0]]
+    while len(matrix) < n:
+        size = len(matrix)
+        matrix = [[4 * matrix[y % size][x % size] +
+                   [[0, 2], [3, 1]][y // size][x // size]
+                   for x in range(size * 2)] for y in range(size * 2)]
+    return matrix
+
+
+_ordered_dither = {
+    "bayer4": 4,
+    "bayer8": 8
+}
+
+_threshold_tiles = {}
+
+
+def dither_surface(device_mode, dither):
+    """
+    Determines the image mode to draw in for a given dithering method: ordered
+    dithering onto a monochrome device draws in 8-bit greyscale ("L"),
+    error-diffusion draws in "RGB", and no dithering draws in the device's own
+    mode.
+
+    :param device_mode: The device's image mode.
+    :type device_mode: str
+    :param dither: ``False``, ``True`` (same as ``"floyd-steinberg"``),
+        ``"floyd-steinberg"``, ``"bayer4"`` or ``"bayer8"``.
+    :rtype: str
+    """
+    if not dither:
+        return device_mode
+    assert(dither is True or dither == "floyd-steinberg" or dither in _ordered_dither)
+    if dither in _ordered_dither and device_mode == "1":
+        return "L"
+    return "RGB"
+
+
+def dither_image(image, device_mode, dither):
+    """
+    Converts an image drawn on the surface chosen by :py:func:`dither_surface`
+    into the device's mode. Ordered dithering compares every pixel against a
+    precomputed, tiled Bayer threshold image, which is much cheaper than the
+    Floyd-Steinberg error diffusion done by ``Image.convert``.
+
+    :param image: The image to convert.
+    :type image: PIL.Image.Image
+    :param device_mode: The device's image mode.
+    :type device_mode: str
+    :param dither: The dithering method, as for :py:func:`dither_surface`.
+    :rtype: PIL.Image.Image
+    """
+    if dither not in _ordered_dither or device_mode != "1":
+        return image.convert(device_mode)
+
+    if image.mode != "L":
+        image = image.convert("L")
+
+    key = (dither, image.size)
+    tile = _threshold_tiles.get(key)
+    if tile is None:
+        n = _ordered_dither[dither]
+        pattern = Image.new("L", (n, n))
+        pattern.putdata([(v * 256 + 128) // (n * n) + 1
+                         for row in _bayer(n) for v in row])
+        tile = Image.new("L", image.size)
+        for y in range(0, image.height, n):
+            for x in range(0, image.width, n):
+                tile.paste(pattern, (x, y))
+        _threshold_tiles[key] = tile
+
+    # (grey - threshold + 128) is at least 128 exactly where grey reaches the
+    # threshold, which a plain, non-dithering conversion turns white
+    return ImageChops.subtract(image, tile, 1.0, 128).convert("1", dither=Image.NONE)
+
+
+class damage_tracker(object):
+    """
+    Wraps a :py:mod:`PIL.ImageDraw` object and records the bounding box of
+    every drawing primitive issued through it. Methods which are not known to
+    this class are passed through, and any of those which draw are treated as
+    having damaged the whole image.
+
+    :param draw: The drawing object to wrap.
+    :type draw: PIL.ImageDraw.ImageDraw
+    :param size: The size of the image being drawn upon.
+    :type size: tuple
+    """
+    _queries = ("textsize", "multiline_textsize", "textbbox",
+                "multiline_textbbox", "textlength", "getfont")
+
+    def __init__(self, draw, size):
+        self._draw = draw
+        self._size = size
+        self.regions = []
+
+    def __getattr__(self, attr):
+        value = getattr(self._draw, attr)
+        if attr in self._queries or not callable(value):
+            return value
+
+        def primitive(*args, **kwargs):
+            self.damage_all()
+            return value(*args, **kwargs)
+
+        return primitive
+
+    def damage(self, left, top, right, bottom):
+        """
+        Records a damaged region, where ``right`` and ``bottom`` are exclusive.
+        Fractional coordinates are rounded outwards.
+        """
+        self.regions.append((int(math.floor(left)), int(math.floor(top)),
+                             int(math.ceil(right)), int(math.ceil(bottom))))
+
+    def damage_all(self):
+        """
+        Records the whole image as damaged.
+        """
+        self.regions.append((0, 0) + tuple(self._size))
+
+    def _shape(self, xy, width=0):
+        if isinstance(xy[0], (tuple, list)):
+            xs = [p[0] for p in xy]
+            ys = [p[1] for p in xy]
+        else:
+            xs = xy[0::2]
+            ys = xy[1::2]
+        pad = width // 2 + 1
+        self.damage(min(xs) - pad, min(ys) - pad, max(xs) + pad + 1, max(ys) + pad + 1)
+
+    def _box(self, xy):
+        if isinstance(xy[0], (tuple, list)):
+            (left, top), (right, bottom) = xy
+        else:
+            left, top, right, bottom = xy
+        self.damage(min(left, right), min(top, bottom),
+                    max(left, right) + 1, max(top, bottom) + 1)
+
+    def point(self, xy, *args, **kwargs):
+        self._shape(xy)
+        return self._draw.point(xy, *args, **kwargs)
+
+    def line(self, xy, *args, **kwargs):
+        # Pass on only the arguments given, as the default width differs
+        # between PIL versions
+        self._shape(xy, kwargs.get("width", args[1] if len(args) > 1 else 1))
+        return self._draw.line(xy, *args, **kwargs)
+
+    def polygon(self, xy, *args, **kwargs):
+        self._shape(xy)
+        return self._draw.polygon(xy, *args, **kwargs)
+
+    def rectangle(self, xy, *args, **kwargs):
+        self._box(xy)
+        # Some PIL versions draw the outline of a rectangle one pixel high
+        # across two rows
+        left, top, right, bottom = self.regions[-1]
+        if bottom - top == 1:
+            self.regions[-1] = (left, top, right, bottom + 1)
+        return self._draw.rectangle(xy, *args, **kwargs)
+
+    def ellipse(self, xy, *args, **kwargs):
+        self._box(xy)
+        return self._draw.ellipse(xy, *args, **kwargs)
+
+    def arc(self, xy, *args, **kwargs):
+        self._box(xy)
+        return self._draw.arc(xy, *args, **kwargs)
+
+    def chord(self, xy, *args, **kwargs):
+        self._box(xy)
+        return self._draw.chord(xy, *args, **kwargs)
+
+    def pieslice(self, xy, *args, **kwargs):
+        self._box(xy)
+        return self._draw.pieslice(xy, *args, **kwargs)
+
+    def bitmap(self, xy, bitmap, *args, **kwargs):
+        x, y = xy
+        self.damage(x, y, x + bitmap.width, y + bitmap.height)
+        return self._draw.bitmap(xy, bitmap, *args, **kwargs)
+
+    _text_args = ("fill", "font", "anchor", "spacing", "align", "direction",
+                  "features", "language", "stroke_width")
+
+    def text(self, xy, text, *args, **kwargs):
+        kwargs.update(zip(self._text_args, args))
+        self._text(getattr(self._draw, "textbbox", None),
+                   getattr(self._draw, "textsize", None),
+                   xy, text, kwargs)
+        return self._draw.text(xy, text, **kwargs)
+
+    def multiline_text(self, xy, text, *args, **kwargs):
+        kwargs.update(zip(self._text_args, args))
+        self._text(getattr(self._draw, "multiline_textbbox", None),
+                   getattr(self._draw, "multiline_textsize", None),
+                   xy, text, kwargs)
+        return self._draw.multiline_text(xy, text, **kwargs)
+
+    def _text(self, bbox, size, xy, text, kwargs):
+        font = kwargs.get("font")
+        if bbox is not None:
+            options = dict((k, v) for k, v in kwargs.items()
+                           if k in self._text_args[1:])
+            self.damage(*bbox(xy, text, **options))
+        elif size is not None:
+            w, h = size(text, font=font)
+            self.damage(xy[0], xy[1], xy[0] + w, xy[1] + h)
+        else:
+            self.damage_all()
 
 
 class canvas(object):
@@ -15,32 +236,118 @@ class canvas(object):
     white when displayed on monochrome devices. However, this behaviour can be
     changed by adding ``dither=True`` and the image will be converted from RGB
     space into a 1-bit monochrome image where dithering is employed to
-    differentiate colors at the expense of resolution.
+    differentiate colors at the expense of resolution. ``dither`` may also
+    name the method: ``"floyd-steinberg"`` (the same as ``True``), or the
+    much faster ordered ``"bayer4"`` and ``"bayer8"`` methods, which draw
+    in 8-bit greyscale rather than RGB, so colors must be given by name or as
+    grey levels.
     If a ``background`` parameter is provided, the canvas is based on the given
     background. This is useful to e.g. write text on a given background image.
+
+    With ``damage=True``, the drawing object records the area touched by every
+    drawing primitive, and only those regions are passed on to the device as
+    ``display(image, damage=regions)``. This is intended for a canvas which is
+    retained and drawn upon repeatedly, where anything not redrawn stays as it
+    was; the first flush always covers the whole image. The device must
+    support the ``damage`` argument, as the ``ssd1306``, ``sh1106``,
+    ``ssd1322``, ``ssd1325`` and ``ssd1331`` drivers do.
     """
-    def __init__(self, device, background=None, dither=False):
+    def __init__(self, device, background=None, dither=False, damage=False):
         self.draw = None
         if background is None:
-            self.image = Image.new("RGB" if dither else device.mode, device.size)
+            self.image = Image.new(dither_surface(device.mode, dither), device.size)
         else:
             assert(background.size == device.size)
             self.image = background.copy()
         self.device = device
         self.dither = dither
+        self.damage = damage
+        self._flushed = False
 
     def __enter__(self):
         self.draw = ImageDraw.Draw(self.image)
+        if self.damage:
+            self.draw = damage_tracker(self.draw, self.image.size)
         return self.draw
 
     def __exit__(self, type, value, traceback):
         if type is None:
 
             if self.dither:
-                self.image = self.image.convert(self.device.mode)
+                self.image = dither_image(self.image, self.device.mode, self.dither)
 
             # do the drawing onto the device
-            self.device.display(self.image)
+            if not self.damage:
+                self.device.display(self.image)
+            elif self._flushed:
+                self.device.display(self.image,
+                                    damage=merge_regions(self.draw.regions))
+            else:
+                self.device.display(self.image, damage=None)
+                self._flushed = True
 
         del self.draw   # Tidy up the resources
         return False    # Never suppress exceptions
+
+
+class reusable_canvas(object):
+    """
+    A canvas which is created once and then reused for every frame, to avoid
+    allocating a new image each time. It holds a fixed number of preallocated
+    images which are cleared in place (or have the ``background`` pasted into
+    them) when the with-block is entered, and are used in turn, so the image
+    most recently flushed to the device is never drawn upon while the device
+    or its serial interface may still be using it.
+
+    :param device: The device to flush frames onto.
+    :param background: An optional image, the size of the device, which every
+        frame starts from.
+    :type background: PIL.Image.Image
+    :param dither: Dither down to the device's mode on flush, using any of
+        the methods supported by :py:class:`canvas`.
+    :type dither: bool or str
+    :param buffers: The number of images to use in turn, at least one.
+    :type buffers: int
+    """
+    def __init__(self, device, background=None, dither=False, buffers=2):
+        assert(buffers >= 1)
+        mode = dither_surface(device.mode, dither)
+        self.device = device
+        self.dither = dither
+        self.image = None
+        self._images = [Image.new(mode, device.size) for _ in range(buffers)]
+        self._draws = [ImageDraw.Draw(im) for im in self._images]
+        self._index = -1
+        self.background = background
+
+    @property
+    def background(self):
+        return self._background
+
+    @background.setter
+    def background(self, image):
+        if image is not None:
+            assert(image.size == self.device.size)
+            if image.mode != self._images[0].mode:
+                image = image.convert(self._images[0].mode)
+        self._background = image
+
+    def __enter__(self):
+        self._index = (self._index + 1) % len(self._images)
+        self.image = self._images[self._index]
+        if self._background is None:
+            self.image.paste(0, (0, 0) + self.image.size)
+        else:
+            self.image.paste(self._background)
+        return self._draws[self._index]
+
+    def __exit__(self, type, value, traceback):
+        if type is None:
+            image = self.image
+            if self.dither:
+                image = dither_image(image, self.device.mode, self.dither)
+
+            # do the drawing onto the device
+            self.device.display(image)
+
+        return False    # Never suppress exceptions
@@ -209,10 +209,21 @@ class framerate_regulator(object):
             sleep_for = self.max_sleep_time - elapsed
 
             if sleep_for > 0:
-                time.sleep(sleep_for)
+                self.sleep(sleep_for)
 
         self.last_time = monotonic()
 
+    def sleep(self, seconds):
+        """
+        Blocks for the given number of seconds. This may be overridden to make
+        the wait interruptible, for example to render an urgent frame
+        immediately; returning early simply shortens the current frame.
+
+        :param seconds: The time to sleep for.
+        :type seconds: float
+        """
+        time.sleep(seconds)
+
     def effective_FPS(self):
         """
         Calculates the effective frames-per-second - this should largely
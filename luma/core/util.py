@@ -9,6 +9,37 @@ def deprecation(message):
     warnings.warn(message, DeprecationWarning, stacklevel=2)
 
 
+def merge_regions(regions):
+    """
+    Merges overlapping or touching rectangles until none of the resulting
+    rectangles overlap or touch each other. Empty rectangles are dropped.
+
+    :param regions: A sequence of ``(left, top, right, bottom)`` tuples, where
+        ``right`` and ``bottom`` are exclusive.
+    :returns: A list of ``(left, top, right, bottom)`` tuples.
+    :rtype: list
+    """
+    result = []
+    for left, top, right, bottom in regions:
+        if left >= right or top >= bottom:
+            continue
+
+        merged = True
+        while merged:
+            merged = False
+            for i, (l, t, r, b) in enumerate(result):
+                if left <= r and l <= right and top <= b and t <= bottom:
+                    left, top = min(left, l), min(top, t)
+                    right, bottom = max(right, r), max(bottom, b)
+                    del result[i]
+                    merged = True
+                    break
+
+        result.append((left, top, right, bottom))
+
+    return result
+
+
 class mutable_string(object):
 
     def __init__(self, value):
@@ -47,12 +47,14 @@ class viewport(mixin.capabilities):
         self._backing_image = Image.new(self.mode, self.size)
         self._position = (0, 0)
         self._hotspots = []
+        self._shown = None
 
     def display(self, image):
         assert(image.mode == self.mode)
         assert(image.size == self.size)
 
         self._backing_image.paste(image)
+        self._shown = None
         self.refresh()
 
     def set_position(self, xy):
@@ -72,6 +74,7 @@ class viewport(mixin.capabilities):
         # TODO: should it check to see whether hotspots overlap each other?
         # Is sensible to _allow_ them to overlap?
         self._hotspots.append((hotspot, xy))
+        self._shown = None
 
     def remove_hotspot(self, hotspot, xy):
         """
@@ -83,6 +86,7 @@ class viewport(mixin.capabilities):
         self._hotspots.remove((hotspot, xy))
         eraser = Image.new(self.mode, hotspot.size)
         self._backing_image.paste(eraser, xy)
+        self._shown = None
 
     def is_overlapping_viewport(self, hotspot, xy):
         """
@@ -105,7 +109,16 @@ class viewport(mixin.capabilities):
             pool.wait_completion()
 
         im = self._backing_image.crop(box=self._crop_box())
-        self._device.display(im)
+
+        # When the content is unchanged and the viewport only moved up or
+        # down, devices which can scroll in hardware only need the new rows
+        shown = self._shown
+        if not should_wait and shown is not None and shown[0] == self._position[0] and \
+                hasattr(self._device, "shift"):
+            self._device.shift(im, self._position[1] - shown[1])
+        else:
+            self._device.display(im)
+        self._shown = self._position
         del im
 
     def _crop_box(self):
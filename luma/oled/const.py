@@ -7,23 +7,31 @@ from luma.core.const import common
 
 
 class ssd1306(common):
+    ACTIVATESCROLL = 0x2F
     CHARGEPUMP = 0x8D
     COLUMNADDR = 0x21
     COMSCANDEC = 0xC8
     COMSCANINC = 0xC0
+    DEACTIVATESCROLL = 0x2E
     EXTERNALVCC = 0x1
+    LEFTHORIZONTALSCROLL = 0x27
     MEMORYMODE = 0x20
     PAGEADDR = 0x22
+    RIGHTHORIZONTALSCROLL = 0x26
     SETCOMPINS = 0xDA
     SETDISPLAYCLOCKDIV = 0xD5
     SETDISPLAYOFFSET = 0xD3
     SETHIGHCOLUMN = 0x10
     SETLOWCOLUMN = 0x00
     SETPRECHARGE = 0xD9
+    SETSEGMENTNORMAL = 0xA0
     SETSEGMENTREMAP = 0xA1
     SETSTARTLINE = 0x40
     SETVCOMDETECT = 0xDB
+    SETVERTICALSCROLLAREA = 0xA3
     SWITCHCAPVCC = 0x2
+    VERTICALLEFTHORIZONTALSCROLL = 0x2A
+    VERTICALRIGHTHORIZONTALSCROLL = 0x29
 
 
 sh1106 = ssd1306
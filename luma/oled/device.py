@@ -30,7 +30,12 @@
 # As before, as soon as the with block completes, the canvas buffer is flushed
 # to the device
 
+import time
+
+from PIL import Image
+
 from luma.core.device import device
+from luma.core.util import merge_regions
 import luma.core.error
 import luma.core.framebuffer
 import luma.oled.const
@@ -39,15 +44,189 @@ import luma.oled.const
 __all__ = ["ssd1306", "ssd1322", "ssd1325", "ssd1331", "sh1106"]
 
 
-class sh1106(device):
+def _pack_pages(image, left, right, page_start, page_end):
+    """
+    Packs the pixels of a 1-bit image, from column ``left`` up to ``right``
+    (exclusive) within the given range of 8-pixel high pages, into a buffer
+    holding one byte per column per page, least significant bit at the top.
+    """
+    width = right - left
+    pixels = image.crop((left, page_start * 8, right, page_end * 8)).getdata()
+    buf = bytearray(width * (page_end - page_start))
+
+    i = 0
+    for y in range((page_end - page_start) * 8):
+        offset = (y >> 3) * width
+        bit = 1 << (y & 7)
+        for x in range(offset, offset + width):
+            if pixels[i]:
+                buf[x] |= bit
+            i += 1
+
+    return buf
+
+
+_grey4 = [v >> 4 for v in range(256)]
+
+_swap_nibbles = bytes(bytearray((v << 4 & 0xF0) | v >> 4 for v in range(256)))
+
+
+def _pack_nibbles(image, low_first=False):
+    """
+    Quantizes an 8-bit greyscale image to 4 bits and packs two pixels per
+    byte, row by row, the left pixel in the high nibble unless ``low_first``.
+    """
+    grey = Image.frombytes("P", image.size, image.point(_grey4).tobytes())
+    buf = grey.tobytes("raw", "P;4")
+    return buf.translate(_swap_nibbles) if low_first else buf
+
+
+def _page_tables(width, height, rotate):
+    """
+    Builds the lookup tables for packing a 1-bit image into pages of a
+    ``width`` x ``height`` display: for each pixel of the image as drawn, in
+    :py:meth:`PIL.Image.Image.getdata` order, the buffer offset and bit it is
+    stored in once rotated clockwise by 90° * ``rotate``. Rotation is then no
+    more than a different reading order.
+    """
+    columns, rows = (width, height) if rotate % 2 == 0 else (height, width)
+    offsets = []
+    mask = []
+    for row in range(rows):
+        for col in range(columns):
+            if rotate == 0:
+                x, y = col, row
+            elif rotate == 1:
+                x, y = width - 1 - row, col
+            elif rotate == 2:
+                x, y = width - 1 - col, height - 1 - row
+            else:
+                x, y = row, height - 1 - col
+            offsets.append(width * (y // 8) + x)
+            mask.append(1 << (y % 8))
+
+    return offsets, mask
+
+
+def _pack_paged(image, offsets, mask, size):
+    """
+    Packs a 1-bit image into a buffer of ``size`` bytes using the tables
+    from :py:func:`_page_tables`.
+    """
+    buf = bytearray(size)
+
+    idx = 0
+    for pix in image.getdata():
+        if pix > 0:
+            buf[offsets[idx]] |= mask[idx]
+        idx += 1
+
+    return buf
+
+
+def _rgb6(color):
+    """
+    Converts an ``(r, g, b)`` color to the 6-bit components taken by the
+    SSD1331 drawing commands, matching the 5-6-5 pixel format.
+    """
+    r, g, b = color[:3]
+    return (r >> 3 << 1, g >> 2, b >> 3 << 1)
+
+
+def _page_regions(regions):
+    """
+    Converts pixel regions into ``(left, page_start, right, page_end)``
+    regions, merging any which overlap once aligned to whole pages.
+    """
+    return merge_regions((left, top // 8, right, (bottom + 7) // 8)
+                         for left, top, right, bottom in regions)
+
+
+def _align_columns(regions, n):
+    """
+    Widens the regions so that left and right edges are multiples of ``n``
+    pixels, merging any which overlap once aligned.
+    """
+    return merge_regions((left - left % n, top, right + -right % n, bottom)
+                         for left, top, right, bottom in regions)
+
+
+class _start_line_scrolling(object):
+    """
+    Vertical scrolling through the display start line, for page-addressed
+    monochrome controllers with 64 rows of display RAM. The RAM is used as a
+    ring buffer: moving the start line scrolls the picture without rewriting
+    it, so only the pages which hold newly revealed rows need sending.
+    """
+    _ram_rows = 64
+
+    def shift(self, image, dy):
+        """
+        Displays an image which is the one currently displayed moved up by
+        ``dy`` rows (down, if negative), so that only ``abs(dy)`` rows at the
+        bottom (top) are new. The start line is moved by ``dy`` and just the
+        pages holding the new rows are written. Rotated devices, and shifts of
+        the whole height or more, fall back to :py:func:`display`.
+
+        :param image: The image to display.
+        :type image: PIL.Image.Image
+        :param dy: The number of rows the picture moves up.
+        :type dy: int
+        """
+        assert(image.mode == self.mode)
+        assert(image.size == self.size)
+
+        if self.rotate != 0 or not 0 < abs(dy) < self._h or self._hardware_scrolling():
+            return self.display(image)
+
+        start = (self._start_line + dy) % self._ram_rows
+        revealed = range(self._h - dy, self._h) if dy > 0 else range(-dy)
+        pages = sorted(set((start + y) % self._ram_rows // 8 for y in revealed))
+
+        # The display RAM as it needs to be: rows rolled by the start line
+        ram = Image.new(self.mode, (self._w, self._ram_rows))
+        ram.paste(image, (0, start))
+        ram.paste(image, (0, start - self._ram_rows))
+
+        regions = []
+        for page in pages:
+            if regions and regions[-1][3] == page:
+                regions[-1][3] = page + 1
+            else:
+                regions.append([0, page, self._w, page + 1])
+
+        self._forget_last_frame()
+        self._display_pages(ram, regions)
+        self._start_line = start
+        self.command(self._const.SETSTARTLINE | start)
+
+    def _hardware_scrolling(self):
+        return False
+
+    def _reset_start_line(self):
+        """
+        Restores the start line before a frame is written normally; the
+        display RAM is then out of order, so nothing may be assumed to be
+        unchanged.
+        """
+        self._start_line = 0
+        self.command(self._const.SETSTARTLINE)
+        self._forget_last_frame()
+
+
+class sh1106(device, _start_line_scrolling):
     """
     Encapsulates the serial interface to the monochrome SH1106 OLED display
     hardware. On creation, an initialization sequence is pumped to the display
     to properly configure it. Further control commands can then be called to
-    affect the brightness and other settings.
+    affect the brightness and other settings. With ``warm_start=True``, a
+    panel already configured by a previous process is taken over instead;
+    see :py:class:`luma.core.device.device`.
     """
-    def __init__(self, serial_interface=None, width=128, height=64, rotate=0, **kwargs):
-        super(sh1106, self).__init__(luma.oled.const.sh1106, serial_interface)
+    def __init__(self, serial_interface=None, width=128, height=64, rotate=0,
+                 frame_cache=0, warm_start=False, **kwargs):
+        super(sh1106, self).__init__(luma.oled.const.sh1106, serial_interface,
+                                     frame_cache)
         self.capabilities(width, height, rotate)
         self._pages = self._h // 8
 
@@ -60,69 +239,144 @@ class sh1106(device):
             raise luma.core.error.DeviceDisplayModeError(
                 "Unsupported display mode: {0} x {1}".format(width, height))
 
-        self.command(
-            self._const.DISPLAYOFF,
-            self._const.MEMORYMODE,
-            self._const.SETHIGHCOLUMN,      0xB0, 0xC8,
-            self._const.SETLOWCOLUMN,       0x10, 0x40,
-            self._const.SETSEGMENTREMAP,
-            self._const.NORMALDISPLAY,
-            self._const.SETMULTIPLEX,       settings['multiplex'],
-            self._const.DISPLAYALLON_RESUME,
-            self._const.SETDISPLAYOFFSET,   settings['displayoffset'],
-            self._const.SETDISPLAYCLOCKDIV, 0xF0,
-            self._const.SETPRECHARGE,       0x22,
-            self._const.SETCOMPINS,         0x12,
-            self._const.SETVCOMDETECT,      0x20,
-            self._const.CHARGEPUMP,         0x14)
-
-        self.contrast(0x7F)
-        self.clear()
-        self.show()
-
-    def display(self, image):
+        # Rotate by 180° in the controller by reversing the segment and COM
+        # scan directions, unless a display offset would move the picture
+        self._flipped = rotate == 2 and settings['displayoffset'] == 0
+        self._offsets, self._mask = _page_tables(self._w, self._h, 0 if self._flipped else rotate)
+        self._start_line = 0
+
+        with self.transaction():
+            if warm_start:
+                # Only the start line and scan directions, the rest of the
+                # configuration is left as it was
+                self.command(
+                    self._const.SETSTARTLINE,
+                    self._const.SETSEGMENTNORMAL if self._flipped else self._const.SETSEGMENTREMAP,
+                    self._const.COMSCANINC if self._flipped else self._const.COMSCANDEC)
+            else:
+                self.command(
+                    self._const.DISPLAYOFF,
+                    self._const.MEMORYMODE,
+                    self._const.SETHIGHCOLUMN,      0xB0,
+                    self._const.COMSCANINC if self._flipped else self._const.COMSCANDEC,
+                    self._const.SETLOWCOLUMN,       0x10, 0x40,
+                    self._const.SETSEGMENTNORMAL if self._flipped else self._const.SETSEGMENTREMAP,
+                    self._const.NORMALDISPLAY,
+                    self._const.SETMULTIPLEX,       settings['multiplex'],
+                    self._const.DISPLAYALLON_RESUME,
+                    self._const.SETDISPLAYOFFSET,   settings['displayoffset'],
+                    self._const.SETDISPLAYCLOCKDIV, 0xF0,
+                    self._const.SETPRECHARGE,       0x22,
+                    self._const.SETCOMPINS,         0x12,
+                    self._const.SETVCOMDETECT,      0x20,
+                    self._const.CHARGEPUMP,         0x14)
+
+                self.contrast(0x7F)
+                self.clear()
+            self.show()
+
+    def display(self, image, damage=None):
         """
         Takes a 1-bit :py:mod:`PIL.Image` and dumps it to the SH1106
-        OLED display.
+        OLED display. If a list of ``damage`` regions is supplied, only the
+        pages and columns covering those regions are sent.
         """
         assert(image.mode == self.mode)
         assert(image.size == self.size)
 
-        image = self.preprocess(image)
+        with self.transaction():
+            if self._start_line:
+                self._reset_start_line()
+                damage = None
 
-        set_page_address = 0xB0
-        image_data = image.getdata()
-        pixels_per_page = self.width * 8
-        buf = bytearray(self.width)
-
-        for y in range(0, int(self._pages * pixels_per_page), pixels_per_page):
-            self.command(set_page_address, 0x02, 0x10)
-            set_page_address += 1
-            offsets = [y + self.width * i for i in range(8)]
-
-            for x in range(self.width):
-                buf[x] = \
-                    (image_data[x + offsets[0]] and 0x01) | \
-                    (image_data[x + offsets[1]] and 0x02) | \
-                    (image_data[x + offsets[2]] and 0x04) | \
-                    (image_data[x + offsets[3]] and 0x08) | \
-                    (image_data[x + offsets[4]] and 0x10) | \
-                    (image_data[x + offsets[5]] and 0x20) | \
-                    (image_data[x + offsets[6]] and 0x40) | \
-                    (image_data[x + offsets[7]] and 0x80)
+            if damage is not None:
+                image = self.preprocess(image)
+                self._forget_last_frame()
+                self._display_pages(image, _page_regions(self.preprocess_damage(damage)))
+                return
 
-            self.data(list(buf))
+            buf = self._pack_cached(image, self._pack)
+            if buf is None:
+                return
+
+            self._send_pages(buf, 0, 0, self._w, self._pages)
 
+    def display_packed(self, buf, region=None):
+        """
+        Sends a buffer in the SH1106's page layout, as produced by
+        :py:func:`pack`, straight to the display. The ``top`` and ``bottom``
+        of a region must be multiples of 8. See
+        :py:func:`luma.core.device.device.display_packed`.
+        """
+        left, top, right, bottom = region or (0, 0, self._w, self._h)
+        assert(top % 8 == 0 and bottom % 8 == 0)
+        assert(len(buf) == (right - left) * (bottom - top) // 8)
+
+        with self.transaction():
+            if self._start_line:
+                self._reset_start_line()
+            self._forget_last_frame()
+            self._send_pages(buf, left, top // 8, right, bottom // 8)
+
+    def _display_pages(self, image, regions):
+        """
+        Writes ``(left, page_start, right, page_end)`` regions of a device
+        oriented image.
+        """
+        for left, page_start, right, page_end in regions:
+            self._send_pages(_pack_pages(image, left, right, page_start, page_end),
+                             left, page_start, right, page_end)
 
-class ssd1306(device):
+    def _send_pages(self, buf, left, page_start, right, page_end):
+        """
+        Writes packed pages a page at a time, as the SH1106 has no window
+        addressing.
+        """
+        width = right - left
+        column = left + 0x02
+        for page in range(page_start, page_end):
+            self.command(0xB0 + page, column & 0x0F, 0x10 | column >> 4)
+            offset = (page - page_start) * width
+            self.data(list(buf[offset:offset + width]))
+
+    def _pack(self, image):
+        # Rotation is already accounted for by the packing tables
+        return _pack_paged(image, self._offsets, self._mask, self._w * self._pages)
+
+    def _pack_region(self, image, region):
+        left, top, right, bottom = region
+        return _pack_pages(image, left, right, top // 8, bottom // 8)
+
+    def preprocess(self, image):
+        """
+        As :py:func:`luma.core.mixin.capabilities.preprocess`, except that a
+        180° rotation is left to the display controller where possible.
+        """
+        if self._flipped:
+            return image
+        return super(sh1106, self).preprocess(image)
+
+    def preprocess_damage(self, damage, rotate=None):
+        return super(sh1106, self).preprocess_damage(damage, 0 if self._flipped else rotate)
+
+
+# Scroll step intervals, in frames, and their SSD1306 encoding
+_scroll_intervals = {5: 0, 64: 1, 128: 2, 256: 3, 3: 4, 4: 5, 25: 6, 2: 7}
+
+
+class ssd1306(device, _start_line_scrolling):
     """
     Encapsulates the serial interface to the monochrome SSD1306 OLED display
     hardware. On creation, an initialization sequence is pumped to the display
     to properly configure it. Further control commands can then be called to
-    affect the brightness and other settings.
+    affect the brightness and other settings. With ``warm_start=True``, a
+    panel already configured by a previous process is taken over instead;
+    see :py:class:`luma.core.device.device`.
     """
-    def __init__(self, serial_interface=None, width=128, height=64, rotate=0, **kwargs):
-        super(ssd1306, self).__init__(luma.oled.const.ssd1306, serial_interface)
+    def __init__(self, serial_interface=None, width=128, height=64, rotate=0,
+                 frame_cache=0, warm_start=False, **kwargs):
+        super(ssd1306, self).__init__(luma.oled.const.ssd1306, serial_interface,
+                                      frame_cache)
         self.capabilities(width, height, rotate)
 
         # Supported modes
@@ -139,58 +393,202 @@ class ssd1306(device):
                 "Unsupported display mode: {0} x {1}".format(width, height))
 
         self._pages = height // 8
-        self._mask = [1 << (i // width) % 8 for i in range(width * height)]
-        self._offsets = [(width * (i // (width * 8))) + (i % width) for i in range(width * height)]
+        # Rotate by 180° in the controller by reversing the segment and COM
+        # scan directions
+        self._flipped = rotate == 2
+        self._offsets, self._mask = _page_tables(width, height, 0 if self._flipped else rotate)
+        self._start_line = 0
+        self._scrolling = False
         self._colstart = (0x80 - self._w) // 2
         self._colend = self._colstart + self._w
 
-        self.command(
-            self._const.DISPLAYOFF,
-            self._const.SETDISPLAYCLOCKDIV, settings['displayclockdiv'],
-            self._const.SETMULTIPLEX,       settings['multiplex'],
-            self._const.SETDISPLAYOFFSET,   0x00,
-            self._const.SETSTARTLINE,
-            self._const.CHARGEPUMP,         0x14,
-            self._const.MEMORYMODE,         0x00,
-            self._const.SETSEGMENTREMAP,
-            self._const.COMSCANDEC,
-            self._const.SETCOMPINS,         settings['compins'],
-            self._const.SETPRECHARGE,       0xF1,
-            self._const.SETVCOMDETECT,      0x40,
-            self._const.DISPLAYALLON_RESUME,
-            self._const.NORMALDISPLAY)
-
-        self.contrast(0xCF)
-        self.clear()
-        self.show()
-
-    def display(self, image):
+        with self.transaction():
+            if warm_start:
+                # Stop any scrolling, then only the addressing and scan
+                # directions, the rest of the configuration is left as it was
+                self.command(
+                    self._const.DEACTIVATESCROLL,
+                    self._const.SETSTARTLINE,
+                    self._const.MEMORYMODE,         0x00,
+                    self._const.SETSEGMENTNORMAL if self._flipped else self._const.SETSEGMENTREMAP,
+                    self._const.COMSCANINC if self._flipped else self._const.COMSCANDEC)
+            else:
+                self.command(
+                    self._const.DISPLAYOFF,
+                    self._const.SETDISPLAYCLOCKDIV, settings['displayclockdiv'],
+                    self._const.SETMULTIPLEX,       settings['multiplex'],
+                    self._const.SETDISPLAYOFFSET,   0x00,
+                    self._const.SETSTARTLINE,
+                    self._const.CHARGEPUMP,         0x14,
+                    self._const.MEMORYMODE,         0x00,
+                    self._const.SETSEGMENTNORMAL if self._flipped else self._const.SETSEGMENTREMAP,
+                    self._const.COMSCANINC if self._flipped else self._const.COMSCANDEC,
+                    self._const.SETCOMPINS,         settings['compins'],
+                    self._const.SETPRECHARGE,       0xF1,
+                    self._const.SETVCOMDETECT,      0x40,
+                    self._const.DISPLAYALLON_RESUME,
+                    self._const.NORMALDISPLAY)
+
+                self.contrast(0xCF)
+                self.clear()
+            self.show()
+
+    def display(self, image, damage=None):
         """
         Takes a 1-bit :py:mod:`PIL.Image` and dumps it to the SSD1306
-        OLED display.
+        OLED display. If a list of ``damage`` regions is supplied, only the
+        pages and columns covering those regions are sent. Any hardware
+        scrolling is stopped first.
         """
         assert(image.mode == self.mode)
         assert(image.size == self.size)
 
-        image = self.preprocess(image)
+        with self.transaction():
+            if self._scrolling:
+                self.stop_scroll()
+                damage = None
+
+            if self._start_line:
+                self._reset_start_line()
+                damage = None
+
+            if damage is not None:
+                image = self.preprocess(image)
+                self._forget_last_frame()
+                self._display_pages(image, _page_regions(self.preprocess_damage(damage)))
+                return
+
+            buf = self._pack_cached(image, self._pack)
+            if buf is None:
+                return
+
+            self._send_pages(buf, 0, 0, self._w, self._pages)
+
+    def display_packed(self, buf, region=None):
+        """
+        Sends a buffer in the SSD1306's page layout, as produced by
+        :py:func:`pack`, straight to the display, stopping any hardware
+        scrolling first. The ``top`` and ``bottom`` of a region must be
+        multiples of 8. See :py:func:`luma.core.device.device.display_packed`.
+        """
+        left, top, right, bottom = region or (0, 0, self._w, self._h)
+        assert(top % 8 == 0 and bottom % 8 == 0)
+        assert(len(buf) == (right - left) * (bottom - top) // 8)
+
+        with self.transaction():
+            if self._scrolling:
+                self.stop_scroll()
+            if self._start_line:
+                self._reset_start_line()
+            self._forget_last_frame()
+            self._send_pages(buf, left, top // 8, right, bottom // 8)
+
+    def _display_pages(self, image, regions):
+        """
+        Writes ``(left, page_start, right, page_end)`` regions of a device
+        oriented image.
+        """
+        for left, page_start, right, page_end in regions:
+            self._send_pages(_pack_pages(image, left, right, page_start, page_end),
+                             left, page_start, right, page_end)
 
+    def _send_pages(self, buf, left, page_start, right, page_end):
+        """
+        Writes packed pages as one window.
+        """
         self.command(
             # Column start/end address
-            self._const.COLUMNADDR, self._colstart, self._colend - 1,
+            self._const.COLUMNADDR, self._colstart + left, self._colstart + right - 1,
             # Page start/end address
-            self._const.PAGEADDR, 0x00, self._pages - 1)
+            self._const.PAGEADDR, page_start, page_end - 1)
+        self.data(list(buf))
 
-        buf = bytearray(self._w * self._pages)
-        off = self._offsets
-        mask = self._mask
+    def scroll(self, direction="left", start_page=0, end_page=None, interval=2,
+               vertical_offset=0, vertical_area=None):
+        """
+        Sets the controller scrolling the displayed picture continuously by
+        itself, without any further data being sent, until :py:func:`stop_scroll`
+        is called or another frame is displayed. Pages and directions are
+        those of the panel, regardless of ``rotate``.
+
+        The pages from ``start_page`` to ``end_page`` (inclusive, defaulting
+        to the last page) move one column left or right every ``interval``
+        frames, wrapping around. With a non-zero ``vertical_offset``, the rows
+        in ``vertical_area`` also move up by that many rows per step.
+
+        Horizontal scrolling wraps within the display RAM, so it suits a
+        picture that fits the display (e.g. a ticker) rather than revealing
+        new content; vertical motion revealing new rows is available through
+        :py:func:`shift`.
+
+        :param direction: ``"left"`` or ``"right"``.
+        :type direction: str
+        :param start_page: The first page to scroll.
+        :type start_page: int
+        :param end_page: The last page to scroll.
+        :type end_page: int
+        :param interval: Frames per step, one of 2, 3, 4, 5, 25, 64, 128 or 256.
+        :type interval: int
+        :param vertical_offset: Rows to move up per step, 0 to 63.
+        :type vertical_offset: int
+        :param vertical_area: The ``(top, rows)`` of the vertically scrolling
+            area, by default the whole display.
+        :type vertical_area: tuple
+        """
+        assert(direction in ("left", "right"))
+        assert(interval in _scroll_intervals)
+        end_page = self._pages - 1 if end_page is None else end_page
+        assert(0 <= start_page <= end_page < self._pages)
+
+        self.command(self._const.DEACTIVATESCROLL)
+        if vertical_offset:
+            top, rows = vertical_area or (0, self._h)
+            self.command(
+                self._const.SETVERTICALSCROLLAREA, top, rows,
+                self._const.VERTICALLEFTHORIZONTALSCROLL if direction == "left"
+                else self._const.VERTICALRIGHTHORIZONTALSCROLL,
+                0x00, start_page, _scroll_intervals[interval], end_page,
+                vertical_offset % 64)
+        else:
+            self.command(
+                self._const.LEFTHORIZONTALSCROLL if direction == "left"
+                else self._const.RIGHTHORIZONTALSCROLL,
+                0x00, start_page, _scroll_intervals[interval], end_page,
+                0x00, 0xFF)
+        self.command(self._const.ACTIVATESCROLL)
+        self._scrolling = True
+
+    def stop_scroll(self):
+        """
+        Stops hardware scrolling. The display RAM has been moved around by
+        then, so the next frame is always sent in full.
+        """
+        self.command(self._const.DEACTIVATESCROLL)
+        self._scrolling = False
+        self._forget_last_frame()
 
-        idx = 0
-        for pix in image.getdata():
-            if pix > 0:
-                buf[off[idx]] |= mask[idx]
-            idx += 1
+    def _hardware_scrolling(self):
+        return self._scrolling
 
-        self.data(list(buf))
+    def _pack(self, image):
+        # Rotation is already accounted for by the packing tables
+        return _pack_paged(image, self._offsets, self._mask, self._w * self._pages)
+
+    def _pack_region(self, image, region):
+        left, top, right, bottom = region
+        return _pack_pages(image, left, right, top // 8, bottom // 8)
+
+    def preprocess(self, image):
+        """
+        As :py:func:`luma.core.mixin.capabilities.preprocess`, except that a
+        180° rotation is left to the display controller.
+        """
+        if self._flipped:
+            return image
+        return super(ssd1306, self).preprocess(image)
+
+    def preprocess_damage(self, damage, rotate=None):
+        return super(ssd1306, self).preprocess_damage(damage, 0 if self._flipped else rotate)
 
 
 class ssd1331(device):
@@ -212,12 +610,22 @@ class ssd1331(device):
         represents 270° rotation.
     :type rotate: int
     :param framebuffer: Framebuffering strategy, currently values of
-        "diff_to_previous" or "full_frame" are only supported
+        "diff_to_previous", "tiled_diff", "adaptive" or "full_frame" are
+        only supported
     :type framebuffer: str
+    :param frame_cache: Memory budget in bytes for caching packed frames,
+        zero (default) disables the cache. Only used with the "full_frame"
+        framebuffer, as "diff_to_previous" already skips unchanged frames.
+    :type frame_cache: int
+    :param warm_start: Take over a panel already configured by a previous
+        process, rather than initializing and clearing it.
+    :type warm_start: bool
     """
     def __init__(self, serial_interface=None, width=96, height=64, rotate=0,
-                 framebuffer="diff_to_previous", **kwargs):
-        super(ssd1331, self).__init__(luma.oled.const.common, serial_interface)
+                 framebuffer="diff_to_previous", frame_cache=0, warm_start=False,
+                 **kwargs):
+        super(ssd1331, self).__init__(luma.oled.const.common, serial_interface,
+                                      frame_cache if framebuffer == "full_frame" else 0)
         self.capabilities(width, height, rotate, mode="RGB")
         self.framebuffer = getattr(luma.core.framebuffer, framebuffer)(self)
 
@@ -225,59 +633,121 @@ class ssd1331(device):
             raise luma.core.error.DeviceDisplayModeError(
                 "Unsupported display mode: {0} x {1}".format(width, height))
 
-        self.command(
-            0xAE,        # Display off
-            0xA0, 0x72,  # Seg remap
-            0xA1, 0x00,  # Set Display start line
-            0xA2, 0x00,  # Set display offset
-            0xA4,        # Normal display
-            0xA8, 0x3F,  # Set multiplex
-            0xAD, 0x8E,  # Master configure
-            0xB0, 0x0B,  # Power save mode
-            0xB1, 0x74,  # Phase12 period
-            0xB3, 0xD0,  # Clock divider
-            0x8A, 0x80,  # Set precharge speed A
-            0x8B, 0x80,  # Set precharge speed B
-            0x8C, 0x80,  # Set precharge speed C
-            0xBB, 0x3E,  # Set pre-charge voltage
-            0xBE, 0x3E,  # Set voltage
-            0x87, 0x0F)  # Master current control
-
-        self.contrast(0xFF)
-        self.clear()
+        with self.transaction():
+            # Whether drawn rectangles are filled, not known until one is
+            self._fill = None
+            if warm_start:
+                self.command(
+                    0xA0, 0x72,  # Seg remap
+                    0xA1, 0x00)  # Set Display start line
+            else:
+                self.command(
+                    0xAE,        # Display off
+                    0xA0, 0x72,  # Seg remap
+                    0xA1, 0x00,  # Set Display start line
+                    0xA2, 0x00,  # Set display offset
+                    0xA4,        # Normal display
+                    0xA8, 0x3F,  # Set multiplex
+                    0xAD, 0x8E,  # Master configure
+                    0xB0, 0x0B,  # Power save mode
+                    0xB1, 0x74,  # Phase12 period
+                    0xB3, 0xD0,  # Clock divider
+                    0x8A, 0x80,  # Set precharge speed A
+                    0x8B, 0x80,  # Set precharge speed B
+                    0x8C, 0x80,  # Set precharge speed C
+                    0xBB, 0x3E,  # Set pre-charge voltage
+                    0xBE, 0x3E,  # Set voltage
+                    0x87, 0x0F)  # Master current control
+
+                self.contrast(0xFF)
+
+        # Not batched, as the clear window command must complete first
+        self._unknown_contents = warm_start
+        if not warm_start:
+            self.clear()
         self.show()
 
-    def display(self, image):
+    def display(self, image, damage=None):
         """
         Renders a 24-bit RGB image to the SSD1331 OLED display
 
         :param image: the image to render
         :type image: PIL.Image.Image
+        :param damage: optional list of ``(left, top, right, bottom)`` regions
+            which changed since the previous image; only those are sent and
+            no difference is calculated.
+        :type damage: list
         """
         assert(image.mode == self.mode)
         assert(image.size == self.size)
 
-        image = self.preprocess(image)
+        with self.transaction():
+            # The panel contents are unknown after a warm start or packed data
+            if self._unknown_contents:
+                self._unknown_contents = False
+                damage = [(0, 0) + self.size]
+
+            if damage is not None:
+                image = self.preprocess(image)
+                self.framebuffer.retain(image)
+                for region in self.preprocess_damage(damage):
+                    self._forget_last_frame()
+                    self._send_window(self._pack_region(image, region), region)
+                return
+
+            if self.frame_cache is not None:
+                buf = self._pack_cached(image, self._pack)
+                if buf is not None:
+                    self._send_window(buf, (0, 0, self._w, self._h))
+                return
+
+            image = self.preprocess(image)
+
+            if self.framebuffer.redraw_required(image):
+                for region in self.framebuffer.regions:
+                    self._send_window(self._pack_region(self.framebuffer.image, region), region)
+
+    def display_packed(self, buf, region=None):
+        """
+        Sends a buffer of 16-bit 5-6-5 pixels, as produced by :py:func:`pack`,
+        straight to the display. See
+        :py:func:`luma.core.device.device.display_packed`.
+        """
+        left, top, right, bottom = region = region or (0, 0, self._w, self._h)
+        assert(len(buf) == (right - left) * (bottom - top) * 2)
 
-        if self.framebuffer.redraw_required(image):
-            left, top, right, bottom = self.framebuffer.bounding_box
-            width = right - left
-            height = bottom - top
+        with self.transaction():
+            self._forget_last_frame()
+            self._unknown_contents = True
+            self._send_window(buf, region)
 
-            self.command(
-                0x15, left, right - 1,    # Set column addr
-                0x75, top, bottom - 1)    # Set row addr
-
-            i = 0
-            buf = bytearray(width * height * 2)
-            for r, g, b in self.framebuffer.getdata():
-                if not(r == g == b == 0):
-                    # 65K format 1
-                    buf[i] = r & 0xF8 | g >> 5
-                    buf[i + 1] = g << 5 & 0xE0 | b >> 3
-                i += 2
+    def _send_window(self, buf, region):
+        left, top, right, bottom = region
+        self.command(
+            0x15, left, right - 1,    # Set column addr
+            0x75, top, bottom - 1)    # Set row addr
+        self.data(list(buf))
 
-            self.data(list(buf))
+    def _pack_region(self, image, region):
+        left, top, right, bottom = region
+        buf = bytearray((right - left) * (bottom - top) * 2)
+        self._render(buf, image.crop(region).getdata())
+        return buf
+
+    def _render(self, buf, pixel_data):
+        i = 0
+        for r, g, b in pixel_data:
+            if not(r == g == b == 0):
+                # 65K format 1
+                buf[i] = r & 0xF8 | g >> 5
+                buf[i + 1] = g << 3 & 0xE0 | b >> 3
+            i += 2
+
+    def _pack(self, image):
+        image = self.preprocess(image)
+        buf = bytearray(self._w * self._h * 2)
+        self._render(buf, image.getdata())
+        return buf
 
     def contrast(self, level):
         """
@@ -294,6 +764,116 @@ class ssd1331(device):
                      0x82, level,  # Set contrast B
                      0x83, level)  # Set contrast C
 
+    def clear(self):
+        """
+        Blanks the display with the controller's clear window command, rather
+        than sending a whole frame of black pixels.
+        """
+        self.clear_region((0, 0, self.width - 1, self.height - 1))
+        self.framebuffer.retain(Image.new(self.mode, (self._w, self._h)))
+        self._unknown_contents = False
+
+    # The drawing commands below take boxes as ``(left, top, right, bottom)``
+    # with inclusive corners, as PIL's rectangle does, in the coordinates of
+    # the image passed to display. They leave the framebuffer untouched, so
+    # a caller which mixes them with display must retain the result itself,
+    # as luma.oled.render.accelerated_canvas does. Each returns False,
+    # having sent nothing, if the box does not lie wholly on the display.
+    # They wait for the controller to finish drawing, which is pointless
+    # within a transaction, so are best not used in one.
+
+    def _device_box(self, xy):
+        left, top, right, bottom = xy
+        if not (0 <= left <= right < self.width and 0 <= top <= bottom < self.height):
+            return None
+        (left, top, right, bottom), = self.preprocess_damage([(left, top, right + 1, bottom + 1)])
+        return left, top, right - 1, bottom - 1
+
+    def _accelerate(self, delay, *cmd):
+        self._forget_last_frame()
+        self.command(*cmd)
+        # The controller ignores further commands until the drawing is done
+        time.sleep(delay)
+
+    def draw_line(self, xy, color):
+        """
+        Draws a line from ``(left, top)`` to ``(right, bottom)`` with the
+        controller's line command. Only horizontal and vertical lines come
+        out the same as when drawn by PIL.
+
+        :param xy: the line's end points
+        :type xy: tuple
+        :param color: an ``(r, g, b)`` color
+        :type color: tuple
+        :rtype: bool
+        """
+        box = self._device_box(xy)
+        if box is None:
+            return False
+        self._accelerate(0.001, 0x21, *(box + _rgb6(color)))
+        return True
+
+    def draw_rectangle(self, xy, outline, fill=None):
+        """
+        Draws a rectangle with the controller's rectangle command, or its
+        clear window command for a black filled rectangle.
+
+        :param xy: the rectangle's corners
+        :type xy: tuple
+        :param outline: an ``(r, g, b)`` color for the border
+        :type outline: tuple
+        :param fill: an ``(r, g, b)`` color for the interior, or ``None`` to
+            leave it untouched
+        :type fill: tuple
+        :rtype: bool
+        """
+        box = self._device_box(xy)
+        if box is None:
+            return False
+        if fill is not None and _rgb6(outline) == _rgb6(fill) == (0, 0, 0):
+            self._accelerate(0.003, 0x25, *box)
+            return True
+        if self._fill != (fill is not None):
+            self._fill = fill is not None
+            self.command(0x26, int(self._fill))    # Fill enable/disable
+        self._accelerate(0.003, 0x22, *(box + _rgb6(outline) + _rgb6(fill or outline)))
+        return True
+
+    def clear_region(self, xy):
+        """
+        Blanks a box with the controller's clear window command.
+
+        :param xy: the box's corners
+        :type xy: tuple
+        :rtype: bool
+        """
+        box = self._device_box(xy)
+        if box is None:
+            return False
+        self._accelerate(0.003, 0x25, *box)
+        return True
+
+    def copy_region(self, xy, dest):
+        """
+        Copies a box of the display contents so that its top left corner
+        lands on ``dest``, with the controller's copy command. The copy must
+        also lie wholly on the display.
+
+        :param xy: the corners of the box to copy
+        :type xy: tuple
+        :param dest: the ``(x, y)`` position to copy it to
+        :type dest: tuple
+        :rtype: bool
+        """
+        left, top, right, bottom = xy
+        x, y = dest
+        box = self._device_box(xy)
+        target = self._device_box((x, y, x + right - left, y + bottom - top))
+        if box is None or target is None:
+            return False
+        self._accelerate(0.003, 0x23, *(box + target[:2]))
+        return True
+
 
 class ssd1322(device):
     """
@@ -313,20 +893,31 @@ class ssd1322(device):
         no rotation, 1 is rotate 90° clockwise, 2 is 180° rotation and 3
         represents 270° rotation.
     :type rotate: int
-    :param mode: Supplying "1" or "RGB" effects a different rendering
+    :param mode: Supplying "1", "L" or "RGB" effects a different rendering
          mechanism, either to monochrome or 4-bit greyscale.
     :type mode: str
     :param framebuffer: Framebuffering strategy, currently values of
-        "diff_to_previous" or "full_frame" are only supported
+        "diff_to_previous", "tiled_diff", "adaptive" or "full_frame" are
+        only supported
     :type framebuffer: str
+    :param frame_cache: Memory budget in bytes for caching packed frames,
+        zero (default) disables the cache. Only used with the "full_frame"
+        framebuffer, as "diff_to_previous" already skips unchanged frames.
+    :type frame_cache: int
+    :param warm_start: Take over a panel already configured by a previous
+        process, rather than initializing and clearing it.
+    :type warm_start: bool
 
     """
     def __init__(self, serial_interface=None, width=256, height=64, rotate=0,
-                 mode="RGB", framebuffer="diff_to_previous", **kwargs):
-        super(ssd1322, self).__init__(luma.oled.const.ssd1322, serial_interface)
+                 mode="RGB", framebuffer="diff_to_previous", frame_cache=0,
+                 warm_start=False, **kwargs):
+        super(ssd1322, self).__init__(luma.oled.const.ssd1322, serial_interface,
+                                      frame_cache if framebuffer == "full_frame" else 0)
         self.capabilities(width, height, rotate, mode)
         self.framebuffer = getattr(luma.core.framebuffer, framebuffer)(self)
-        self.populate = self._render_mono if mode == "1" else self._render_greyscale
+        self.populate = {"1": self._render_mono,
+                         "L": self._render_grey}.get(mode, self._render_greyscale)
         self.column_offset = (480 - width) // 2
 
         if width <= 0 or width > 256 or \
@@ -335,33 +926,40 @@ class ssd1322(device):
             raise luma.core.error.DeviceDisplayModeError(
                 "Unsupported display mode: {0} x {1}".format(width, height))
 
-        self.command(0xFD, 0x12)        # Unlock IC
-        self.command(0xA4)              # Display off (all pixels off)
-        self.command(0xB3, 0xF2)        # Display divide clockratio/freq
-        self.command(0xCA, 0x3F)        # Set MUX ratio
-        self.command(0xA2, 0x00)        # Display offset
-        self.command(0xA1, 0x00)        # Display start Line
-        self.command(0xA0, 0x14, 0x11)  # Set remap & dual COM Line
-        self.command(0xB5, 0x00)        # Set GPIO (disabled)
-        self.command(0xAB, 0x01)        # Function select (internal Vdd)
-        self.command(0xB4, 0xA0, 0xFD)  # Display enhancement A (External VSL)
-        self.command(0xC7, 0x0F)        # Master contrast (reset)
-        self.command(0xB9)              # Set default greyscale table
-        self.command(0xB1, 0xF0)        # Phase length
-        self.command(0xD1, 0x82, 0x20)  # Display enhancement B (reset)
-        self.command(0xBB, 0x0D)        # Pre-charge voltage
-        self.command(0xB6, 0x08)        # 2nd precharge period
-        self.command(0xBE, 0x00)        # Set VcomH
-        self.command(0xA6)              # Normal display (reset)
-        self.command(0xA9)              # Exit partial display
-
-        self.contrast(0x7F)             # Reset
-        self.clear()
-        self.show()
+        self._unknown_contents = warm_start
+        with self.transaction():
+            if warm_start:
+                self.command(0xFD, 0x12)        # Unlock IC
+                self.command(0xA1, 0x00)        # Display start Line
+                self.command(0xA0, 0x14, 0x11)  # Set remap & dual COM Line
+            else:
+                self.command(0xFD, 0x12)        # Unlock IC
+                self.command(0xA4)              # Display off (all pixels off)
+                self.command(0xB3, 0xF2)        # Display divide clockratio/freq
+                self.command(0xCA, 0x3F)        # Set MUX ratio
+                self.command(0xA2, 0x00)        # Display offset
+                self.command(0xA1, 0x00)        # Display start Line
+                self.command(0xA0, 0x14, 0x11)  # Set remap & dual COM Line
+                self.command(0xB5, 0x00)        # Set GPIO (disabled)
+                self.command(0xAB, 0x01)        # Function select (internal Vdd)
+                self.command(0xB4, 0xA0, 0xFD)  # Display enhancement A (External VSL)
+                self.command(0xC7, 0x0F)        # Master contrast (reset)
+                self.command(0xB9)              # Set default greyscale table
+                self.command(0xB1, 0xF0)        # Phase length
+                self.command(0xD1, 0x82, 0x20)  # Display enhancement B (reset)
+                self.command(0xBB, 0x0D)        # Pre-charge voltage
+                self.command(0xB6, 0x08)        # 2nd precharge period
+                self.command(0xBE, 0x00)        # Set VcomH
+                self.command(0xA6)              # Normal display (reset)
+                self.command(0xA9)              # Exit partial display
+
+                self.contrast(0x7F)             # Reset
+                self.clear()
+            self.show()
 
-    def _render_mono(self, buf, pixel_data):
+    def _render_mono(self, buf, image):
         i = 0
-        for pix in pixel_data:
+        for pix in image.getdata():
             if pix > 0:
                 if i % 2 == 0:
                     buf[i // 2] = 0xF0
@@ -370,9 +968,9 @@ class ssd1322(device):
 
             i += 1
 
-    def _render_greyscale(self, buf, pixel_data):
+    def _render_greyscale(self, buf, image):
         i = 0
-        for r, g, b in pixel_data:
+        for r, g, b in image.getdata():
             # RGB->Greyscale luma calculation into 4-bits
             grey = (r * 306 + g * 601 + b * 117) >> 14
 
@@ -384,38 +982,92 @@ class ssd1322(device):
 
             i += 1
 
-    def display(self, image):
+    def _render_grey(self, buf, image):
+        buf[:] = _pack_nibbles(image)
+
+    def display(self, image, damage=None):
         """
-        Takes a 1-bit monochrome or 24-bit RGB image and renders it
-        to the SSD1322 OLED display. RGB pixels are converted to 4-bit
-        greyscale values using a simplified Luma calculation, based on
+        Takes a 1-bit monochrome, 8-bit greyscale or 24-bit RGB image and
+        renders it to the SSD1322 OLED display. Greyscale pixels keep their
+        top 4 bits, and RGB pixels are converted to 4-bit greyscale values
+        using a simplified Luma calculation, based on
         *Y'=0.299R'+0.587G'+0.114B'*.
 
         :param image: the image to render
         :type image: PIL.Image.Image
+        :param damage: optional list of ``(left, top, right, bottom)`` regions
+            which changed since the previous image; only those (widened to
+            4-pixel column boundaries) are sent and no difference is
+            calculated.
+        :type damage: list
         """
         assert(image.mode == self.mode)
         assert(image.size == self.size)
 
-        image = self.preprocess(image)
-
-        if self.framebuffer.redraw_required(image):
-            left, top, right, bottom = self.framebuffer.inflate_bbox()
-            width = right - left
-            height = bottom - top
-
-            pix_start = self.column_offset + left
-            coladdr_start = pix_start >> 2
-            coladdr_end = (pix_start + width >> 2) - 1
-
-            self.command(0x15, coladdr_start, coladdr_end)  # set column addr
-            self.command(0x75, top, bottom - 1)             # Reset row addr
-            self.command(0x5C)                              # Enable MCU to write data into RAM
+        with self.transaction():
+            # The panel contents are unknown after a warm start or packed data
+            if self._unknown_contents:
+                self._unknown_contents = False
+                damage = [(0, 0) + self.size]
+
+            if damage is not None:
+                image = self.preprocess(image)
+                self.framebuffer.retain(image)
+                for region in _align_columns(self.preprocess_damage(damage), 4):
+                    self._forget_last_frame()
+                    self._send_region(self._pack_region(image, region), region)
+                return
+
+            if self.frame_cache is not None:
+                buf = self._pack_cached(image, self._pack)
+                if buf is not None:
+                    self._send_region(buf, (0, 0, self._w, self._h))
+                return
+
+            image = self.preprocess(image)
+
+            if self.framebuffer.redraw_required(image):
+                for region in _align_columns(self.framebuffer.regions, 4):
+                    self._send_region(self._pack_region(self.framebuffer.image, region), region)
+
+    def display_packed(self, buf, region=None):
+        """
+        Sends a buffer of 4-bit greyscale pixels, two per byte with the left
+        one in the high nibble, as produced by :py:func:`pack`, straight to
+        the display. The ``left`` and ``right`` of a region must be multiples
+        of 4. See :py:func:`luma.core.device.device.display_packed`.
+        """
+        left, top, right, bottom = region = region or (0, 0, self._w, self._h)
+        assert(left % 4 == 0 and right % 4 == 0)
+        assert(len(buf) == (right - left) * (bottom - top) >> 1)
+
+        with self.transaction():
+            self._forget_last_frame()
+            self._unknown_contents = True
+            self._send_region(buf, region)
+
+    def _send_region(self, buf, region):
+        left, top, right, bottom = region
+        pix_start = self.column_offset + left
+        coladdr_start = pix_start >> 2
+        coladdr_end = (pix_start + right - left >> 2) - 1
+
+        self.command(0x15, coladdr_start, coladdr_end)  # set column addr
+        self.command(0x75, top, bottom - 1)             # Reset row addr
+        self.command(0x5C)                              # Enable MCU to write data into RAM
+        self.data(list(buf))
 
-            buf = bytearray(width * height >> 1)
+    def _pack_region(self, image, region):
+        left, top, right, bottom = region
+        buf = bytearray((right - left) * (bottom - top) >> 1)
+        self.populate(buf, image.crop(region))
+        return buf
 
-            self.populate(buf, self.framebuffer.getdata())
-            self.data(list(buf))
+    def _pack(self, image):
+        image = self.preprocess(image)
+        buf = bytearray(self._w * self._h >> 1)
+        self.populate(buf, image)
+        return buf
 
     def command(self, cmd, *args):
         """
@@ -423,9 +1075,9 @@ class ssd1322(device):
         delegated serial interface. Note that the arguments are passed through
         as data.
         """
-        self._serial_interface.command(cmd)
+        super(ssd1322, self).command(cmd)
         if len(args) > 0:
-            self._serial_interface.data(list(args))
+            self.data(list(args))
 
 
 class ssd1325(device):
@@ -433,11 +1085,14 @@ class ssd1325(device):
     Encapsulates the serial interface to the 4-bit greyscale SSD1325 OLED
     display hardware. On creation, an initialization sequence is pumped to the
     display to properly configure it. Further control commands can then be
-    called to affect the brightness and other settings.
+    called to affect the brightness and other settings. With
+    ``warm_start=True``, a panel already configured by a previous process is
+    taken over instead; see :py:class:`luma.core.device.device`.
     """
     def __init__(self, serial_interface=None, width=128, height=64, rotate=0,
-                 mode="RGB", **kwargs):
-        super(ssd1325, self).__init__(luma.core.const.common, serial_interface)
+                 mode="RGB", frame_cache=0, warm_start=False, **kwargs):
+        super(ssd1325, self).__init__(luma.core.const.common, serial_interface,
+                                      frame_cache)
         self.capabilities(width, height, rotate, mode)
         self._buffer_size = width * height // 2
 
@@ -445,30 +1100,36 @@ class ssd1325(device):
             raise luma.core.error.DeviceDisplayModeError(
                 "Unsupported display mode: {0} x {1}".format(width, height))
 
-        self.command(
-            0xAE,               # Diplay off (all pixels off)
-            0xB3, 0xF2,         # Display divide clockratio/freq
-            0xA8, 0x3F,         # Set MUX ratio
-            0xA2, 0x4C,         # Display offset
-            0xA1, 0x00,         # Display start line
-            0xAD, 0x02,         # Master configuration (external Vcc)
-            0xA0, 0x50,         # Set remap (enable COM remap & split odd/even)
-            0x86,               # Set current range (full)
-            0xB8, 0x01, 0x11,   # Set greyscale table
-            0x22, 0x32, 0x43,   # .. cont
-            0x54, 0x65, 0x76,   # .. cont
-            0xB2, 0x51,         # Set row period
-            0xB1, 0x55,         # Set phase length
-            0xB4, 0x03,         # Set pre-charge compensation level
-            0xB0, 0x28,         # Set pre-charge compensation enable
-            0xBC, 0x01,         # Pre-charge voltage
-            0xBE, 0x00,         # Set VcomH
-            0xBF, 0x02,         # Set VSL (not connected)
-            0xA4)               # Normal dislay
-
-        self.contrast(0x7F)
-        self.clear()
-        self.show()
+        with self.transaction():
+            if warm_start:
+                self.command(
+                    0xA1, 0x00,         # Display start line
+                    0xA0, 0x50)         # Set remap (enable COM remap & split odd/even)
+            else:
+                self.command(
+                    0xAE,               # Diplay off (all pixels off)
+                    0xB3, 0xF2,         # Display divide clockratio/freq
+                    0xA8, 0x3F,         # Set MUX ratio
+                    0xA2, 0x4C,         # Display offset
+                    0xA1, 0x00,         # Display start line
+                    0xAD, 0x02,         # Master configuration (external Vcc)
+                    0xA0, 0x50,         # Set remap (enable COM remap & split odd/even)
+                    0x86,               # Set current range (full)
+                    0xB8, 0x01, 0x11,   # Set greyscale table
+                    0x22, 0x32, 0x43,   # .. cont
+                    0x54, 0x65, 0x76,   # .. cont
+                    0xB2, 0x51,         # Set row period
+                    0xB1, 0x55,         # Set phase length
+                    0xB4, 0x03,         # Set pre-charge compensation level
+                    0xB0, 0x28,         # Set pre-charge compensation enable
+                    0xBC, 0x01,         # Pre-charge voltage
+                    0xBE, 0x00,         # Set VcomH
+                    0xBF, 0x02,         # Set VSL (not connected)
+                    0xA4)               # Normal dislay
+
+                self.contrast(0x7F)
+                self.clear()
+            self.show()
 
     def _render_mono(self, buf, image):
         i = 0
@@ -495,27 +1156,77 @@ class ssd1325(device):
 
             i += 1
 
-    def display(self, image):
+    def _render_grey(self, buf, image):
+        buf[:] = _pack_nibbles(image, low_first=True)
+
+    def _render(self, buf, image):
+        if self.mode == "1":
+            self._render_mono(buf, image)
+        elif self.mode == "L":
+            self._render_grey(buf, image)
+        else:
+            self._render_greyscale(buf, image)
+
+    def display(self, image, damage=None):
         """
-        Takes a 1-bit monochrome or 24-bit RGB :py:mod:`PIL.Image` and dumps it
-        to the SSD1325 OLED display, converting the image pixels to 4-bit
+        Takes a 1-bit monochrome, 8-bit greyscale or 24-bit RGB
+        :py:mod:`PIL.Image` and dumps it to the SSD1325 OLED display. Greyscale
+        pixels keep their top 4 bits, and RGB pixels are converted to 4-bit
         greyscale using a simplified Luma calculation, based on
-        *Y'=0.299R'+0.587G'+0.114B'*.
+        *Y'=0.299R'+0.587G'+0.114B'*. If a list of ``damage`` regions is
+        supplied, only those (widened to 2-pixel column boundaries) are sent.
         """
         assert(image.mode == self.mode)
         assert(image.size == self.size)
 
-        image = self.preprocess(image)
+        with self.transaction():
+            if damage is not None:
+                image = self.preprocess(image)
+                for region in _align_columns(self.preprocess_damage(damage), 2):
+                    self._forget_last_frame()
+                    self._send_window(self._pack_region(image, region), region)
+                return
 
-        self.command(
-            0x15, 0x00, self._w - 1,  # set column addr
-            0x75, 0x00, self._h - 1)  # set row addr
+            buf = self._pack_cached(image, self._pack)
+            if buf is None:
+                return
 
-        buf = bytearray(self._buffer_size)
+            self.command(
+                0x15, 0x00, self._w - 1,  # set column addr
+                0x75, 0x00, self._h - 1)  # set row addr
 
-        if self.mode == "1":
-            self._render_mono(buf, image)
-        else:
-            self._render_greyscale(buf, image)
+            self.data(list(buf))
+
+    def display_packed(self, buf, region=None):
+        """
+        Sends a buffer of 4-bit greyscale pixels, two per byte with the left
+        one in the low nibble, as produced by :py:func:`pack`, straight to
+        the display. The ``left`` and ``right`` of a region must be even.
+        See :py:func:`luma.core.device.device.display_packed`.
+        """
+        left, top, right, bottom = region = region or (0, 0, self._w, self._h)
+        assert(left % 2 == 0 and right % 2 == 0)
+        assert(len(buf) == (right - left) * (bottom - top) // 2)
+
+        with self.transaction():
+            self._forget_last_frame()
+            self._send_window(buf, region)
 
+    def _send_window(self, buf, region):
+        left, top, right, bottom = region
+        self.command(
+            0x15, left // 2, right // 2 - 1,  # set column addr
+            0x75, top, bottom - 1)            # set row addr
         self.data(list(buf))
+
+    def _pack_region(self, image, region):
+        left, top, right, bottom = region
+        buf = bytearray((right - left) * (bottom - top) // 2)
+        self._render(buf, image.crop(region))
+        return buf
+
+    def _pack(self, image):
+        image = self.preprocess(image)
+        buf = bytearray(self._buffer_size)
+        self._render(buf, image)
+        return buf
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Models of the display RAM of each controller driven by
+:py:mod:`luma.oled.device`. Each stands in for a serial interface, and
+renders what it was sent as an image, so that a recording made with
+:py:class:`luma.core.interface.recorder.recorder` can be turned back into
+the frames it showed, e.g. to compare two recordings::
+
+    from luma.core.interface.recorder import frames
+    from luma.oled.ram import ssd1306
+
+    for seconds, image in frames("session.rec", ssd1306()):
+        ...
+
+Only what the drivers make use of is modelled: the addressing commands and
+data writes, the scan directions and start line of the SSD1306 and SH1106,
+and the drawing commands of the SSD1331. Images are as the drivers would
+have been given them with ``rotate=0``.
+"""
+
+from PIL import Image, ImageDraw
+
+
+__all__ = ["ssd1306", "sh1106", "ssd1331", "ssd1322", "ssd1325"]
+
+
+class _controller(object):
+    """
+    Splits the command bytes into commands and their arguments.
+    """
+    # Number of argument bytes following each command which takes any
+    ARGS = {}
+
+    def __init__(self):
+        self._pending = None
+
+    def command(self, *cmd):
+        for byte in cmd:
+            if self._pending is not None:
+                op, args = self._pending
+                args.append(byte)
+                if len(args) == self.ARGS[op]:
+                    self._pending = None
+                    self._execute(op, args)
+            elif byte in self.ARGS:
+                self._pending = (byte, [])
+            else:
+                self._execute(byte, [])
+
+    def data(self, data):
+        for byte in data:
+            self._write(byte)
+
+    def cleanup(self):
+        pass
+
+    def _execute(self, op, args):
+        pass
+
+    def _write(self, byte):
+        pass
+
+
+class ssd1306(_controller):
+    """
+    Models an SSD1306's 128 column by 8 page RAM.
+
+    :param width: the width of the panel, as given to the driver.
+    :type width: int
+    :param height: the height of the panel, as given to the driver.
+    :type height: int
+    """
+    ARGS = {0x20: 1, 0x21: 2, 0x22: 2, 0x26: 6, 0x27: 6, 0x29: 5, 0x2A: 5,
+            0x81: 1, 0x8D: 1, 0xA3: 2, 0xA8: 1, 0xD3: 1, 0xD5: 1, 0xD9: 1,
+            0xDA: 1, 0xDB: 1}
+    COLUMNS = 128
+
+    def __init__(self, width=128, height=64):
+        super(ssd1306, self).__init__()
+        self._width, self._height = width, height
+        self._ram = [bytearray(self.COLUMNS) for _ in range(8)]
+        self._columns = (0, self.COLUMNS - 1)
+        self._pages = (0, 7)
+        self._column, self._page = 0, 0
+        self._addressing = 2     # Page addressing, on reset
+        self._remap = self._com_remap = False
+        self._start_line = 0
+
+    def _execute(self, op, args):
+        if op == 0x20:
+            self._addressing = args[0] & 0x03
+        elif op == 0x21:
+            self._columns = tuple(args)
+            self._column = args[0]
+        elif op == 0x22:
+            self._pages = tuple(args)
+            self._page = args[0]
+        elif op in (0xA0, 0xA1):
+            self._remap = op == 0xA1
+        elif op in (0xC0, 0xC8):
+            self._com_remap = op == 0xC8
+        elif 0x40 <= op <= 0x7F:
+            self._start_line = op - 0x40
+        elif 0xB0 <= op <= 0xB7:
+            self._page = op - 0xB0
+        elif op <= 0x0F:
+            self._column = self._column & 0xF0 | op
+        elif op <= 0x1F:
+            self._column = self._column & 0x0F | (op & 0x0F) << 4
+
+    def _write(self, byte):
+        if self._column < self.COLUMNS:
+            self._ram[self._page & 7][self._column] = byte
+
+        first_column, last_column = self._columns
+        first_page, last_page = self._pages
+        if self._addressing == 0:
+            self._column += 1
+            if self._column > last_column:
+                self._column = first_column
+                self._page = first_page if self._page >= last_page else self._page + 1
+        elif self._addressing == 1:
+            self._page += 1
+            if self._page > last_page:
+                self._page = first_page
+                self._column = first_column if self._column >= last_column else self._column + 1
+        else:
+            self._column += 1
+            if self._column > last_column:
+                self._column = first_column
+
+    def _column_offset(self):
+        return (self.COLUMNS - self._width) // 2
+
+    def image(self):
+        """
+        Returns what the panel shows, as a 1-bit image.
+
+        :rtype: PIL.Image.Image
+        """
+        image = Image.new("1", (self._width, self._height))
+        pixels = image.load()
+        offset = self._column_offset()
+        for y in range(self._height):
+            row = y if self._com_remap else self._height - 1 - y
+            row = (row + self._start_line) % 64
+            page = self._ram[row // 8]
+            mask = 1 << row % 8
+            for x in range(self._width):
+                column = x if self._remap else self._width - 1 - x
+                if page[column + offset] & mask:
+                    pixels[x, y] = 1
+        return image
+
+
+class sh1106(ssd1306):
+    """
+    Models an SH1106's 132 column by 8 page RAM, which only has page
+    addressing.
+
+    :param width: the width of the panel, as given to the driver.
+    :type width: int
+    :param height: the height of the panel, as given to the driver.
+    :type height: int
+    """
+    ARGS = {0x81: 1, 0x8D: 1, 0xAD: 1, 0xA8: 1, 0xD3: 1, 0xD5: 1, 0xD9: 1,
+            0xDA: 1, 0xDB: 1}
+    COLUMNS = 132
+
+    def _execute(self, op, args):
+        if op not in (0x20, 0x21, 0x22):
+            super(sh1106, self)._execute(op, args)
+
+    def _column_offset(self):
+        return 2
+
+
+class ssd1331(_controller):
+    """
+    Models an SSD1331's 96 by 64 RAM of 16-bit pixels, including its line,
+    rectangle, copy and clear commands.
+    """
+    ARGS = {0x15: 2, 0x75: 2, 0x81: 1, 0x82: 1, 0x83: 1, 0x87: 1, 0x8A: 1,
+            0x8B: 1, 0x8C: 1, 0xA0: 1, 0xA1: 1, 0xA2: 1, 0xA8: 1, 0xAD: 1,
+            0xB0: 1, 0xB1: 1, 0xB3: 1, 0xBB: 1, 0xBE: 1,
+            0x21: 7, 0x22: 10, 0x23: 6, 0x24: 4, 0x25: 4, 0x26: 1, 0x27: 5}
+
+    def __init__(self):
+        super(ssd1331, self).__init__()
+        self._image = Image.new("RGB", (96, 64))
+        self._draw = ImageDraw.Draw(self._image)
+        self._columns, self._rows = (0, 95), (0, 63)
+        self._column, self._row = 0, 0
+        self._high = None
+        self._fill = False
+
+    @staticmethod
+    def _color(r, g, b):
+        # The drawing commands take 6-bit components
+        return r >> 1 << 3, g << 2, b >> 1 << 3
+
+    def _execute(self, op, args):
+        if op == 0x15:
+            self._columns = tuple(args)
+            self._column, self._row = args[0], self._rows[0]
+        elif op == 0x75:
+            self._rows = tuple(args)
+            self._column, self._row = self._columns[0], args[0]
+        elif op == 0x26:
+            self._fill = bool(args[0] & 0x01)
+        elif op == 0x21:
+            self._draw.line(args[:4], fill=self._color(*args[4:7]))
+        elif op == 0x22:
+            self._draw.rectangle(args[:4], outline=self._color(*args[4:7]),
+                                 fill=self._color(*args[7:10]) if self._fill else None)
+        elif op == 0x23:
+            left, top, right, bottom, x, y = args
+            self._image.paste(self._image.crop((left, top, right + 1, bottom + 1)), (x, y))
+        elif op == 0x25:
+            self._draw.rectangle(args, fill=(0, 0, 0))
+
+    def _write(self, byte):
+        if self._high is None:
+            self._high = byte
+            return
+
+        high, self._high = self._high, None
+        if self._column < 96 and self._row < 64:
+            self._image.putpixel((self._column, self._row), (
+                high & 0xF8, (high & 0x07) << 5 | (byte & 0xE0) >> 3, (byte & 0x1F) << 3))
+
+        self._column += 1
+        if self._column > self._columns[1]:
+            self._column = self._columns[0]
+            self._row = self._rows[0] if self._row >= self._rows[1] else self._row + 1
+
+    def image(self):
+        """
+        Returns what the panel shows, as an RGB image.
+
+        :rtype: PIL.Image.Image
+        """
+        return self._image.copy()
+
+
+class _greyscale(_controller):
+    """
+    A RAM of 4-bit pixels, written two at a time within a window.
+    """
+    def __init__(self, columns, rows):
+        super(_greyscale, self).__init__()
+        self._ram = [bytearray(columns) for _ in range(rows)]
+        self._columns, self._rows = (0, columns // 2 - 1), (0, rows - 1)
+        self._column, self._row = 0, 0
+
+    def _write(self, byte):
+        # Each column address covers two pixels
+        row = self._ram[self._row]
+        if self._column * 2 + 1 < len(row):
+            row[self._column * 2:self._column * 2 + 2] = self._pixels(byte)
+
+        self._column += 1
+        if self._column > self._columns[1]:
+            self._column = self._columns[0]
+            self._row = self._rows[0] if self._row >= self._rows[1] else self._row + 1
+
+    def _greyscale_image(self, left, width, height):
+        image = Image.new("L", (width, height))
+        image.putdata([v * 17 for row in self._ram[:height] for v in row[left:left + width]])
+        return image
+
+
+class ssd1322(_greyscale):
+    """
+    Models an SSD1322's 480 by 128 RAM of 4-bit pixels. The driver sends
+    command arguments as data, and pixel data only follows a ``0x5C``
+    command.
+
+    :param width: the width of the panel, as given to the driver.
+    :type width: int
+    :param height: the height of the panel, as given to the driver.
+    :type height: int
+    """
+    def __init__(self, width=256, height=64):
+        super(ssd1322, self).__init__(480, 128)
+        self._width, self._height = width, height
+        self._op, self._args = None, []
+
+    def command(self, *cmd):
+        for byte in cmd:
+            self._op, self._args = byte, []
+            if byte == 0x5C:
+                self._column, self._row = self._columns[0], self._rows[0]
+
+    def data(self, data):
+        for byte in data:
+            if self._op == 0x5C:
+                self._write(byte)
+                continue
+
+            self._args.append(byte)
+            if len(self._args) == 2 and self._op == 0x15:
+                # Column addresses cover four pixels, two bytes of data
+                self._columns = (self._args[0] * 2, self._args[1] * 2 + 1)
+            elif len(self._args) == 2 and self._op == 0x75:
+                self._rows = tuple(self._args)
+
+    @staticmethod
+    def _pixels(byte):
+        return byte >> 4, byte & 0x0F
+
+    def image(self):
+        """
+        Returns what the panel shows, as an 8-bit greyscale image.
+
+        :rtype: PIL.Image.Image
+        """
+        return self._greyscale_image((480 - self._width) // 2, self._width, self._height)
+
+
+class ssd1325(_greyscale):
+    """
+    Models an SSD1325's 128 by 80 RAM of 4-bit pixels.
+    """
+    ARGS = {0x15: 2, 0x75: 2, 0x81: 1, 0xA0: 1, 0xA1: 1, 0xA2: 1, 0xA8: 1,
+            0xAD: 1, 0xB0: 1, 0xB1: 1, 0xB2: 1, 0xB3: 1, 0xB4: 1, 0xB8: 8,
+            0xBC: 1, 0xBE: 1, 0xBF: 1}
+
+    def __init__(self):
+        super(ssd1325, self).__init__(128, 80)
+
+    def _execute(self, op, args):
+        if op == 0x15:
+            self._columns = (args[0] & 0x3F, args[1] & 0x3F)
+            self._column, self._row = self._columns[0], self._rows[0]
+        elif op == 0x75:
+            self._rows = (args[0] & 0x7F, args[1] & 0x7F)
+            self._column, self._row = self._columns[0], self._rows[0]
+
+    @staticmethod
+    def _pixels(byte):
+        return byte & 0x0F, byte >> 4
+
+    def image(self):
+        """
+        Returns what the panel shows, as an 8-bit greyscale image.
+
+        :rtype: PIL.Image.Image
+        """
+        return self._greyscale_image(0, 128, 64)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Drawing surfaces which make use of display controller features.
+"""
+
+from PIL import ImageColor, ImageDraw
+
+from luma.core.render import canvas, damage_tracker
+from luma.core.util import merge_regions
+
+
+__all__ = ["accelerated_canvas"]
+
+
+def _box(xy, ordered=False):
+    """
+    Returns the inclusive ``(left, top, right, bottom)`` box spanned by a
+    pair of points in integer coordinates, or ``None`` if ``xy`` is not one
+    or, when ``ordered``, if its first point is not the top left corner.
+    """
+    if isinstance(xy[0], (tuple, list)):
+        xy = [v for point in xy for v in point]
+    if len(xy) != 4 or not all(isinstance(v, int) for v in xy):
+        return None
+    x0, y0, x1, y1 = xy
+    if ordered and (x0 > x1 or y0 > y1):
+        return None
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+def _color(ink):
+    """
+    Returns an ``(r, g, b)`` tuple for an ink as accepted by PIL when drawing
+    on an RGB image, or ``None`` if it is not one.
+    """
+    try:
+        if isinstance(ink, (str, type(u""))):
+            return ImageColor.getrgb(ink)[:3]
+        if isinstance(ink, int):
+            return (ink & 0xFF, ink >> 8 & 0xFF, ink >> 16 & 0xFF)
+        if isinstance(ink, (tuple, list)) and len(ink) in (3, 4):
+            return tuple(ink[:3])
+    except ValueError:
+        pass
+    return None
+
+
+class _accelerator(damage_tracker):
+    """
+    Draws onto the image, and at the same time passes those primitives which
+    the display controller can draw itself on to the device, recording the
+    rest as damaged regions. Until a device is given, everything is recorded
+    as damage.
+    """
+    def __init__(self, draw, image, device=None):
+        super(_accelerator, self).__init__(draw, image.size)
+        self._image = image
+        self._device = device
+
+    def _flush(self):
+        # Brings the display up to date with the image, as a copy reads
+        # the display contents rather than the image
+        if self.regions:
+            self._device.display(self._image, damage=merge_regions(self.regions))
+            self.regions = []
+
+    def line(self, xy, *args, **kwargs):
+        box = _box(xy)
+        color = _color(kwargs.get("fill", args[0] if args else None))
+        width = kwargs.get("width", args[1] if len(args) > 1 else 1)
+        if (self._device is None or box is None or color is None or width > 1 or
+                box[0] != box[2] and box[1] != box[3] or
+                not self._device.draw_line(box, color)):
+            return super(_accelerator, self).line(xy, *args, **kwargs)
+        return self._draw.line(xy, *args, **kwargs)
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        box = _box(xy, ordered=True)
+        fill_color, outline_color = _color(fill), _color(outline)
+        if fill is not None and outline is None:
+            outline_color = fill_color
+        elif box is not None and box[1] == box[3]:
+            box = None  # see damage_tracker.rectangle
+        args = (xy, fill, outline) if width == 1 else (xy, fill, outline, width)
+        if (self._device is None or box is None or width != 1 or
+                outline_color is None or fill is not None and fill_color is None or
+                not self._device.draw_rectangle(box, outline_color, fill_color)):
+            return super(_accelerator, self).rectangle(*args)
+        return self._draw.rectangle(*args)
+
+    def copy(self, xy, dest):
+        """
+        Copies the box ``xy``, given as for :py:meth:`rectangle`, so that its
+        top left corner lands on ``dest``. Parts falling outside the image
+        are dropped.
+
+        :param xy: the corners of the box to copy
+        :param dest: the ``(x, y)`` position to copy it to
+        :type dest: tuple
+        """
+        left, top, right, bottom = _box(xy)
+        x, y = dest
+        if self._device is not None:
+            self._flush()
+        if self._device is None or not self._device.copy_region((left, top, right, bottom), (x, y)):
+            self.damage(x, y, x + right - left + 1, y + bottom - top + 1)
+        self._image.paste(self._image.crop((left, top, right + 1, bottom + 1)), (x, y))
+
+
+class accelerated_canvas(canvas):
+    """
+    A canvas for the :py:class:`luma.oled.device.ssd1331` which hands
+    rectangles, fills, clears and horizontal or vertical lines over to the
+    display controller's drawing commands, so that they cost a handful of
+    command bytes rather than a stream of pixels. Anything else is drawn as
+    usual and the regions it touched are sent when the with-block completes.
+
+    The drawing object additionally offers ``copy(xy, dest)``, which moves
+    the box ``xy`` so that its top left corner lands on ``dest`` using the
+    controller's copy command, e.g. to scroll content.
+
+    Like a ``canvas`` with ``damage=True``, it is intended to be retained and
+    drawn upon repeatedly, where anything not redrawn stays as it was. The
+    first flush always covers the whole image, and nothing is accelerated
+    until then. The device's framebuffer is kept up to date on every flush.
+
+    :param device: The device to flush frames onto.
+    :param background: An optional image, the size of the device, which the
+        canvas starts from.
+    :type background: PIL.Image.Image
+    """
+    def __init__(self, device, background=None):
+        super(accelerated_canvas, self).__init__(device, background, damage=True)
+
+    def __enter__(self):
+        self.draw = _accelerator(ImageDraw.Draw(self.image), self.image,
+                                 self.device if self._flushed else None)
+        return self.draw
@@ -5,7 +5,10 @@ from __future__ import unicode_literals
 
 import os
 import sys
+import mmap
 import time
+import struct
+import select
 import datetime
 import argparse
 
@@ -14,7 +17,8 @@ from watchdog.events import FileSystemEventHandler
 
 from luma.core import cmdline, error
 from luma.core.render import canvas
-from luma.core.sprite_system import framerate_regulator
+from luma.core.virtual import history
+from luma.core.sprite_system import framerate_regulator, monotonic
 from PIL import ImageFont
 
 
@@ -23,10 +27,136 @@ class WatchDogEvent(FileSystemEventHandler):
     def __init__(self, filename):
         self.filename = filename
         self.modified = None
+        self.wakeup = os.pipe()
 
     def on_modified(self, event):
         if event.src_path == self.filename:
             self.modified = True
+            os.write(self.wakeup[1], b"x")
+
+    # Forget about previous modifications
+    def reset(self):
+        self.modified = False
+        while select.select([self.wakeup[0]], [], [], 0)[0]:
+            os.read(self.wakeup[0], 512)
+
+    # Sleep until the timeout elapsed or the status file was modified
+    def wait(self, timeout=None):
+        if select.select([self.wakeup[0]], [], [], None if timeout is None else max(timeout, 0))[0]:
+            os.read(self.wakeup[0], 512)
+        return self.modified
+
+    # Read all properties from the status file
+    def read(self):
+        properties = {}
+        with open(self.filename) as fp:
+            for line in fp:
+                 parts = line.strip().split("\t")
+                 pkey = parts[0].strip()
+                 pval = parts[1].strip() if len(parts)>1 else ""
+                 properties[pkey] = pval
+        return properties
+
+
+# Status record in a shared memory file, written by the collector process
+# and read by the renderer process. The sequence counter works as seqlock:
+# it is odd while the collector writes and incremented again when done.
+class SharedStatus:
+    MAGIC = b"PLCD"
+    VERSION = 1
+    HEADER = struct.Struct(str("<4sHxxI"))
+    FIELDS = [
+        ("CHARG_IND", 4),
+        ("BATT_PERCENT", 8),
+        ("WIFI_NET", 32),
+        ("WIFI_IP", 48),
+        ("WAN_IP", 48),
+        ("WAN_ORG", 64),
+    ]
+    RECORD = struct.Struct(str("<" + "".join([ "%ds" % size for key, size in FIELDS ])))
+    SEQUENCE = struct.Struct(str("<I"))
+    SEQOFFSET = 8
+
+    def __init__(self, filename, writable=False, poll=1.0):
+        self.filename = filename
+        self.poll = poll
+        size = self.HEADER.size + self.RECORD.size
+        if writable:
+            fd = os.open(filename, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self.block = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+            magic, version, sequence = self.HEADER.unpack_from(self.block, 0)
+            if magic != self.MAGIC or version != self.VERSION:
+                self.HEADER.pack_into(self.block, 0, self.MAGIC, self.VERSION, 0)
+            elif sequence & 1:
+                # previous collector died while writing
+                self.SEQUENCE.pack_into(self.block, self.SEQOFFSET, sequence + 1)
+        else:
+            fd = os.open(filename, os.O_RDONLY)
+            self.block = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+            magic, version, sequence = self.HEADER.unpack_from(self.block, 0)
+            if magic != self.MAGIC or version != self.VERSION:
+                raise IOError("%s is not a pocketlcd status block" % filename)
+        os.close(fd)
+        self.seen = self.sequence()
+
+    # Current value of the sequence counter
+    def sequence(self):
+        return self.SEQUENCE.unpack_from(self.block, self.SEQOFFSET)[0]
+
+    @property
+    def modified(self):
+        return self.sequence() != self.seen
+
+    # Forget about previous modifications
+    def reset(self):
+        self.seen = self.sequence()
+
+    # Poll the sequence counter until the timeout elapsed or the status changed
+    def wait(self, timeout=None):
+        end = None if timeout is None else monotonic() + max(timeout, 0)
+        while not self.modified:
+            left = self.poll if end is None else min(self.poll, end - monotonic())
+            if left <= 0:
+                break
+            time.sleep(left)
+        return self.modified
+
+    # Store properties, only called by the collector
+    def write(self, properties):
+        record = [ properties.get(key, "").encode("utf-8")[0:size] for key, size in self.FIELDS ]
+        sequence = self.sequence()
+        self.SEQUENCE.pack_into(self.block, self.SEQOFFSET, sequence + 1)
+        self.RECORD.pack_into(self.block, self.HEADER.size, *record)
+        self.SEQUENCE.pack_into(self.block, self.SEQOFFSET, sequence + 2)
+
+    # Read a consistent copy of the properties
+    def read(self):
+        while True:
+            sequence = self.sequence()
+            if sequence == 0:
+                raise IOError("no status written to %s yet" % self.filename)
+            if sequence & 1 == 0:
+                record = self.RECORD.unpack_from(self.block, self.HEADER.size)
+                if self.sequence() == sequence:
+                    break
+            time.sleep(0.001)
+
+        properties = {}
+        for i, field in enumerate(self.FIELDS):
+            properties[field[0]] = record[i].rstrip(b"\0").decode("utf-8", "ignore")
+        return properties
+
+
+# Frame rate regulator which stops sleeping as soon as the status file changes
+class InterruptibleRegulator(framerate_regulator):
+    def __init__(self, obs, fps):
+        framerate_regulator.__init__(self, fps=fps)
+        self.obs = obs
+
+    def sleep(self, seconds):
+        self.obs.wait(seconds)
 
 # Contains a icon or text label
 class Label:
@@ -85,7 +215,8 @@ class Label:
 # Contains all informations for display drawing
 class PocketLCD:
     def __init__(self, device):
-        self.lcd = device
+        self.device = device
+        self.lcd = history(device)
         self.label = {}
         self.fontsize = 10
         self.font = {}
@@ -106,21 +237,305 @@ class PocketLCD:
             os.path.dirname(__file__), 'fonts', name))
         return ImageFont.truetype(font_path, self.fontsize if size is None else size)
 
+# Collects values about the display loop and publishes them as tab separated file
+class Metrics:
+    def __init__(self, filename=None, interval=60.0):
+        self.filename = filename
+        self.interval = interval
+        self.published = None
+        self.values = {}
+
+    # Set a value
+    def set(self, key, value):
+        self.values[key] = value
+
+    # Increment a counter
+    def inc(self, key, amount=1):
+        self.values[key] = self.values.get(key, 0) + amount
+
+    # Write all values into the metrics file, same format as the status file
+    def publish(self):
+        if self.filename is None:
+            return
+        tmpname = self.filename + ".tmp"
+        with open(tmpname, "w") as fp:
+            for key in sorted(self.values):
+                fp.write("%s\t%s\n" % (key, self.values[key]))
+        os.rename(tmpname, self.filename)
+        self.published = monotonic()
+
+    # Write the values if the last write is older than the interval, for counters
+    def tick(self):
+        if self.published is None or monotonic() - self.published >= self.interval:
+            self.publish()
+
+
+# Decides how often the display is refreshed and when it is switched off
+class Governor:
+    def __init__(self, args, lcd, metrics):
+        self.lcd = lcd
+        self.metrics = metrics
+        self.tiers = self.parsetiers(args.governor_tiers)
+        self.schedule = self.parseschedule(args.blank_schedule)
+        self.basefps = args.display_fps
+        self.baseclock = args.clock_refresh
+        self.duty = args.governor_duty
+        self.tier = "charging"
+        self.scale = 1.0
+        self.framecost = None
+        self.hidden = False
+        self.fps = self.basefps
+
+    # Parse "50:1.0,20:0.5" into [(50.0, 1.0), (20.0, 0.5)], highest threshold first
+    def parsetiers(self, value):
+        tiers = []
+        for tier in value.split(","):
+            threshold, scale = tier.split(":")
+            tiers.append((float(threshold), float(scale)))
+        return sorted(tiers, reverse=True)
+
+    # Parse "23:00-07:00,13:00-14:00" into a list of (start, end) minute pairs
+    def parseschedule(self, value):
+        schedule = []
+        for span in (value or "").split(","):
+            if span.strip() == "":
+                continue
+            start, end = [ int(t.split(":")[0])*60+int(t.split(":")[1]) for t in span.strip().split("-") ]
+            schedule.append((start, end))
+        return schedule
+
+    # Choose the policy tier from the battery state
+    def update(self, perc, charging):
+        if charging:
+            tier, scale = "charging", 1.0
+        else:
+            tier, scale = "below", 0.0
+            for threshold, tscale in self.tiers:
+                if perc >= threshold:
+                    tier, scale = str(int(threshold)), tscale
+                    break
+
+        changed = tier != self.tier or scale != self.scale
+        if tier != self.tier:
+            print "Governor: battery %.0f%%, charging %s, tier %s -> %s, scale %.2f" % (perc, charging, self.tier, tier, scale)
+            self.metrics.inc("governor_tier_changes")
+
+        self.tier = tier
+        self.scale = scale
+        self.metrics.set("governor_tier", tier)
+        self.metrics.set("governor_scale", "%.2f" % scale)
+        self.recalc(changed)
+
+    # Record the time a card needed to render and transfer
+    def addframe(self, cost):
+        if self.framecost is None:
+            self.framecost = cost
+        else:
+            self.framecost = self.framecost*0.8 + cost*0.2
+        self.metrics.inc("frames")
+        self.metrics.set("frame_cost_ms", "%.1f" % (self.framecost*1000))
+        self.recalc()
+
+    # Calculate the card rotation rate from tier and frame cost,
+    # the metrics are written right away only if a decision changed
+    def recalc(self, changed=False):
+        fps = self.basefps * self.scale
+        reason = "tier"
+        if self.framecost and self.duty > 0 and fps > self.duty / self.framecost:
+            fps = self.duty / self.framecost
+            reason = "framecost"
+
+        if fps != self.fps:
+            print "Governor: card rate %.3f fps -> %.3f fps (%s)" % (self.fps, fps, reason)
+            self.metrics.set("governor_reason", reason)
+            self.metrics.inc("governor_fps_changes")
+            self.fps = fps
+            changed = True
+
+        self.metrics.set("display_fps", "%.3f" % self.fps)
+        self.metrics.set("clock_refresh", "%.1f" % self.clockrefresh())
+        if changed:
+            self.metrics.publish()
+        else:
+            self.metrics.tick()
+
+    # Seconds between clock redraws while the time card is visible
+    def clockrefresh(self):
+        if self.scale <= 0:
+            return 0
+        return self.baseclock / self.scale
+
+    # Seconds until the current blank period ends, zero if not blanked
+    def blanked(self):
+        now = datetime.datetime.now()
+        minute = now.hour*60 + now.minute
+        for start, end in self.schedule:
+            if start <= end and start <= minute < end:
+                return (end - minute)*60 - now.second
+            if start > end and (minute >= start or minute < end):
+                return ((end - minute) % (24*60))*60 - now.second
+        if self.scale <= 0:
+            return 60
+        return 0
+
+    # Switch the panel off or on, returns True while it is off
+    def apply(self, force=False):
+        blank = not force and self.blanked() > 0
+        if blank and not self.hidden:
+            print "Governor: hide display (%s)" % ("schedule" if self.scale > 0 else "battery")
+            self.lcd.device.hide()
+            self.metrics.inc("governor_hides")
+        elif not blank and self.hidden:
+            print "Governor: show display"
+            self.lcd.device.show()
+            self.metrics.inc("governor_shows")
+
+        if blank != self.hidden:
+            self.hidden = blank
+            self.metrics.set("display_hidden", int(blank))
+            self.metrics.publish()
+        return blank
+
+
+# A condition which raises an alert card, with separate trigger and clear checks
+class AlertRule:
+    def __init__(self, key, text, trigger, clear, hold):
+        self.key = key
+        self.text = text
+        self.trigger = trigger
+        self.clear = clear
+        self.hold = hold
+        self.active = False
+        self.since = None
+
+    # Update the state from new status values, returns True while active
+    def evaluate(self, values, now):
+        if not self.active and self.trigger(values):
+            self.active = True
+            self.since = now
+        elif self.active and now - self.since >= self.hold and self.clear(values):
+            self.active = False
+        return self.active
+
+    # Seconds until an active alert may be cleared
+    def remaining(self, now):
+        return max(self.since + self.hold - now, 0)
+
+
+# Evaluates all alert rules on every status update
+class Alerts:
+    def __init__(self, args, metrics):
+        self.metrics = metrics
+        limit = args.alert_battery
+        margin = args.alert_hysteresis
+        self.rules = [
+            AlertRule("battery", "Battery low",
+                lambda v: v['fperc'] < limit and v['batch'] != "1",
+                lambda v: v['fperc'] >= limit + margin or v['batch'] == "1",
+                args.alert_hold),
+            AlertRule("wan", "WAN IP lost",
+                lambda v: v['wanip'] == "",
+                lambda v: v['wanip'] != "",
+                args.alert_hold),
+        ]
+        self.active = []
+
+    # Returns the active rules, highest priority first
+    def evaluate(self, values):
+        now = monotonic()
+        active = [ rule for rule in self.rules if rule.evaluate(values, now) ]
+        if [ r.key for r in active ] != [ r.key for r in self.active ]:
+            print "Alerts: %s" % (", ".join([ r.key for r in active ]) or "none")
+            self.metrics.inc("alert_changes")
+            self.metrics.set("alerts_active", ",".join([ r.key for r in active ]) or "-")
+            for rule in active:
+                if rule not in self.active:
+                    self.metrics.inc("alert_"+rule.key)
+            self.metrics.publish()
+        self.active = active
+        return active
+
+    # Seconds until the next active alert may be cleared
+    def nextcheck(self):
+        now = monotonic()
+        return min([ rule.remaining(now) for rule in self.active ] or [None])
+
+
+# alert card
+def paintalert(lcd, draw, values):
+    icon = lcd.label["iconalert"]
+    text = lcd.newlabel("alert"+values['alerttext'], "text", values['alerttext'])
+    icon.painttopcenter(draw, 2)
+    text.paintbottomcenter(draw, 2)
+
+# time card
+def painttime(lcd, draw, values):
+    now = datetime.datetime.now()
+    t = now.strftime("%H:%M")
+    d = now.strftime("%Y-%m-%d")
+    lcd.newlabel("time"+t, "fstext", t).painttopcenter(draw)
+    lcd.newlabel("date"+d, "text", d).paintbottomcenter(draw)
+
+# battery card
+def paintbattery(lcd, draw, values):
+    bi = lcd.label[values['batticon']]
+    bt = lcd.newlabel("batttext"+values['perc'], "fstext50", values['perc'][0:-1]+"\n%")
+    pi = lcd.label['iconpower']
+    # batter with charge icon
+    if values['fperc']<100 and values['batch'] == "1":
+        bt.paintmiddleleft(draw)
+        pi.paintmiddleleft(draw, bt.width+3)
+        bi.paintmiddleleft(draw, bt.width+3+pi.width+5)
+    # battery without charge icon
+    else:
+        bt.paintmiddleleft(draw, 10)
+        bi.paintmiddleleft(draw, 10+bt.width+10)
+
+# network card
+def paintnetwork(lcd, draw, values):
+    # prepared icons
+    iconwifi = lcd.label["iconwifi"]
+    iconwip = lcd.label["iconwip"]
+    iconwan = lcd.label["iconwanip"]
+    iconwanorg = lcd.label["iconwanorg"]
+
+    # maximum with of all icons
+    maxiw = max([ iconwifi.width, iconwip.width, iconwan.width, iconwanorg.width ])
+    offset = maxiw+5
+
+    # current wifi network
+    i = 0
+    iconwifi.paint(draw, ((maxiw-iconwifi.width)/2,i))
+    lcd.newlabel("wnet"+values['wnet'], "text", values['wnet']).paint(draw, (offset, i))
+    # current wifi ip
+    i += iconwifi.height+1
+    iconwip.paint(draw, ((maxiw-iconwip.width)/2,i))
+    lcd.newlabel("wip"+values['wip'], "text", values['wip']).paint(draw, (offset, i))
+    # current wan ip
+    i += iconwip.height+1
+    iconwan.paint(draw, ((maxiw-iconwan.width)/2,i))
+    lcd.newlabel("wanip"+values['wanip'], "text", values['wanip']).paint(draw, (offset, i))
+    # current wan provider
+    i += iconwan.height+1
+    iconwanorg.paint(draw, ((maxiw-iconwanorg.width)/2,i))
+    lcd.newlabel("wanorg"+values['wanorg'], "text", values['wanorg']).paint(draw, (offset, i))
+
+# Render a card and report its cost to the governor
+def paintcard(lcd, governor, painter, values):
+    start = monotonic()
+    with lcd.draw() as draw:
+        painter(lcd, draw, values)
+    governor.addframe(monotonic() - start)
+
 # Draw display
-def stats(args, lcd, obs):
+def stats(args, lcd, obs, governor, alerts):
+    alertshown = None
     while True:
-        obs.modified = False
+        obs.reset()
 
-        # read properties from cache file
-        properties = {}
+        # read properties from cache file or shared status block
         try:
-            with open(obs.filename) as fp:
-                for line in fp:
-                     parts = line.strip().split("\t")
-                     pkey = parts[0].strip()
-                     pval = parts[1].strip() if len(parts)>1 else ""
-                     properties[pkey] = pval
-            readfilesuccess = True
+            properties = obs.read()
         except:
             print "Cannot open status file"
             with lcd.draw() as draw:
@@ -132,15 +547,18 @@ def stats(args, lcd, obs):
         print properties
 
         # prepare values
-        batch = properties['CHARG_IND']
-        perc = properties['BATT_PERCENT']
-        wnet = properties['WIFI_NET']
-        wip = properties['WIFI_IP']
-        wanip = properties['WAN_IP']
-        wanorg = properties['WAN_ORG']
+        values = {
+            'batch': properties['CHARG_IND'],
+            'perc': properties['BATT_PERCENT'],
+            'wnet': properties['WIFI_NET'],
+            'wip': properties['WIFI_IP'],
+            'wanip': properties.get('WAN_IP', ""),
+            'wanorg': properties.get('WAN_ORG', ""),
+        }
 
         # battery icon
-        fperc = float(perc[0:-1])
+        fperc = float(values['perc'][0:-1])
+        values['fperc'] = fperc
 
         batticon = ""
         if fperc >= 85:
@@ -153,68 +571,85 @@ def stats(args, lcd, obs):
             batticon = "iconbatt20" # 1/4
         else:
             batticon = "iconbatt0" # empty
-
-        # display seach card with 0.15 frames per second
-        regulator = framerate_regulator(fps=args.display_fps)
+        values['batticon'] = batticon
+
+        # scale refresh rates by battery state
+        governor.update(fperc, values['batch'] == "1")
+
+        # alert card preempts the card rotation until all alerts are cleared
+        active = alerts.evaluate(values)
+        if active:
+            values['alerttext'] = "\n".join([ rule.text for rule in active ])
+            if alertshown != values['alerttext']:
+                governor.apply(force=True)
+                if alertshown is None:
+                    lcd.lcd.savepoint()
+                paintcard(lcd, governor, paintalert, values)
+                alertshown = values['alerttext']
+            obs.wait(alerts.nextcheck() or None)
+            continue
+        elif alertshown is not None:
+            # bring back the card which was visible before the alert
+            if len(lcd.lcd) > 0:
+                lcd.lcd.restore()
+            alertshown = None
+
+        # enabled cards
+        cards = []
+        if args.all_cards or args.card_time:
+            cards.append(painttime)
+        if args.all_cards or args.card_battery:
+            cards.append(paintbattery)
+        if args.all_cards or args.card_network:
+            cards.append(paintnetwork)
+
+        # display seach card with the rate choosen by the governor
+        regulator = InterruptibleRegulator(obs, governor.fps)
+        regulatorfps = governor.fps
 
         while obs.modified == False:
-            # time card
-            if args.all_cards or args.card_time:
-                with regulator:
-                    with lcd.draw() as draw:
-                        now = datetime.datetime.now()
-                        t = now.strftime("%H:%M")
-                        d = now.strftime("%Y-%m-%d")
-                        lcd.newlabel("time"+t, "fstext", t).painttopcenter(draw)
-                        lcd.newlabel("date"+d, "text", d).paintbottomcenter(draw)
-
-            # battery card
-            if args.all_cards or args.card_battery:
-                with regulator:
-                    with lcd.draw() as draw:
-                        bi = lcd.label[batticon]
-                        bt = lcd.newlabel("batttext"+perc, "fstext50", perc[0:-1]+"\n%")
-                        pi = lcd.label['iconpower']
-                        # batter with charge icon
-                        if fperc<100 and batch == "1":
-                            bt.paintmiddleleft(draw)
-                            pi.paintmiddleleft(draw, bt.width+3)
-                            bi.paintmiddleleft(draw, bt.width+3+pi.width+5)
-                        # battery without charge icon
-                        else:
-                            bt.paintmiddleleft(draw, 10)
-                            bi.paintmiddleleft(draw, 10+bt.width+10)
-
-            # network card
-            if args.all_cards or args.card_network:
+            for painter in cards:
+                # display is switched off, no bus traffic until the blank period ends
+                while governor.apply() and obs.modified == False:
+                    obs.wait(min(governor.blanked(), 30))
+                if obs.modified:
+                    break
+
+                if regulatorfps != governor.fps:
+                    regulator = InterruptibleRegulator(obs, governor.fps)
+                    regulatorfps = governor.fps
+
                 with regulator:
-                    with lcd.draw() as draw:
-                        # prepared icons
-                        iconwifi = lcd.label["iconwifi"]
-                        iconwip = lcd.label["iconwip"]
-                        iconwan = lcd.label["iconwanip"]
-                        iconwanorg = lcd.label["iconwanorg"]
-
-                        # maximum with of all icons
-                        maxiw = max([ iconwifi.width, iconwip.width, iconwan.width, iconwanorg.width ])
-                        offset = maxiw+5
-
-                        # current wifi network
-                        i = 0
-                        iconwifi.paint(draw, ((maxiw-iconwifi.width)/2,i))
-                        lcd.newlabel("wnet"+wnet, "text", wnet).paint(draw, (offset, i))
-                        # current wifi ip
-                        i += iconwifi.height+1
-                        iconwip.paint(draw, ((maxiw-iconwip.width)/2,i))
-                        lcd.newlabel("wip"+wip, "text", wip).paint(draw, (offset, i))
-                        # current wan ip
-                        i += iconwip.height+1
-                        iconwan.paint(draw, ((maxiw-iconwan.width)/2,i))
-                        lcd.newlabel("wanip"+wanip, "text", wanip).paint(draw, (offset, i))
-                        # current wan provider
-                        i += iconwan.height+1
-                        iconwanorg.paint(draw, ((maxiw-iconwanorg.width)/2,i))
-                        lcd.newlabel("wanorg"+wanorg, "text", wanorg).paint(draw, (offset, i))
+                    paintcard(lcd, governor, painter, values)
+
+                    # keep the clock up to date while the time card is visible
+                    refresh = governor.clockrefresh()
+                    if painter == painttime and refresh > 0 and governor.fps > 0:
+                        shown = now = monotonic()
+                        minute = datetime.datetime.now().minute
+                        while now + refresh < shown + 1.0/governor.fps:
+                            if obs.wait(refresh):
+                                break
+                            now = monotonic()
+                            if datetime.datetime.now().minute != minute:
+                                minute = datetime.datetime.now().minute
+                                paintcard(lcd, governor, painter, values)
+
+# Copy every status file update into the shared status block
+def collect(args, obs):
+    shared = SharedStatus(args.status_shm, writable=True)
+    while True:
+        obs.reset()
+        try:
+            properties = obs.read()
+        except:
+            print "Cannot open status file"
+            obs.wait(5)
+            continue
+
+        shared.write(properties)
+        print "Debug: collected status, sequence %d" % shared.sequence()
+        obs.wait()
 
 # Initialize lcd device, fonts and icons
 def initlcd(args):
@@ -250,6 +685,7 @@ def initlcd(args):
     lcd.newlabel("iconbatt40", "fsicon", "\uf242")
     lcd.newlabel("iconbatt60", "fsicon", "\uf241")
     lcd.newlabel("iconbatt85", "fsicon", "\uf240")
+    lcd.newlabel("iconalert", "fsicon50", "\uf071")
 
     return lcd
 
@@ -264,26 +700,61 @@ def run():
     parser.add_argument('--card-time', action='store_true', default=False, help='display the current time')
     parser.add_argument('--card-battery', action='store_true', default=False, help='display the battery info')
     parser.add_argument('--card-network', action='store_true', default=False, help='display the network info')
+    parser.add_argument('--clock-refresh', metavar='15', default=15.0, type=float, help='seconds between clock updates while the time card is visible')
+    parser.add_argument('--governor-tiers', metavar='50:1.0,20:0.5,10:0.25,0:0.1', default='50:1.0,20:0.5,10:0.25,0:0.1', type=str, help='battery percent:refresh scale tiers while not charging, scale 0 switches the display off')
+    parser.add_argument('--governor-duty', metavar='0.05', default=0.05, type=float, help='maximum share of time spent rendering cards, 0 to disable')
+    parser.add_argument('--blank-schedule', metavar='23:00-07:00', default=None, type=str, help='comma separated time spans where the display is switched off')
+    parser.add_argument('--alert-battery', metavar='10', default=10.0, type=float, help='show the alert card below this battery percent while not charging')
+    parser.add_argument('--alert-hysteresis', metavar='2', default=2.0, type=float, help='battery percent above the alert limit needed to clear the alert')
+    parser.add_argument('--alert-hold', metavar='30', default=30.0, type=float, help='minimum seconds an alert card stays visible')
+    parser.add_argument('--metrics-file', metavar='FILE', default=None, type=str, help='write governor decisions and counters into this file')
+    parser.add_argument('--metrics-interval', metavar='60', default=60.0, type=float, help='seconds between writes of the metrics file when no governor decision changed')
+    parser.add_argument('--status-shm', metavar='/dev/shm/pocketlcd', default=None, type=str, help='shared status block between collector and renderer process')
+    parser.add_argument('--status-poll', metavar='1.0', default=1.0, type=float, help='seconds between checks of the shared status block (renderer only)')
+    parser.add_argument('--collector', action='store_true', default=False, help='only collect the status into --status-shm, do not render')
     args = parser.parse_args()
 
-    # initialize status file observer
-    statusfile = args.file
-    observer = Observer()
-    observerhandler = WatchDogEvent(statusfile)
-    observer.schedule(observerhandler, os.path.dirname(statusfile), recursive=False)
-    observer.start()
-
-    # init lcd
-    lcd = initlcd(args)
+    if args.collector and args.status_shm is None:
+        parser.error("--collector requires --status-shm")
+
+    # initialize status file observer, the renderer of a two-process
+    # setup reads the shared status block instead
+    observer = None
+    if args.status_shm is None or args.collector:
+        statusfile = args.file
+        observer = Observer()
+        observerhandler = WatchDogEvent(statusfile)
+        observer.schedule(observerhandler, os.path.dirname(statusfile), recursive=False)
+        observer.start()
+    else:
+        while True:
+            try:
+                observerhandler = SharedStatus(args.status_shm, poll=args.status_poll)
+                break
+            except (IOError, OSError, ValueError):
+                print "Waiting for the collector to create %s" % args.status_shm
+                time.sleep(5)
 
-    # display stats
     try:
-        stats(args, lcd, observerhandler)
+        if args.collector:
+            collect(args, observerhandler)
+        else:
+            # init lcd
+            lcd = initlcd(args)
+
+            # init refresh governor
+            metrics = Metrics(args.metrics_file, args.metrics_interval)
+            governor = Governor(args, lcd, metrics)
+            alerts = Alerts(args, metrics)
+
+            # display stats
+            stats(args, lcd, observerhandler, governor, alerts)
     except KeyboardInterrupt:
         pass
 
-    observer.stop()
-    observer.join()
+    if observer is not None:
+        observer.stop()
+        observer.join()
 
 
 # Start program